@@ -1,44 +1,143 @@
 import pandas as pd
-from preprocessing import clean_data
+from pathlib import Path
 import formulas
+from candidate_trie import CandidateTrie, encode_transactions
+from spill import SpillDict, chunked, entries_for_budget, CANDIDATE_BYTES, ITEMSET_ENTRY_BYTES
 from itertools import combinations
+import numpy as np
 import time
 
-products = pd.read_csv('../../data/products.csv')
-
-def apriori(data, minimum_support=0.2, minimum_confidence=0.5):
+products = pd.read_csv(Path(__file__).resolve().parent.parent.parent / 'data' / 'products.csv')
+
+#DHP: pairs per flush when hashing transactions into buckets
+DHP_BATCH = 1 << 20
+
+
+def dhp_pair_buckets(encoded, weights, n_buckets, n_items):
+    #Weighted count of every pair of every transaction, hashed into n_buckets buckets
+    buckets = np.zeros(n_buckets, dtype=np.int64)
+    keys, key_weights = [], []
+
+    def flush():
+        if keys:
+            buckets[:] += np.bincount(np.asarray(keys, dtype=np.int64) % n_buckets,
+                                      weights=key_weights, minlength=n_buckets).astype(np.int64)
+            keys.clear()
+            key_weights.clear()
+
+    for items, weight in zip(encoded, weights):
+        for a, b in combinations(items, 2):
+            keys.append(a * n_items + b)
+            key_weights.append(weight)
+        if len(keys) >= DHP_BATCH:
+            flush()
+    flush()
+    return buckets
+
+
+def _pair_key(item_ids, pair, n_items):
+    a, b = sorted(item_ids[item] for item in pair)
+    return a * n_items + b
+
+
+def dhp_trim(encoded, weights, keep, min_length):
+    #keep(position, item) decides which items of a transaction stay, transactions left
+    #shorter than min_length can't hold a next level candidate and are dropped
+    trimmed, trimmed_weights = [], []
+    for position, (items, weight) in enumerate(zip(encoded, weights)):
+        items = tuple(i for i in items if keep(position, i))
+        if len(items) >= min_length:
+            trimmed.append(items)
+            trimmed_weights.append(weight)
+    return trimmed, trimmed_weights
+
+
+#memory_budget_mb caps how many candidates are counted at once, bigger levels take several passes;
+#it also bounds the frequent itemsets held in memory (the rest are spilled to disk) and the rule
+#splits built at once, see formulas.build_rules
+#return_itemsets skips rule generation and returns ({sorted itemset: support count}, total)
+#dhp_buckets turns on Direct Hashing and Pruning: pairs are hashed into that many buckets to prune
+#level 2 candidates, and each pass trims items and transactions that can't hold a next level candidate
+def apriori(data, minimum_support=0.2, minimum_confidence=0.5, candidate_filter=None, memory_budget_mb=None, rules_path=None, return_itemsets=False, dhp_buckets=None):
     start_time = time.time()
-    supported_sets = {}
+    candidate_budget = entries_for_budget(memory_budget_mb, CANDIDATE_BYTES)
+    #Support count of every frequent itemset, keyed by sorted item names, for batch rule generation
+    support_counts = SpillDict(entries_for_budget(memory_budget_mb, ITEMSET_ENTRY_BYTES))
     one_sets = []
     product_list = products['product_name'].tolist()
     found_sets_this_cycle = 0
     n_size = 1
 
+    #Encode every transaction once as sorted item ids so each level is a single pass through a candidate trie
+    item_ids = {item: index for index, item in enumerate(product_list)}
+    encoded = encode_transactions(data['items'].tolist(), item_ids)
+    #Compressed baskets carry a weight, every row counts that many times
+    weights = [int(w) for w in data['weight']] if 'weight' in data.columns else None
+    total = sum(weights) if weights is not None else len(encoded)
+
+    trie = CandidateTrie((item_ids[item],) for item in product_list)
+    trie.count_all(encoded, weights)
+    counts = trie.counts()
+
     for item in product_list:
-        if formulas.support_apiori(data, item) >= minimum_support:
+        if total and counts[(item_ids[item],)] / total >= minimum_support:
             one_sets.append(item)
+            support_counts[(item,)] = counts[(item_ids[item],)]
             found_sets_this_cycle +=1
 
   
     
     if found_sets_this_cycle == 0:
         return -1
-    
-    supported_sets[n_size] = one_sets
+
+    if dhp_buckets:
+        if weights is None:
+            weights = [1] * len(encoded)
+        n_items = len(product_list)
+        pair_buckets = dhp_pair_buckets(encoded, weights, dhp_buckets, n_items)
+        frequent_ids = {item_ids[item] for item in one_sets}
+        encoded, weights = dhp_trim(encoded, weights, lambda position, i: i in frequent_ids, 2)
     
     while found_sets_this_cycle != 0:
         found_sets_this_cycle = 0
         n_size+=1
         found_sets = []
 
-        set_candidate = list(combinations(one_sets, n_size))
-
-        for itemset in set_candidate:
-            if formulas.support_apiori(data, itemset) >= minimum_support:
-                found_sets.append(itemset)
-                found_sets_this_cycle+= 1
-        
-        supported_sets[n_size] = found_sets
+        set_candidate = combinations(one_sets, n_size)
+
+        #Optional pruning hook, e.g. skip itemsets whose category rollup is infrequent
+        if candidate_filter is not None:
+            set_candidate = (itemset for itemset in set_candidate if candidate_filter(itemset))
+
+        #A pair can only be frequent if its whole bucket is
+        if dhp_buckets and n_size == 2:
+            set_candidate = (pair for pair in set_candidate
+                             if pair_buckets[_pair_key(item_ids, pair, n_items) % dhp_buckets] / total >= minimum_support)
+
+        #How many candidates inside each transaction every item belongs to, only kept when
+        #the level is counted in one chunk
+        level_hits = [] if dhp_buckets else None
+
+        for chunk_number, chunk in enumerate(chunked(set_candidate, candidate_budget)):
+            trie = CandidateTrie([item_ids[item] for item in itemset] for itemset in chunk)
+            if level_hits is not None and chunk_number == 0:
+                level_hits = [trie.count_transaction_hits(items, weight) for items, weight in zip(encoded, weights)]
+            else:
+                level_hits = None
+                trie.count_all(encoded, weights)
+            counts = trie.counts()
+
+            for itemset in chunk:
+                key = tuple(sorted(item_ids[item] for item in itemset))
+                if counts[key] / total >= minimum_support:
+                    found_sets.append(itemset)
+                    support_counts[tuple(sorted(itemset))] = counts[key]
+                    found_sets_this_cycle+= 1
+
+        #An item of a next level candidate sits in at least n_size of this level's candidates
+        if level_hits is not None and found_sets_this_cycle:
+            encoded, weights = dhp_trim(encoded, weights,
+                                        lambda position, i: level_hits[position].get(i, 0) >= n_size, n_size + 1)
 
         found_items = []
 
@@ -48,9 +147,13 @@ def apriori(data, minimum_support=0.2, minimum_confidence=0.5):
 
         one_sets = list(set(found_items))
 
- 
+    if return_itemsets:
+        return support_counts.unwrap(), total
 
-    ret = formulas.generate_all_rules_apiori(supported_sets, minimum_confidence, data)
+    ret = formulas.build_rules(minimum_confidence, support_counts, total, memory_budget_mb, rules_path)
+    if support_counts.spilled:
+        print(f'Apiori spilled {support_counts.spilled} itemsets to disk')
+    support_counts.close()
 
     end_time = time.time()
     elapsed_time_ms = (end_time - start_time) * 1000
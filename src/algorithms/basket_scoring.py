@@ -0,0 +1,111 @@
+from typing import Dict, Iterable, List, Tuple
+
+
+# ----------------------------------------------------------------------
+# ANTECEDENT TRIE
+# ----------------------------------------------------------------------
+class _Node:
+    __slots__ = ("children", "rules")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # (consequent items, confidence, lift) for rules ending here
+        self.rules: List[Tuple[Tuple[str, ...], float, float]] = []
+
+
+class BasketScorer:
+    """
+    Index of rule antecedents in a prefix trie over sorted item names.
+
+    To find every rule whose antecedent is a subset of a basket we only walk
+    trie paths spelled by items of the basket, so the cost depends on the
+    basket and the matching part of the trie, not on the total rule count.
+    """
+
+    AGGREGATES = ("max", "sum", "noisy_or")
+
+    def __init__(self):
+        self.root = _Node()
+        self.rule_count = 0
+
+    def __len__(self):
+        return self.rule_count
+
+    def add_rule(self, antecedent: Iterable[str], consequent: Iterable[str],
+                 confidence: float, lift: float = 0.0):
+        node = self.root
+        for item in sorted({str(i).lower() for i in antecedent}):
+            child = node.children.get(item)
+            if child is None:
+                child = _Node()
+                node.children[item] = child
+            node = child
+        node.rules.append((tuple(str(i).lower() for i in consequent), confidence, lift))
+        self.rule_count += 1
+
+    @classmethod
+    def from_rules(cls, rules) -> "BasketScorer":
+        scorer = cls()
+        if rules == -1:
+            return scorer
+        for rule in rules:
+            scorer.add_rule(rule.first, rule.second, rule.confidence, rule.lift)
+        return scorer
+
+    @classmethod
+    def from_pair_stats(cls, stats, min_conf: float = 0.05) -> "BasketScorer":
+        """Single-item antecedents from a PairStats co-occurrence matrix."""
+        scorer = cls()
+        for a in stats.items:
+            partners, conf, lift = stats.row(a)
+            for k in range(len(partners)):
+                if conf[k] >= min_conf:
+                    scorer.add_rule((a,), (stats.items[partners[k]],), float(conf[k]), float(lift[k]))
+        return scorer
+
+    # ------------------------------------------------------------------
+    # LOOKUP
+    # ------------------------------------------------------------------
+    def matching_rules(self, basket: Iterable[str]):
+        """Yield (consequent, confidence, lift) for rules with antecedent <= basket."""
+        items = sorted({str(i).strip().lower() for i in basket})
+        stack = [(self.root, 0)]
+        while stack:
+            node, start = stack.pop()
+            for i in range(start, len(items)):
+                child = node.children.get(items[i])
+                if child is None:
+                    continue
+                yield from child.rules
+                if child.children:
+                    stack.append((child, i + 1))
+
+    def score(self, basket: Iterable[str], top_n: int = 5,
+              aggregate: str = "max") -> List[Tuple[str, float]]:
+        """
+        Rank items to suggest for the whole basket.
+
+        aggregate:
+            "max"      - strongest single rule (confidence)
+            "sum"      - sum of confidences over matching rules
+            "noisy_or" - 1 - prod(1 - confidence), rewards independent evidence
+        Returns [(item, score)] sorted by score descending.
+        """
+        if aggregate not in self.AGGREGATES:
+            raise ValueError(f"aggregate must be one of {self.AGGREGATES}")
+
+        basket = {str(i).strip().lower() for i in basket}
+        scores: Dict[str, float] = {}
+        for consequent, conf, _ in self.matching_rules(basket):
+            for item in consequent:
+                if item in basket:
+                    continue
+                if aggregate == "max":
+                    scores[item] = max(scores.get(item, 0.0), conf)
+                elif aggregate == "sum":
+                    scores[item] = scores.get(item, 0.0) + conf
+                else:
+                    scores[item] = 1.0 - (1.0 - scores.get(item, 0.0)) * (1.0 - conf)
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return ranked[:top_n]
@@ -0,0 +1,113 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+# ----------------------------------------------------------------------
+# PREFIX TRIE FOR APRIORI CANDIDATE COUNTING
+# ----------------------------------------------------------------------
+class _Node:
+    __slots__ = ("children", "count")
+
+    def __init__(self):
+        self.children: Dict[int, "_Node"] = {}
+        self.count = 0
+
+
+class CandidateTrie:
+    """
+    Prefix trie over sorted item ids holding every candidate of one size.
+
+    Each transaction is pushed through the trie once and every candidate it
+    contains is incremented in that single traversal, so the cost of a pass
+    depends on transaction length and trie size rather than on
+    candidates x transactions.
+    """
+
+    def __init__(self, candidates: Iterable[Sequence[int]]):
+        self.root = _Node()
+        self.size = None
+        self._leaves: Dict[Tuple[int, ...], _Node] = {}
+
+        for candidate in candidates:
+            key = tuple(sorted(candidate))
+            if self.size is None:
+                self.size = len(key)
+            elif len(key) != self.size:
+                raise ValueError("All candidates in a trie must have the same size")
+
+            node = self.root
+            for item in key:
+                child = node.children.get(item)
+                if child is None:
+                    child = _Node()
+                    node.children[item] = child
+                node = child
+            self._leaves[key] = node
+
+    def __len__(self):
+        return len(self._leaves)
+
+    def count_transaction(self, items: Sequence[int], weight: int = 1):
+        """items must be sorted ascending and free of duplicates."""
+        if not self._leaves or len(items) < self.size:
+            return
+        self._walk(self.root, items, 0, self.size, weight)
+
+    def _walk(self, node: _Node, items: Sequence[int], start: int, remaining: int, weight: int):
+        # Stop early once there are not enough items left to reach a leaf
+        last = len(items) - remaining + 1
+        children = node.children
+        for i in range(start, last):
+            child = children.get(items[i])
+            if child is None:
+                continue
+            if remaining == 1:
+                child.count += weight
+            else:
+                self._walk(child, items, i + 1, remaining - 1, weight)
+
+    def count_all(self, transactions: Iterable[Sequence[int]], weights: Iterable[int] = None):
+        """weights: optional multiplicity per transaction (compressed baskets)."""
+        if weights is None:
+            for items in transactions:
+                self.count_transaction(items)
+        else:
+            for items, weight in zip(transactions, weights):
+                self.count_transaction(items, weight)
+
+    def count_transaction_hits(self, items: Sequence[int], weight: int = 1) -> Dict[int, int]:
+        """
+        Like count_transaction, and also returns how many candidates contained
+        in this transaction each item belongs to (used for DHP trimming).
+        """
+        hits: Dict[int, int] = {}
+        if self._leaves and len(items) >= self.size:
+            self._walk_hits(self.root, items, 0, self.size, weight, [], hits)
+        return hits
+
+    def _walk_hits(self, node: _Node, items: Sequence[int], start: int, remaining: int,
+                   weight: int, path: List[int], hits: Dict[int, int]):
+        last = len(items) - remaining + 1
+        children = node.children
+        for i in range(start, last):
+            child = children.get(items[i])
+            if child is None:
+                continue
+            path.append(items[i])
+            if remaining == 1:
+                child.count += weight
+                for item in path:
+                    hits[item] = hits.get(item, 0) + 1
+            else:
+                self._walk_hits(child, items, i + 1, remaining - 1, weight, path, hits)
+            path.pop()
+
+    def counts(self) -> Dict[Tuple[int, ...], int]:
+        return {key: node.count for key, node in self._leaves.items()}
+
+
+def encode_transactions(rows: Iterable[Iterable[str]], item_ids: Dict[str, int]) -> List[Tuple[int, ...]]:
+    """Map each transaction to a sorted tuple of known item ids."""
+    encoded = []
+    for row in rows:
+        encoded.append(tuple(sorted({item_ids[i] for i in row if i in item_ids})))
+    return encoded
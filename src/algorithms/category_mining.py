@@ -0,0 +1,176 @@
+import argparse
+import math
+from itertools import combinations
+from pathlib import Path
+
+import pandas as pd
+
+import formulas
+
+
+# ----------------------------------------------------------------------
+# FIND products.csv ROBUSTLY
+# ----------------------------------------------------------------------
+def find_products_csv():
+    here = Path(__file__).resolve()
+    for parent in [here] + list(here.parents):
+        candidate = parent / "data" / "products.csv"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def load_item_categories(products=None):
+    """Map product_name -> category (both lower-cased) from products.csv."""
+    if products is None:
+        path = find_products_csv()
+        if path is None:
+            return {}
+        products = pd.read_csv(path)
+    if "category" not in products.columns:
+        return {}
+
+    names = products["product_name"].astype(str).str.strip().str.lower()
+    cats = products["category"].astype(str).str.strip().str.lower()
+    return dict(zip(names, cats))
+
+
+# ----------------------------------------------------------------------
+# CATEGORY LEVEL
+# ----------------------------------------------------------------------
+def roll_up(data, item_category):
+    """Same frame shape as `data`, with each basket replaced by its categories."""
+    rolled = data.copy()
+    rolled['items'] = [
+        sorted({item_category.get(item, item) for item in items})
+        for items in data['items']
+    ]
+    return rolled
+
+
+def mine_categories(data, item_category, minimum_support=0.2):
+    """
+    Level-wise tidset mining over category baskets. There are only a handful
+    of categories, so this is cheap compared to item-level mining.
+
+    Returns ({sorted category tuple: support count}, total transactions).
+    Compressed baskets count as many times as their weight.
+    """
+    weights = dict(zip(data['transaction_id'], data['weight'])) if 'weight' in data.columns else None
+
+    def count(tids):
+        return len(tids) if weights is None else int(sum(weights[t] for t in tids))
+
+    total = count(data['transaction_id'])
+    minimum = math.ceil(total * minimum_support)
+
+    #The looser of apriori()'s count / total >= s and Eclat's count >= ceil(n*s), which can differ
+    #when n*s rounds up, so a category the pruning relies on is never stricter than either engine
+    def frequent(tids):
+        c = count(tids)
+        return c >= minimum or (total and c / total >= minimum_support)
+
+    tids = {}
+    for tid, items in zip(data['transaction_id'], data['items']):
+        for cat in {item_category.get(item, item) for item in items}:
+            tids.setdefault((cat,), set()).add(tid)
+
+    current = {k: v for k, v in tids.items() if frequent(v)}
+    singles = dict(current)
+    found_sets = {k: count(v) for k, v in current.items()}
+    n_size = 1
+
+    while current:
+        n_size += 1
+        level_cats = sorted({cat for key in current for cat in key})
+        next_level = {}
+        for combo in combinations(level_cats, n_size):
+            # Every (n-1)-subset must already be frequent
+            if any(sub not in current for sub in combinations(combo, n_size - 1)):
+                continue
+            intersects = current[combo[:-1]] & singles[(combo[-1],)]
+            if frequent(intersects):
+                next_level[combo] = intersects
+        found_sets.update((k, count(v)) for k, v in next_level.items())
+        current = next_level
+
+    return found_sets, total
+
+
+def category_filter(frequent_categories, item_category):
+    """
+    Candidate filter for apriori()/eclat(): reject an item combination when
+    the set of categories it rolls up to is not frequent. Support of the
+    rollup is an upper bound on the support of the items, so nothing
+    frequent is lost.
+    """
+    def allowed(itemset):
+        cats = set()
+        for item in itemset:
+            cat = item_category.get(item)
+            if cat is None:
+                return True  # not in the catalog, can't reason about it
+            cats.add(cat)
+        return tuple(sorted(cats)) in frequent_categories
+
+    return allowed
+
+
+# ----------------------------------------------------------------------
+# MULTI-LEVEL MINING
+# ----------------------------------------------------------------------
+def multilevel_mine(data, minimum_support=0.2, minimum_confidence=0.5, engine='eclat', item_category=None):
+    """
+    Mine categories first, then mine items with candidates pruned by the
+    frequent category patterns.
+
+    Returns a dict with 'category_rules', 'item_rules' and
+    'frequent_categories' ({category tuple: support}).
+    """
+    if item_category is None:
+        item_category = load_item_categories()
+
+    found_sets, total = mine_categories(data, item_category, minimum_support)
+    if total == 0:
+        return {'category_rules': set(), 'item_rules': -1, 'frequent_categories': {}}
+
+    category_rules = formulas.generate_all_rules_eclat(minimum_confidence, found_sets, total)
+    candidate_filter = category_filter(found_sets, item_category)
+
+    if engine == 'apriori':
+        from apiori import apriori
+        item_rules = apriori(data, minimum_support, minimum_confidence, candidate_filter=candidate_filter)
+    else:
+        from eclat import eclat
+        item_rules = eclat(data, minimum_support, minimum_confidence, candidate_filter=candidate_filter)
+
+    return {
+        'category_rules': category_rules,
+        'item_rules': item_rules,
+        'frequent_categories': {k: v / total for k, v in found_sets.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mine category rules, then item rules pruned by the frequent categories.')
+    parser.add_argument('transactions', help='cleaned transaction CSV (transaction_id, items)')
+    parser.add_argument('--min-support', type=float, default=0.2)
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--engine', choices=('apriori', 'eclat'), default='eclat')
+    args = parser.parse_args(argv)
+
+    from partitioned import read_partition
+    found = multilevel_mine(read_partition(args.transactions), args.min_support, args.min_confidence, args.engine)
+    print('Category rules:')
+    for rule in sorted(found['category_rules'], key=lambda r: -r.confidence):
+        print(f'  {rule}  confidence {rule.confidence:.3f}  lift {rule.lift:.3f}')
+    print('Item rules:')
+    if found['item_rules'] == -1:
+        print('  No frequent itemsets')
+        return
+    for rule in sorted(found['item_rules'], key=lambda r: -r.confidence):
+        print(f'  {rule}  confidence {rule.confidence:.3f}  lift {rule.lift:.3f}')
+
+
+if __name__ == '__main__':
+    main()
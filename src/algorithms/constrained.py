@@ -0,0 +1,130 @@
+import time
+
+import numpy as np
+
+import formulas
+from candidate_trie import CandidateTrie, encode_transactions
+from incremental import apriori_gen
+
+
+# ----------------------------------------------------------------------
+# ITEM-CONSTRAINED MINING
+# ----------------------------------------------------------------------
+def _rows(data):
+    """(baskets as item sets, weight per basket) from a cleaned or compressed frame, or a list of baskets."""
+    if hasattr(data, 'columns'):
+        rows = [set(items) for items in data['items']]
+        weights = [int(w) for w in data['weight']] if 'weight' in data.columns else [1] * len(rows)
+    else:
+        rows = [set(items) for items in data]
+        weights = [1] * len(rows)
+    return rows, weights
+
+
+def _count_by_size(candidates, transactions, weights):
+    """Exact counts of mixed-size candidates, one trie pass per size."""
+    by_size = {}
+    for candidate in candidates:
+        by_size.setdefault(len(candidate), []).append(candidate)
+    counts = {}
+    for group in by_size.values():
+        trie = CandidateTrie(group)
+        trie.count_all(transactions, weights)
+        counts.update(trie.counts())
+    return counts
+
+
+def mine_containing(data, item, minimum_support=0.2, minimum_confidence=0.5, antecedent_only=False, max_size=None, return_itemsets=False):
+    """
+    Rules whose itemset contains `item`, without mining the whole dataset.
+
+    Only transactions containing `item` are kept (the projection) and only
+    supersets of `item` are generated as candidates, so the level-wise search
+    runs over a conditional database that is usually a small fraction of
+    the data. One extra pass over all transactions counts the item-free
+    subsets that confidence and lift need.
+
+    antecedent_only keeps rules with `item` on the left hand side and
+    max_size caps the itemset size. The rules are the same ones apriori()
+    would return for this item; -1 when `item` itself is not frequent.
+    """
+    start_time = time.time()
+    rows, weights = _rows(data)
+    total = sum(weights)
+    minimum = minimum_support * total
+
+    projected = [(row - {item}, w) for row, w in zip(rows, weights) if item in row]
+    item_count = sum(w for _, w in projected)
+    if not total or item_count < minimum:
+        return -1
+
+    item_ids = {}
+    for row, _ in projected:
+        for other in row:
+            item_ids.setdefault(other, len(item_ids))
+    names = list(item_ids)
+    encoded = encode_transactions([row for row, _ in projected], item_ids)
+    projected_weights = [w for _, w in projected]
+
+    #Counts of itemsets {item} + key, key being ids of the other items
+    conditional = {(): item_count}
+    candidates = [(i,) for i in range(len(names))]
+    k = 1
+    while candidates and (max_size is None or k < max_size):
+        found = _count_by_size(candidates, encoded, projected_weights)
+        level = {key: count for key, count in found.items() if count >= minimum}
+        conditional.update(level)
+        k += 1
+        candidates = apriori_gen(level, k)
+
+    def key_names(key):
+        return tuple(names[i] for i in key)
+
+    #Subsets without the item are frequent wherever their superset is, count them over all rows
+    free_sets = [key for key in conditional if key]
+    free_counts = _count_by_size(free_sets, encode_transactions(rows, item_ids), weights) if free_sets else {}
+
+    support_counts = {tuple(sorted((item,) + key_names(key))): count for key, count in conditional.items()}
+    if return_itemsets:
+        return support_counts, total
+    support_counts.update((tuple(sorted(key_names(key))), count) for key, count in free_counts.items())
+
+    firsts, seconds = [], []
+    antecedent_counts, consequent_counts, joint_counts = [], [], []
+    for key in free_sets:
+        itemset = tuple(sorted((item,) + key_names(key)))
+        joint = support_counts[itemset]
+        for first, second in formulas.rule_splits(itemset):
+            if antecedent_only and item not in first:
+                continue
+            firsts.append(first)
+            seconds.append(second)
+            antecedent_counts.append(support_counts[first])
+            consequent_counts.append(support_counts[second])
+            joint_counts.append(joint)
+
+    rules = set()
+    if firsts:
+        metrics = formulas.batch_metrics(antecedent_counts, consequent_counts, joint_counts, total)
+        keep = np.flatnonzero(formulas.rule_mask(metrics, minimum_confidence=minimum_confidence))
+        support, confidence, lift = metrics['support'], metrics['confidence'], metrics['lift']
+        rules = {
+            formulas.AssociationRule.from_metrics(firsts[i], seconds[i], float(support[i]), float(confidence[i]), float(lift[i]))
+            for i in keep
+        }
+
+    elapsed_time_ms = (time.time() - start_time) * 1000
+    print(f'Constrained mining for {item} completed in {elapsed_time_ms} ms ({len(projected)} of {len(rows)} rows)')
+    return rules
+
+
+def rules_for_basket(data, basket, minimum_support=0.2, minimum_confidence=0.5, max_size=None):
+    """Rules whose antecedent is a subset of `basket` and whose consequent adds something new."""
+    basket = set(basket)
+    rules = set()
+    for item in sorted(basket):
+        found = mine_containing(data, item, minimum_support, minimum_confidence, antecedent_only=True, max_size=max_size)
+        if found == -1:
+            continue
+        rules.update(r for r in found if set(r.first) <= basket and not set(r.second) & basket)
+    return rules
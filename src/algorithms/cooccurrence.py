@@ -0,0 +1,134 @@
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+# ----------------------------------------------------------------------
+# SPARSE PAIR STATISTICS
+# ----------------------------------------------------------------------
+class PairStats:
+    """
+    Item supports and pairwise confidence / lift built from a sparse
+    co-occurrence matrix.
+
+    With X the one-hot (transactions x items) matrix, C = X^T X holds every
+    pair count; its diagonal holds the single item counts. C is stored as a
+    symmetric CSR matrix without the diagonal, so looking up all partners
+    of one product is a single row slice.
+    """
+
+    def __init__(self):
+        self.items: List[str] = []
+        self.item_index: Dict[str, int] = {}
+        self.item_counts = np.zeros(0, dtype=np.float64)
+        self.cooc = sparse.csr_matrix((0, 0), dtype=np.float64)
+        self.n_tx = 0.0
+
+    def __bool__(self):
+        return self.cooc.nnz > 0
+
+    @classmethod
+    def from_baskets(cls, baskets: Iterable[Sequence[str]],
+                     weights: Optional[Sequence[float]] = None) -> "PairStats":
+        """
+        Build from item lists, one per transaction. `weights` gives the
+        multiplicity of each basket (see compress_baskets), defaults to 1.
+        """
+        stats = cls()
+        baskets = [b if isinstance(b, (list, tuple, set)) else [] for b in baskets]
+
+        lengths = np.fromiter((len(b) for b in baskets), dtype=np.int64, count=len(baskets))
+        index = stats.item_index
+        codes = np.fromiter(
+            (index.setdefault(str(i).lower(), len(index)) for i in chain.from_iterable(baskets)),
+            dtype=np.int64,
+            count=int(lengths.sum())
+        )
+        stats.items = list(index)
+
+        rows = np.repeat(np.arange(len(baskets)), lengths)
+        x = sparse.csr_matrix(
+            (np.ones(len(codes)), (rows, codes)),
+            shape=(len(baskets), len(index))
+        )
+        # Duplicate items inside one basket must only count once
+        x.sum_duplicates()
+        x.data[:] = 1.0
+
+        if weights is None:
+            stats.n_tx = float(len(baskets))
+            cooc = (x.T @ x).tocsr()
+        else:
+            w = np.asarray(weights, dtype=np.float64)
+            stats.n_tx = float(w.sum())
+            cooc = (x.T @ sparse.diags(w) @ x).tocsr()
+        stats.item_counts = cooc.diagonal().astype(np.float64)
+        cooc.setdiag(0)
+        cooc.eliminate_zeros()
+        stats.cooc = cooc
+        return stats
+
+    # ------------------------------------------------------------------
+    # METRICS
+    # ------------------------------------------------------------------
+    @property
+    def item_support(self) -> Dict[str, float]:
+        n = self.n_tx or 1.0
+        return dict(zip(self.items, (self.item_counts / n).tolist()))
+
+    def pair_count(self, a: str, b: str) -> float:
+        ia = self.item_index.get(a)
+        ib = self.item_index.get(b)
+        if ia is None or ib is None:
+            return 0.0
+        return float(self.cooc[ia, ib])
+
+    def confidence(self, a: str, b: str) -> float:
+        """P(b | a)"""
+        ia = self.item_index.get(a)
+        if ia is None or self.item_counts[ia] == 0:
+            return 0.0
+        return self.pair_count(a, b) / self.item_counts[ia]
+
+    def lift(self, a: str, b: str) -> float:
+        ib = self.item_index.get(b)
+        if ib is None or self.item_counts[ib] == 0:
+            return 0.0
+        return self.confidence(a, b) / (self.item_counts[ib] / self.n_tx)
+
+    def row(self, product: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All partners of `product` as (partner_indices, confidence, lift)
+        arrays, computed with vectorized ops over one sparse row.
+        """
+        ia = self.item_index.get(product)
+        empty = np.zeros(0)
+        if ia is None or self.item_counts[ia] == 0:
+            return empty.astype(np.int64), empty, empty
+
+        start, end = self.cooc.indptr[ia], self.cooc.indptr[ia + 1]
+        partners = self.cooc.indices[start:end]
+        counts = self.cooc.data[start:end]
+
+        conf = counts / self.item_counts[ia]
+        lift = conf / (self.item_counts[partners] / self.n_tx)
+        return partners, conf, lift
+
+    def associations_for(self, product: str, min_conf: float = 0.05) -> List[Tuple[str, float]]:
+        """(other_item, confidence_percent) sorted by confidence descending."""
+        partners, conf, _ = self.row(product)
+        keep = conf >= min_conf
+        partners, conf = partners[keep], conf[keep]
+        order = np.argsort(-conf, kind="stable")
+        return [(self.items[partners[k]], float(conf[k]) * 100.0) for k in order]
+
+    def pair_confidence(self) -> Dict[Tuple[str, str], float]:
+        """Expand to the old {(a, b): P(b|a)} dict. Only for small data."""
+        coo = self.cooc.tocoo()
+        conf = coo.data / self.item_counts[coo.row]
+        return {
+            (self.items[a], self.items[b]): float(c)
+            for a, b, c in zip(coo.row.tolist(), coo.col.tolist(), conf.tolist())
+        }
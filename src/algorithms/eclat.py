@@ -1,9 +1,11 @@
 import pandas as pd
-from preprocessing import clean_data
 import formulas
+from spill import SpillDict, entries_for_budget, ITEMSET_ENTRY_BYTES
+from tidsets import Tidset, intersect_all
 from itertools import combinations
 import time
 import math
+import numpy as np
 from memory_profiler import memory_usage
 
 
@@ -42,10 +44,34 @@ def to_vertical(data):
     return new_df
 
 
-def eclat(data, minimum_support=0.2, minimum_confidence=0.5):
+#Support to give eclat() so that it keeps every itemset with count / total >= minimum_support,
+#the apriori() test. Eclat keeps single items with count > ceil(total*s) and larger itemsets with
+#count >= ceil(total*s); mining at (ceil(total*s) - 1) / total makes the first exactly
+#count >= ceil(total*s) and the second a superset, so filter the result by count / total afterwards
+def inclusive_support(minimum_support, total):
+    if not total:
+        return minimum_support
+    minimum = math.ceil(total*minimum_support)
+    support = max(minimum - 1, 0) / total
+    #(c - 1) / total * total can round above c - 1, step down until ceil() gives c - 1 again
+    while support > 0 and math.ceil(total*support) > minimum - 1:
+        support = math.nextafter(support, 0)
+    return support
+
+
+#memory_budget_mb bounds how many frequent itemsets are held in memory, the rest are spilled to disk,
+#and the rule splits built at once, see formulas.build_rules
+#return_itemsets skips rule generation and returns ({sorted itemset: support count}, total)
+def eclat(data, minimum_support=0.2, minimum_confidence=0.5, candidate_filter=None, memory_budget_mb=None, rules_path=None, return_itemsets=False):
     start_time = time.time()
+    #Compressed baskets carry a weight, a tid then counts that many times
+    weights = dict(zip(data['transaction_id'], data['weight'])) if 'weight' in data.columns else None
+
+    def count(tids):
+        return len(tids) if weights is None else int(sum(weights[t] for t in tids))
+
     data = to_vertical(data)
-    supported_sets = {}
+    supported_sets = SpillDict(entries_for_budget(memory_budget_mb, ITEMSET_ENTRY_BYTES))
     frequent_items = dict()
     transaction_count = set()
     n_size = 1
@@ -56,61 +82,69 @@ def eclat(data, minimum_support=0.2, minimum_confidence=0.5):
         for person in row['Customers']:
             transaction_count.add(person)
     
-    total = len(transaction_count)
+    total = count(transaction_count)
     items_list = data['Item'].tolist()
 
     minimum = math.ceil(total*minimum_support)
+
+    #Tidsets hold transaction positions, sparse items as sorted arrays and dense ones as bitmaps
+    positions = {tid: k for k, tid in enumerate(transaction_count)}
+    n_tx = len(positions)
+    position_weights = None
+    if weights is not None:
+        position_weights = np.zeros(n_tx, dtype=np.int64)
+        for tid, k in positions.items():
+            position_weights[k] = weights[tid]
+
+    def tidset_count(tidset):
+        if position_weights is None:
+            return len(tidset)
+        return int(position_weights[tidset.to_array()].sum())
     
     for index, rows in data.iterrows():
         cust = rows['Customers']
-        if len(cust) > minimum:
-            frequent_items[rows['Item']] = set(rows['Customers'])
+        if count(cust) > minimum:
+            frequent_items[rows['Item']] = Tidset.from_positions([positions[t] for t in cust], n_tx)
           
 
 
     if len(frequent_items) == 0:
         return -1
     
-    supported_sets.update(frequent_items)
+    #Only the single item tidsets are needed for intersections, every found set just keeps its count
+    for item, tids in frequent_items.items():
+        supported_sets[(item,)] = tidset_count(tids)
 
     while found_sets_this_cycle != 0:
         n_size+=1
         found_sets_this_cycle = 0
-        set_candidate = list(combinations(frequent_items, n_size))
-        found_sets = {}
+        #Generated lazily so a level's candidates are never all in memory at once
+        set_candidate = combinations(frequent_items, n_size)
+
+        #Optional pruning hook, e.g. skip itemsets whose category rollup is infrequent
+        if candidate_filter is not None:
+            set_candidate = (itemset for itemset in set_candidate if candidate_filter(itemset))
 
         for itemset in set_candidate:
             set_pool = []
             for item in itemset:
                 set_pool.append(frequent_items[item])
-            intersects = set.intersection(*set_pool)
-            if len(intersects) >= minimum:
+            intersects = intersect_all(set_pool)
+            support_count = tidset_count(intersects)
+            #At support 0 minimum is 0, never keep itemsets no transaction holds
+            if support_count >= minimum and support_count:
 
-                found_sets[itemset] = intersects
+                supported_sets[itemset] = support_count
                 found_sets_this_cycle+=1
 
-        
-        if found_sets_this_cycle!= 0:
-            found_items = []
-            supported_sets.update(found_sets)
-            for sets in found_sets:
-                for items in sets:
-                    found_items.append(items)
-            found_items =  list(set(found_items))
-   
-
-
-
-    normalized_sets = {}
-    for k, v in supported_sets.items():
-        if isinstance(k, str):
-            normalized_sets[(k,)] = v  # wrap single string in a tuple
-        else:
-            normalized_sets[k] = v
-
-    supported_sets = normalized_sets  # replace the old dictionary
+    #Spilled itemsets are returned as the SpillDict itself instead of being read back into memory
+    if return_itemsets:
+        return supported_sets.unwrap(), total
 
-    ret = formulas.generate_all_rules_eclat(minimum_confidence, supported_sets, total)
+    ret = formulas.build_rules(minimum_confidence, supported_sets, total, memory_budget_mb, rules_path)
+    if supported_sets.spilled:
+        print(f'Eclat spilled {supported_sets.spilled} itemsets to disk')
+    supported_sets.close()
 
     end_time = time.time()
     elapsed_time_ms = (end_time - start_time) * 1000
@@ -0,0 +1,282 @@
+import argparse
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+if __name__ == '__main__':
+    #Run as a script: put src/ on the path for the algorithms package
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+#Imported the way the UI and the session store import it, so there is one PairStats class
+from algorithms.cooccurrence import PairStats
+from miners import choose_engine, dataset_stats
+from spill import CANDIDATE_BYTES, ITEMSET_ENTRY_BYTES, entries_for_budget
+from tidsets import DENSE_THRESHOLD
+
+
+# ----------------------------------------------------------------------
+# COST MODEL
+# ----------------------------------------------------------------------
+#Seconds per unit of work, measured on the sample data. Absolute numbers vary by machine,
+#the plan is meant for comparing engines and thresholds and for catching runaway settings
+WALK_SECONDS = 0.6e-6          #Apriori: one step of a transaction through the candidate trie
+CANDIDATE_SECONDS = 1.5e-6     #Apriori: building and checking one candidate
+VERTICAL_SECONDS = 28e-6       #Eclat: one (item, row) check while building the vertical layout
+INTERSECT_SECONDS = 15e-6      #Eclat: intersecting the tidsets of one candidate
+RULE_SECONDS = 2e-6            #Scoring one antecedent/consequent split
+
+ROW_BYTES = 56                 #Encoded transaction tuple, plus 8 bytes per item
+TID_BYTES = 8                  #One tid in a Python list of the vertical layout
+
+#Stop estimating once a level holds this many itemsets, the thresholds are clearly too low
+MAX_ESTIMATED_ITEMSETS = 200000
+
+ENGINES = ('apriori', 'eclat')
+
+#Supports tried by suggest_support
+SUPPORT_STEPS = (0.005, 0.01, 0.02, 0.03, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5)
+
+
+class MiningPlan:
+    """
+    Projected work for mining `data` at the given thresholds with every
+    engine, estimated from exact single item and pair counts.
+
+    levels: one dict per itemset size with 'frequent' (exact for sizes 1
+    and 2, estimated above) and 'candidates' per engine. engines: projected
+    'seconds' and 'memory_bytes' per engine. rules: expected rule count.
+    """
+
+    def __init__(self, minimum_support, minimum_confidence, stats, levels, engines, rules, truncated):
+        self.minimum_support = minimum_support
+        self.minimum_confidence = minimum_confidence
+        self.stats = stats
+        self.levels = levels
+        self.engines = engines
+        self.rules = rules
+        self.truncated = truncated
+        self.auto_engine = choose_engine(stats)
+
+    @property
+    def recommended(self):
+        """Engine with the lowest projected runtime."""
+        return min(self.engines, key=lambda name: self.engines[name]['seconds'])
+
+    @property
+    def frequent_itemsets(self):
+        return sum(level['frequent'] for level in self.levels)
+
+    def fits(self, max_seconds=None, max_memory_mb=None, engine=None):
+        """Whether `engine` (default: the recommended one) stays inside the limits."""
+        if self.truncated:
+            return False
+        cost = self.engines[engine or self.recommended]
+        if max_seconds is not None and cost['seconds'] > max_seconds:
+            return False
+        if max_memory_mb is not None and cost['memory_bytes'] > max_memory_mb * 1024 * 1024:
+            return False
+        return True
+
+    def summary(self):
+        lines = [
+            f"Plan for support {self.minimum_support:g}, confidence {self.minimum_confidence:g} "
+            f"({self.stats['transactions']} transactions, {self.stats['items']} items)",
+        ]
+        for level in self.levels:
+            kind = 'exact' if level['exact'] else 'estimated'
+            candidates = ', '.join(f"{name} {count}" for name, count in level['candidates'].items())
+            lines.append(f"  size {level['size']}: {level['frequent']} frequent ({kind}); candidates {candidates}")
+        if self.truncated:
+            lines.append(f"  stopped estimating at {MAX_ESTIMATED_ITEMSETS} itemsets in one level, "
+                         f"support is far too low")
+        lines.append(f"  expected rules: {self.rules}")
+        for name, cost in self.engines.items():
+            lines.append(f"  {name}: ~{cost['seconds']:.1f} s, ~{cost['memory_bytes'] / 1024 / 1024:.1f} MB")
+        lines.append(f"  fastest: {self.recommended}, auto would pick {self.auto_engine}")
+        return '\n'.join(lines)
+
+
+# ----------------------------------------------------------------------
+# ESTIMATION
+# ----------------------------------------------------------------------
+def _estimate_levels(pairs, minimum_count, frequent_items):
+    """
+    Estimated frequent itemsets above size 2. An itemset X + j is only kept
+    when every pair with j is frequent, and its support is estimated as
+    sup(X) * max conf(x -> j), capped by the smallest pair support.
+    Returns ([count per size from 3 up], [distinct items per size], truncated).
+    """
+    counts = pairs.cooc.tocsr()
+    item_counts = pairs.item_counts
+    frequent = sorted(frequent_items)
+    neighbours = {}
+    for i in frequent:
+        start, end = counts.indptr[i], counts.indptr[i + 1]
+        row = dict(zip(counts.indices[start:end].tolist(), counts.data[start:end].tolist()))
+        neighbours[i] = {j: c for j, c in row.items() if j > i and c >= minimum_count}
+
+    level = {}
+    for i in frequent:
+        for j, c in neighbours[i].items():
+            level[(i, j)] = c
+
+    sizes, items = [], []
+    while level:
+        next_level = {}
+        for itemset, support in level.items():
+            for j in neighbours[itemset[-1]]:
+                pair_counts = [neighbours[x].get(j) for x in itemset]
+                if any(c is None for c in pair_counts):
+                    continue
+                confidence = max(c / item_counts[x] for x, c in zip(itemset, pair_counts))
+                estimate = min(support * confidence, min(pair_counts))
+                if estimate >= minimum_count:
+                    next_level[itemset + (j,)] = estimate
+            if len(next_level) > MAX_ESTIMATED_ITEMSETS:
+                return sizes, items, True
+        if next_level:
+            sizes.append(len(next_level))
+            items.append(len({i for key in next_level for i in key}))
+        level = next_level
+    return sizes, items, False
+
+
+def explain(data, minimum_support=0.2, minimum_confidence=0.5, memory_budget_mb=None, pair_stats=None):
+    """
+    Dry run: project candidates, frequent itemsets, rules, runtime and
+    memory for every engine without mining. Only needs one sparse pair
+    count (pass `pair_stats` to reuse one across calls).
+    """
+    stats = dataset_stats(data)
+    baskets = data['items'].tolist()
+    weights = data['weight'].to_numpy() if 'weight' in data.columns else None
+    if pair_stats is None:
+        pair_stats = PairStats.from_baskets(baskets, weights)
+    total = pair_stats.n_tx
+    rows = len(baskets)
+    minimum_count = minimum_support * total
+
+    #Apriori keeps items with count >= s*n, Eclat's single items need count > ceil(s*n)
+    item_counts = pair_stats.item_counts
+    frequent = {i for i, c in enumerate(item_counts) if total and c >= minimum_count}
+    eclat_singles = sum(1 for c in item_counts if c > math.ceil(total * minimum_support))
+
+    coo = pair_stats.cooc.tocoo()
+    upper = coo.row < coo.col
+    pair_support = coo.data[upper]
+    frequent_pairs = int((pair_support >= minimum_count).sum())
+    pair_items = len(set(coo.row[upper][pair_support >= minimum_count].tolist())
+                     | set(coo.col[upper][pair_support >= minimum_count].tolist()))
+
+    #Pair rules are exact, larger itemsets assume the same share of confident splits
+    keep = pair_support >= minimum_count
+    rows_idx, cols_idx, joint = coo.row[upper][keep], coo.col[upper][keep], pair_support[keep]
+    pair_rules = int((joint / item_counts[rows_idx] >= minimum_confidence).sum()
+                     + (joint / item_counts[cols_idx] >= minimum_confidence).sum())
+    confident_share = pair_rules / (2 * frequent_pairs) if frequent_pairs else 0.0
+
+    higher, higher_items, truncated = _estimate_levels(pair_stats, minimum_count, frequent)
+    frequent_by_size = [len(frequent), frequent_pairs] + higher if frequent else []
+    items_by_size = [len(frequent), pair_items] + higher_items
+
+    #Each engine also generates the first level that turns out empty
+    apriori_candidates = [len(item_counts)]
+    eclat_candidates = [stats['items']]
+    for k in range(2, len(frequent_by_size) + 2):
+        if k - 2 >= len(frequent_by_size) or not frequent_by_size[k - 2]:
+            break
+        apriori_candidates.append(math.comb(items_by_size[k - 2], k))
+        eclat_candidates.append(math.comb(eclat_singles, k))
+
+    levels = []
+    for k in range(1, max(len(apriori_candidates), len(eclat_candidates)) + 1):
+        levels.append({
+            'size': k,
+            'frequent': frequent_by_size[k - 1] if k <= len(frequent_by_size) else 0,
+            'exact': k <= 2,
+            'candidates': {
+                'apriori': apriori_candidates[k - 1] if k <= len(apriori_candidates) else 0,
+                'eclat': eclat_candidates[k - 1] if k <= len(eclat_candidates) else 0,
+            },
+        })
+
+    rules = pair_rules + int(round(sum(
+        count * (2 ** size - 2) * confident_share
+        for size, count in enumerate(frequent_by_size[2:], start=3)
+    )))
+    splits = sum(count * (2 ** size - 2) for size, count in enumerate(frequent_by_size, start=1) if size > 1)
+    found_bytes = sum(frequent_by_size) * ITEMSET_ENTRY_BYTES
+
+    #Apriori: every level walks each transaction over its frequent items
+    frequent_lengths = np.array([sum(1 for item in set(map(str.lower, b)) if pair_stats.item_index.get(item) in frequent)
+                                 for b in baskets], dtype=np.int64)
+    rows_of_length = np.bincount(frequent_lengths) if len(frequent_lengths) else np.zeros(1, dtype=np.int64)
+    walk = sum(float(rows_of_length[length]) * math.comb(length, k)
+               for k in range(1, len(apriori_candidates) + 1)
+               for length in np.flatnonzero(rows_of_length).tolist())
+    budget = entries_for_budget(memory_budget_mb, CANDIDATE_BYTES)
+    largest_level = max(apriori_candidates[1:], default=0)
+    passes = sum(math.ceil(c / budget) if budget else 1 for c in apriori_candidates)
+    apriori_seconds = (walk * WALK_SECONDS * max(1.0, passes / len(apriori_candidates))
+                       + sum(apriori_candidates) * CANDIDATE_SECONDS + splits * RULE_SECONDS)
+    apriori_bytes = (rows * ROW_BYTES + int(sum(len(b) for b in baskets)) * 8
+                     + min(largest_level, budget or largest_level) * CANDIDATE_BYTES + found_bytes)
+
+    #Eclat: the vertical layout, one compact tidset per frequent item, lazy candidates
+    tidset_bytes = sum(min(4 * c, rows / 8) if c >= DENSE_THRESHOLD * rows else 4 * c
+                       for c in item_counts if c > math.ceil(total * minimum_support))
+    eclat_seconds = (stats['items'] * rows * VERTICAL_SECONDS
+                     + sum(eclat_candidates[1:]) * INTERSECT_SECONDS + splits * RULE_SECONDS)
+    eclat_bytes = int(sum(len(b) for b in baskets)) * TID_BYTES + int(tidset_bytes) + found_bytes
+
+    engines = {
+        'apriori': {'seconds': apriori_seconds, 'memory_bytes': int(apriori_bytes)},
+        'eclat': {'seconds': eclat_seconds, 'memory_bytes': int(eclat_bytes)},
+    }
+    return MiningPlan(minimum_support, minimum_confidence, stats, levels, engines, rules, truncated)
+
+
+def suggest_support(data, minimum_confidence=0.5, max_seconds=None, max_memory_mb=None, engine=None,
+                    supports=SUPPORT_STEPS):
+    """Lowest support in `supports` whose plan fits the limits, as (support, plan); (None, None) if none does."""
+    baskets = data['items'].tolist()
+    weights = data['weight'].to_numpy() if 'weight' in data.columns else None
+    pair_stats = PairStats.from_baskets(baskets, weights)
+    for support in sorted(supports):
+        plan = explain(data, support, minimum_confidence, pair_stats=pair_stats)
+        if plan.fits(max_seconds, max_memory_mb, engine):
+            return support, plan
+    return None, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Estimate the cost of mining a cleaned transaction CSV.')
+    parser.add_argument('transactions', help='cleaned transaction CSV (see partitioned.read_partition)')
+    parser.add_argument('--min-support', type=float, default=0.2)
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--max-seconds', type=float, default=None)
+    parser.add_argument('--max-memory-mb', type=float, default=None)
+    parser.add_argument('--engine', choices=ENGINES, default=None)
+    args = parser.parse_args(argv)
+
+    from partitioned import read_partition
+    data = read_partition(args.transactions)
+    plan = explain(data, args.min_support, args.min_confidence)
+    print(plan.summary())
+
+    #Non-zero exit so batch jobs can refuse settings that don't fit
+    if not plan.fits(args.max_seconds, args.max_memory_mb, args.engine):
+        higher = [s for s in SUPPORT_STEPS if s > args.min_support]
+        support, _ = suggest_support(data, args.min_confidence, args.max_seconds, args.max_memory_mb,
+                                     args.engine, supports=higher)
+        if support is not None:
+            print(f'Over the limits, support {support:g} would fit')
+        else:
+            print('Over the limits')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
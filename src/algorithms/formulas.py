@@ -1,8 +1,12 @@
 from itertools import combinations
+import numpy as np
 import pandas as pd
+from pathlib import Path
+import rule_format
+from spill import chunked, entries_for_budget, RULE_SPLIT_BYTES
 
 
-products = pd.read_csv('../../data/products.csv')
+products = pd.read_csv(Path(__file__).resolve().parent.parent.parent / 'data' / 'products.csv')
 
 #Assotiation Rule Class, -1 means unknown/not calculated
 #Try to keep even first and second as lists even if 1 item
@@ -28,6 +32,17 @@ class AssociationRule:
             self.confidence = confidence_eclat(self, data, total)
             self.lift = lift_eclat(self, data, total)
 
+    #Build a rule with already known metrics, e.g. when loading saved rules
+    @classmethod
+    def from_metrics(cls, first, second, support, confidence, lift):
+        rule = cls.__new__(cls)
+        rule.first = {first} if isinstance(first, str) else set(first)
+        rule.second = {second} if isinstance(second, str) else set(second)
+        rule.support = support
+        rule.confidence = confidence
+        rule.lift = lift
+        return rule
+
     def __str__(self):
         return f'{self.first} -> {self.second}'
     
@@ -68,7 +83,9 @@ def lift_apiori(data, rule: AssociationRule):
 #Accepts both rules and itemsets
 def support_apiori(data, itemset):
     amount = 0
-    total = data.shape[0]
+    #Compressed baskets carry a weight, every row counts that many times
+    weighted = 'weight' in data.columns
+    total = data['weight'].sum() if weighted else data.shape[0]
     not_found = False
 
     if isinstance(itemset, AssociationRule):
@@ -83,7 +100,7 @@ def support_apiori(data, itemset):
                     not_found = True
                     break
         if not not_found:
-            amount += 1
+            amount += row['weight'] if weighted else 1
     return amount / total
 
 
@@ -94,7 +111,9 @@ def support_eclat(itemset: tuple, found_sets: dict, total: int ) -> float:
         itemset = tuple(itemset)
 
     itemset = tuple(sorted(itemset))
-    dividend = len(found_sets[itemset])
+    #found_sets values can be tidsets or plain support counts
+    found = found_sets[itemset]
+    dividend = found if isinstance(found, int) else len(found)
     
     return dividend/total
 
@@ -118,64 +137,109 @@ def lift_eclat(rule: AssociationRule, found_sets: dict, total: int) -> float:
     return dividend/divisor
 
 
+#Batch metrics for many candidate rules at once. Inputs are arrays of supports
+#(fractions), or raw counts when total is given
+def batch_metrics(antecedent_support, consequent_support, joint_support, total=None):
+    antecedent_support = np.asarray(antecedent_support, dtype=np.float64)
+    consequent_support = np.asarray(consequent_support, dtype=np.float64)
+    joint_support = np.asarray(joint_support, dtype=np.float64)
+
+    if total is not None:
+        antecedent_support = antecedent_support / total
+        consequent_support = consequent_support / total
+        joint_support = joint_support / total
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        confidence = np.where(antecedent_support > 0, joint_support / antecedent_support, 0.0)
+        lift = np.where(consequent_support > 0, confidence / consequent_support, 0.0)
+        leverage = joint_support - antecedent_support * consequent_support
+        #Conviction is infinite for rules that always hold
+        conviction = np.where(confidence < 1, (1 - consequent_support) / (1 - confidence), np.inf)
+
+    return {
+        'support': joint_support,
+        'confidence': confidence,
+        'lift': lift,
+        'leverage': leverage,
+        'conviction': conviction,
+    }
+
+
+#Boolean mask of rules passing every given threshold
+def rule_mask(metrics, minimum_support=None, minimum_confidence=None, minimum_lift=None,
+              minimum_leverage=None, minimum_conviction=None):
+    mask = np.ones(len(metrics['support']), dtype=bool)
+    for name, minimum in (('support', minimum_support), ('confidence', minimum_confidence),
+                          ('lift', minimum_lift), ('leverage', minimum_leverage),
+                          ('conviction', minimum_conviction)):
+        if minimum is not None:
+            mask &= metrics[name] >= minimum
+    return mask
+
+
+#Every (antecedent, consequent) split of a sorted itemset
+def rule_splits(key):
+    for i in range(1, len(key)):
+        for combo in combinations(key, i):
+            yield combo, tuple(item for item in key if item not in combo)
+
+
+#Rules from {sorted itemset tuple: tidset or support count}. Every split of every frequent
+#itemset is a candidate; metrics are computed per batch of splits and filtered with a mask
+def generate_rules_from_counts(minimum_confidence, found_sets, total, batch_size=None):
+    rules = set()
+    for batch in iter_rule_batches(minimum_confidence, found_sets, total, batch_size):
+        rules.update(batch)
+    return rules
+
+
+#The same rules as lists built from at most batch_size candidate splits at a time, so the
+#split and metric arrays stay bounded however many itemsets found_sets holds
+def iter_rule_batches(minimum_confidence, found_sets, total, batch_size=None):
+    def count(key):
+        found = found_sets[key]
+        return found if isinstance(found, int) else len(found)
+
+    def splits():
+        for sets in found_sets:
+            if len(sets) < 2:
+                continue
+            key = tuple(sorted(sets))
+            joint = count(key)
+            for combo, rest in rule_splits(key):
+                yield combo, rest, joint
+
+    for batch in chunked(splits(), batch_size):
+        if not batch:
+            continue
+        firsts, seconds, joint_counts = zip(*batch)
+        metrics = batch_metrics([count(combo) for combo in firsts], [count(rest) for rest in seconds],
+                                joint_counts, total)
+        keep = np.flatnonzero(rule_mask(metrics, minimum_confidence=minimum_confidence))
+        support, confidence, lift = metrics['support'], metrics['confidence'], metrics['lift']
+        yield [
+            AssociationRule.from_metrics(firsts[k], seconds[k], float(support[k]), float(confidence[k]), float(lift[k]))
+            for k in keep
+        ]
+
+
+#Rules for apriori()/eclat(). With a memory budget the splits are processed in bounded batches,
+#and with rules_path as well the batches go straight to the rule file, which is returned
+#memory-mapped instead of a set
+def build_rules(minimum_confidence, found_sets, total, memory_budget_mb=None, rules_path=None):
+    batch_size = entries_for_budget(memory_budget_mb, RULE_SPLIT_BYTES)
+    if rules_path is not None and batch_size is not None:
+        with rule_format.RuleWriter(rules_path) as writer:
+            for batch in iter_rule_batches(minimum_confidence, found_sets, total, batch_size):
+                writer.add(batch)
+        return rule_format.read_rules(rules_path)
+
+    rules = generate_rules_from_counts(minimum_confidence, found_sets, total, batch_size)
+    #Optionally write the rules once in the binary rule format for other consumers
+    if rules_path is not None:
+        rule_format.write_rules(rules_path, rules)
+    return rules
 
 
-def generate_all_rules_apiori(itemsets, minimum_confidence, data):
-    all_sets = set()
-    possible_rules = set()
-    real_rules = set()
-    itemsets[1] = []
-
-    for sets in itemsets.values():
-        for isets in sets:
-            all_sets.add(isets)
-
-    for sets in all_sets:
-        if len(sets) == 2:
-            a, b = tuple(sets)
-            possible_rules.add(AssociationRule({a}, {b}, data))
-            possible_rules.add(AssociationRule({b}, {a}, data))
-        else:
-            i = 2
-
-            while i < len(sets):
-                for combo in combinations(sets, i):
-                    first = set(combo)
-                    second = set(sets) - first
-                
-                    possible_rules.add(AssociationRule(first, second, data))
-                    possible_rules.add(AssociationRule(second, first, data))
-                i+=1
-            
-        for rules in possible_rules:
-            if rules.confidence >= minimum_confidence:
-                real_rules.add(rules)
-        
-    return real_rules
-
 def generate_all_rules_eclat(minimum_confidence, found_sets, total):
-    real_rules = set()
-    possible_rules = set()
-
-    for sets in found_sets:
-        possible_rules = set()
-        if len(sets) == 2:
-        
-            possible_rules.add(AssociationRule(sets[0], sets[1], isVertical=True, total=total, data=found_sets))
-            possible_rules.add(AssociationRule({sets[1]}, {sets[0]}, isVertical=True, total=total, data=found_sets))
-        elif len(sets) > 2:
-            i = 2
-            while i < len(sets):
-                for combo in combinations(sets, i):
-                    first = set(combo)
-                    second = set(sets) - first
-                
-                    possible_rules.add(AssociationRule(first, second, isVertical=True, total=total, data=found_sets))
-                    possible_rules.add(AssociationRule(second, first, isVertical=True, total=total, data=found_sets))
-                i+=1
-
-        for rules in possible_rules:
-            if rules.confidence >= minimum_confidence:
-                real_rules.add(rules)
-    
-    return real_rules
+    return generate_rules_from_counts(minimum_confidence, found_sets, total)
@@ -0,0 +1,160 @@
+from itertools import combinations
+import time
+
+import formulas
+from candidate_trie import CandidateTrie
+
+
+def apriori_gen(frequent, k):
+    """Join (k-1)-itemsets sharing a prefix, keep joins whose (k-1)-subsets are all frequent."""
+    frequent = sorted(frequent)
+    frequent_set = set(frequent)
+    candidates = set()
+    for i in range(len(frequent)):
+        for j in range(i + 1, len(frequent)):
+            a, b = frequent[i], frequent[j]
+            if a[:-1] != b[:-1]:
+                break
+            candidate = a + (b[-1],)
+            if all(sub in frequent_set for sub in combinations(candidate, k - 1)):
+                candidates.add(candidate)
+    return candidates
+
+
+#FUP-style incremental miner: keeps the frequent itemsets and their counts from the last run,
+#counts new candidates in the appended transactions only, and goes back to the old
+#transactions just for itemsets that might newly cross the threshold.
+#An itemset is frequent when count / total >= minimum_support, the same test apriori() uses,
+#so the itemsets and rules match apriori() on all the transactions seen so far.
+#The old transactions are kept as {distinct basket: weight}, so memory grows with distinct
+#baskets, not with transactions. Past max_history distinct baskets the history is dropped and
+#only counts are kept; from then on an itemset that was infrequent is judged on the new
+#transactions alone, so it can be missed (exact turns False) but counts are never overstated
+class IncrementalMiner:
+    def __init__(self, minimum_support=0.2, minimum_confidence=0.5, max_history=None):
+        self.minimum_support = minimum_support
+        self.minimum_confidence = minimum_confidence
+        self.max_history = max_history
+        self.item_ids = {}
+        self.item_names = []
+        self.history = {}
+        self.exact = True
+        self.counts = {}
+        self.total = 0
+        self.last_update = {}
+
+    #Returns (encoded transactions, weight per transaction); compressed baskets carry a weight column
+    def _encode(self, data):
+        if hasattr(data, 'columns'):
+            rows = data['items'].tolist()
+            weights = [int(w) for w in data['weight']] if 'weight' in data.columns else [1] * len(rows)
+        else:
+            rows = list(data)
+            weights = [1] * len(rows)
+        encoded = []
+        for row in rows:
+            ids = set()
+            for item in row:
+                if item not in self.item_ids:
+                    self.item_ids[item] = len(self.item_names)
+                    self.item_names.append(item)
+                ids.add(self.item_ids[item])
+            encoded.append(tuple(sorted(ids)))
+        return encoded, weights
+
+    def _count(self, candidates, transactions, weights):
+        trie = CandidateTrie(candidates)
+        trie.count_all(transactions, weights)
+        return trie.counts()
+
+    def fit(self, data):
+        """Full mine from scratch."""
+        self.item_ids = {}
+        self.item_names = []
+        self.history = {}
+        self.exact = True
+        self.counts = {}
+        self.total = 0
+        return self.update(data)
+
+    def update(self, delta):
+        start_time = time.time()
+        delta_encoded, delta_weights = self._encode(delta)
+        old_total = self.total
+        d = sum(delta_weights)
+        new_total = old_total + d
+        s = self.minimum_support
+
+        stats = {'delta_transactions': len(delta_encoded), 'delta_candidates': 0, 'rescanned_candidates': 0}
+        if d == 0:
+            self.last_update = stats
+            return self
+
+        old_counts = self.counts
+        new_counts = {}
+
+        #Only old frequent items and items seen in the delta can be frequent now
+        candidates = {key for key in old_counts if len(key) == 1}
+        candidates.update((i,) for t in delta_encoded for i in t)
+        k = 1
+
+        while candidates:
+            delta_counts = self._count(candidates, delta_encoded, delta_weights)
+            stats['delta_candidates'] += len(candidates)
+            level = {}
+            need_rescan = []
+
+            for c in candidates:
+                dc = delta_counts[c]
+                if c in old_counts:
+                    count = old_counts[c] + dc
+                    if count / new_total >= s:
+                        level[c] = count
+                elif dc >= s * d:
+                    #Was infrequent before, so it can only be frequent now if it is frequent in the delta
+                    need_rescan.append(c)
+
+            if need_rescan:
+                stats['rescanned_candidates'] += len(need_rescan)
+                old_found = {}
+                if old_total and self.history:
+                    old_found = self._count(need_rescan, list(self.history), list(self.history.values()))
+                for c in need_rescan:
+                    count = old_found.get(c, 0) + delta_counts[c]
+                    if count / new_total >= s:
+                        level[c] = count
+
+            new_counts.update(level)
+            k += 1
+            candidates = apriori_gen(level, k)
+
+        self._remember(delta_encoded, delta_weights)
+        self.counts = new_counts
+        self.total = new_total
+
+        stats['history_baskets'] = len(self.history)
+        stats['exact'] = self.exact
+        stats['elapsed_ms'] = (time.time() - start_time) * 1000
+        self.last_update = stats
+        return self
+
+    def _remember(self, encoded, weights):
+        """Fold the transactions into the basket history, or drop it once it is over max_history."""
+        if not self.exact:
+            return
+        history = self.history
+        for basket, weight in zip(encoded, weights):
+            history[basket] = history.get(basket, 0) + weight
+        if self.max_history is not None and len(history) > self.max_history:
+            self.history = {}
+            self.exact = False
+
+    def frequent_itemsets(self):
+        """{sorted item name tuple: support count}"""
+        names = self.item_names
+        return {tuple(sorted(names[i] for i in key)): count for key, count in self.counts.items()}
+
+    def rules(self):
+        if not self.counts:
+            return -1
+        return formulas.generate_all_rules_eclat(self.minimum_confidence, self.frequent_itemsets(), self.total)
@@ -0,0 +1,223 @@
+import argparse
+import time
+
+import numpy as np
+
+import formulas
+from miners import MINERS, MiningResult, choose_engine, dataset_stats
+
+
+# ----------------------------------------------------------------------
+# FREQUENT ITEMSET LATTICE
+# ----------------------------------------------------------------------
+class ItemsetLattice:
+    """
+    Every frequent itemset at `base_support` with its exact support count,
+    mined once and then queried at any support >= base_support and any
+    confidence without touching the transactions again.
+
+    Itemsets are kept sorted by count, descending, so the itemsets frequent
+    at a support are a prefix found with one binary search. The rule table
+    (every split of every itemset, with its metrics) is built on the first
+    rule query and sorted the same way, so a rule query is a prefix plus a
+    confidence mask. Results match apriori() at the queried thresholds,
+    whichever engine mined the lattice.
+    """
+
+    def __init__(self, itemsets, total, base_support, engine=None, stats=None, requested='auto'):
+        keys = sorted(itemsets, key=lambda key: (-itemsets[key], key))
+        self.keys = [tuple(key) for key in keys]
+        self.counts = np.array([itemsets[key] for key in keys], dtype=np.int64)
+        self.index = {key: position for position, key in enumerate(self.keys)}
+        self.total = total
+        self.base_support = base_support
+        self.engine = engine
+        self.stats = stats or {}
+        self.requested = requested
+        # Support of every itemset computed the way the miners compare it, count / total
+        self._ratios = self.counts / total if total else np.zeros(0)
+        self._rules = None
+
+    @classmethod
+    def mine(cls, data, base_support=0.01, engine='auto'):
+        """Mine `data` once at `base_support` with a registered miner ('auto' picks one)."""
+        stats = dataset_stats(data)
+        name = choose_engine(stats) if engine == 'auto' else engine
+        if name not in MINERS:
+            raise ValueError(f'Unknown miner {name!r}, expected one of {sorted(MINERS)} or auto')
+        #Every registered miner keeps count / total >= base_support, the same itemsets apriori() keeps
+        found = MINERS[name](data, base_support)
+        itemsets, total = ({}, stats['transactions']) if found == -1 else found
+        return cls(itemsets, total, base_support, name, stats, engine)
+
+    def __len__(self):
+        return len(self.keys)
+
+    # ------------------------------------------------------------------
+    # ITEMSET QUERIES
+    # ------------------------------------------------------------------
+    def _frequent(self, minimum_support):
+        """Number of leading itemsets frequent at `minimum_support`."""
+        if minimum_support < self.base_support:
+            raise ValueError(f'Lattice was mined at support {self.base_support:g}, '
+                             f'cannot answer {minimum_support:g}; mine again with a lower base')
+        return int(np.searchsorted(-self._ratios, -minimum_support, side='right'))
+
+    def itemsets(self, minimum_support):
+        """{sorted itemset: count} at `minimum_support`, like miners return."""
+        n = self._frequent(minimum_support)
+        return dict(zip(self.keys[:n], self.counts[:n].tolist()))
+
+    def count_itemsets(self, minimum_support):
+        return self._frequent(minimum_support)
+
+    # ------------------------------------------------------------------
+    # RULE QUERIES
+    # ------------------------------------------------------------------
+    def _rule_table(self):
+        """Every split of every itemset as arrays, in itemset order (so by joint count, descending)."""
+        if self._rules is not None:
+            return self._rules
+        index = self.index
+        source, antecedent, consequent = [], [], []
+        for position, key in enumerate(self.keys):
+            if len(key) < 2:
+                continue
+            for combo, rest in formulas.rule_splits(key):
+                source.append(position)
+                antecedent.append(index[combo])
+                consequent.append(index[rest])
+
+        source = np.asarray(source, dtype=np.int64)
+        antecedent = np.asarray(antecedent, dtype=np.int64)
+        consequent = np.asarray(consequent, dtype=np.int64)
+        counts = self.counts
+        metrics = formulas.batch_metrics(counts[antecedent], counts[consequent], counts[source], self.total)
+        self._rules = {
+            'source': source,
+            'antecedent': antecedent,
+            'consequent': consequent,
+            'support': metrics['support'],
+            'confidence': metrics['confidence'],
+            'lift': metrics['lift'],
+        }
+        return self._rules
+
+    def _rule_positions(self, minimum_support, minimum_confidence):
+        n = self._frequent(minimum_support)
+        table = self._rule_table()
+        #Rules are ordered by source itemset, so the ones from frequent itemsets are a prefix
+        end = int(np.searchsorted(table['source'], n, side='left'))
+        return np.flatnonzero(table['confidence'][:end] >= minimum_confidence)
+
+    def count_rules(self, minimum_support, minimum_confidence):
+        return len(self._rule_positions(minimum_support, minimum_confidence))
+
+    def rules(self, minimum_support, minimum_confidence):
+        """The rule set generate_rules_from_counts would build at these thresholds."""
+        table = self._rule_table()
+        keys = self.keys
+        return {
+            formulas.AssociationRule.from_metrics(
+                keys[table['antecedent'][k]], keys[table['consequent'][k]],
+                float(table['support'][k]), float(table['confidence'][k]), float(table['lift'][k])
+            )
+            for k in self._rule_positions(minimum_support, minimum_confidence)
+        }
+
+    def result(self, minimum_support, minimum_confidence):
+        """MiningResult at these thresholds; mine_ms is 0, rules_ms is the filtering time."""
+        start_time = time.time()
+        itemsets = self.itemsets(minimum_support)
+        rules = self.rules(minimum_support, minimum_confidence)
+        rules_ms = (time.time() - start_time) * 1000
+        return MiningResult(self.engine or 'lattice', itemsets, self.total, rules, 0.0, rules_ms,
+                            self.stats, self.requested)
+
+    def sweep(self, supports, confidences):
+        """{(support, confidence): (itemsets, rules)} for every combination."""
+        return {
+            (support, confidence): (self.count_itemsets(support), self.count_rules(support, confidence))
+            for support in supports
+            for confidence in confidences
+        }
+
+    # ------------------------------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------------------------------
+    def save(self, path):
+        """Write the lattice as .npz: item vocabulary, itemsets as offsets + item ids, counts."""
+        vocab = sorted({item for key in self.keys for item in key})
+        ids = {item: i for i, item in enumerate(vocab)}
+        lengths = np.array([len(key) for key in self.keys], dtype=np.int64)
+        np.savez(
+            path,
+            vocab=np.array(vocab, dtype=str),
+            ends=np.cumsum(lengths),
+            ids=np.array([ids[item] for key in self.keys for item in key], dtype=np.int32),
+            counts=self.counts,
+            total=np.array(self.total),
+            base_support=np.array(self.base_support),
+            engine=np.array(self.engine or ''),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            vocab = saved['vocab'].tolist()
+            ends = saved['ends'].tolist()
+            ids = saved['ids'].tolist()
+            counts = saved['counts'].tolist()
+            itemsets = {}
+            start = 0
+            for end, count in zip(ends, counts):
+                itemsets[tuple(vocab[i] for i in ids[start:end])] = count
+                start = end
+            total = saved['total'].item()
+            return cls(itemsets, total, float(saved['base_support']), str(saved['engine']) or None)
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+def _thresholds(text):
+    return [float(value) for value in text.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mine once, then answer any higher threshold from the lattice.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help='mine a cleaned transaction CSV into a lattice file')
+    build.add_argument('transactions')
+    build.add_argument('lattice', help='output .npz')
+    build.add_argument('--base-support', type=float, default=0.01)
+    build.add_argument('--engine', default='auto')
+
+    query = sub.add_parser('query', help='itemsets and rules at the given thresholds')
+    query.add_argument('lattice')
+    query.add_argument('--min-support', type=_thresholds, default=[0.2], help='one value or a comma list')
+    query.add_argument('--min-confidence', type=_thresholds, default=[0.5], help='one value or a comma list')
+    query.add_argument('--rules', action='store_true', help='print the rules (single thresholds only)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        from partitioned import read_partition
+        start_time = time.time()
+        lattice = ItemsetLattice.mine(read_partition(args.transactions), args.base_support, args.engine)
+        lattice.save(args.lattice)
+        print(f'{len(lattice)} itemsets at support {args.base_support:g} with {lattice.engine} '
+              f'in {(time.time() - start_time) * 1000:.0f} ms')
+        return
+
+    lattice = ItemsetLattice.load(args.lattice)
+    for (support, confidence), (n_itemsets, n_rules) in lattice.sweep(args.min_support, args.min_confidence).items():
+        print(f'support {support:g}, confidence {confidence:g}: {n_itemsets} itemsets, {n_rules} rules')
+    if args.rules and len(args.min_support) == 1 and len(args.min_confidence) == 1:
+        for rule in sorted(lattice.rules(args.min_support[0], args.min_confidence[0]),
+                           key=lambda r: (-r.confidence, str(r))):
+            print(f'{rule}  support {rule.support:.3f}  confidence {rule.confidence:.3f}  lift {rule.lift:.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import time
+
+import formulas
+
+
+# ----------------------------------------------------------------------
+# UNIFORM RESULT
+# ----------------------------------------------------------------------
+class MiningResult:
+    """
+    What every registered miner returns: the frequent itemsets with support
+    counts, the rules built from them and how long each stage took. An empty
+    result (nothing frequent) has no rules instead of the engines' -1.
+    """
+
+    def __init__(self, engine, itemsets, total, rules, mine_ms, rules_ms, stats=None, requested='auto'):
+        self.engine = engine
+        self.requested = requested
+        self.itemsets = itemsets
+        self.total = total
+        self.rules = rules
+        self.mine_ms = mine_ms
+        self.rules_ms = rules_ms
+        self.stats = stats or {}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __bool__(self):
+        return bool(self.itemsets)
+
+    @property
+    def elapsed_ms(self):
+        return self.mine_ms + self.rules_ms
+
+    def summary(self):
+        label = self.engine.capitalize()
+        if self.requested == 'auto':
+            label += ' (auto)'
+        return (f'{label}: {len(self.itemsets)} itemsets, {len(self.rules)} rules in '
+                f'{self.elapsed_ms:.0f} ms (mine {self.mine_ms:.0f} ms, rules {self.rules_ms:.0f} ms)')
+
+    def associations_for(self, product, min_conf=0.0):
+        """[(other item, confidence percent)] from single-item rules product -> item, best first."""
+        found = [
+            (next(iter(r.second)), r.confidence * 100)
+            for r in self.rules
+            if r.first == {product} and len(r.second) == 1 and r.confidence >= min_conf
+        ]
+        found.sort(key=lambda pair: -pair[1])
+        return found
+
+
+# ----------------------------------------------------------------------
+# REGISTRY
+# ----------------------------------------------------------------------
+#name -> function(data, minimum_support) returning ({sorted itemset: count}, total) or -1
+MINERS = {}
+
+
+def register_miner(name, func):
+    MINERS[name] = func
+    return func
+
+
+def _apriori(data, minimum_support):
+    from apiori import apriori
+    return apriori(data, minimum_support, return_itemsets=True)
+
+
+def _eclat(data, minimum_support):
+    from eclat import eclat, inclusive_support
+    #Eclat keeps single items only above ceil(n*s), mine one count lower and cut back to
+    #count / total >= minimum_support so every engine returns what apriori() returns
+    total = dataset_stats(data)['transactions']
+    found = eclat(data, inclusive_support(minimum_support, total), return_itemsets=True)
+    if found == -1:
+        return -1
+    itemsets, total = found
+    itemsets = {key: count for key, count in itemsets.items() if count / total >= minimum_support}
+    return (itemsets, total) if itemsets else -1
+
+
+register_miner('apriori', _apriori)
+register_miner('eclat', _eclat)
+
+
+# ----------------------------------------------------------------------
+# AUTO SELECTION
+# ----------------------------------------------------------------------
+#Trie counting walks C(basket length, k) paths per transaction, so long baskets favour Eclat;
+#Eclat builds one tidset per distinct item, so large catalogues favour Apriori
+LONG_BASKET = 8
+DENSE = 0.25
+MAX_ECLAT_ITEMS = 200
+
+
+def dataset_stats(data):
+    """Transactions (weighted), distinct items, average basket length and density."""
+    rows = data['items'].tolist()
+    weights = [int(w) for w in data['weight']] if 'weight' in data.columns else [1] * len(rows)
+    transactions = sum(weights)
+    items = len({item for row in rows for item in row})
+    avg_len = sum(len(row) * w for row, w in zip(rows, weights)) / transactions if transactions else 0.0
+    return {
+        'transactions': transactions,
+        'rows': len(rows),
+        'items': items,
+        'avg_basket_len': avg_len,
+        'density': avg_len / items if items else 0.0,
+    }
+
+
+def choose_engine(stats):
+    if stats['items'] > MAX_ECLAT_ITEMS:
+        return 'apriori'
+    if stats['avg_basket_len'] >= LONG_BASKET or stats['density'] >= DENSE:
+        return 'eclat'
+    return 'apriori'
+
+
+def mine(data, minimum_support=0.2, minimum_confidence=0.5, engine='auto'):
+    """Run a registered miner ('auto' picks one from dataset_stats) and return a MiningResult."""
+    stats = dataset_stats(data)
+    name = choose_engine(stats) if engine == 'auto' else engine
+    if name not in MINERS:
+        raise ValueError(f'Unknown miner {name!r}, expected one of {sorted(MINERS)} or auto')
+
+    start_time = time.time()
+    found = MINERS[name](data, minimum_support)
+    mine_ms = (time.time() - start_time) * 1000
+
+    if found == -1:
+        return MiningResult(name, {}, stats['transactions'], set(), mine_ms, 0.0, stats, engine)
+
+    itemsets, total = found
+    start_time = time.time()
+    rules = formulas.generate_rules_from_counts(minimum_confidence, itemsets, total)
+    rules_ms = (time.time() - start_time) * 1000
+    return MiningResult(name, itemsets, total, rules, mine_ms, rules_ms, stats, engine)
@@ -0,0 +1,300 @@
+import heapq
+import math
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+# Share of memory_mb for the pair batch hashed into the Count-Min table in one numpy call
+BATCH_SHARE = 0.125
+# One batched pair: first, second and weight (3 x int64), the packed key, and a mixed hash
+# plus a bucket per Count-Min row (2 x depth x int64)
+BATCH_PAIR_BYTES = 32
+BATCH_ROW_BYTES = 16
+MIN_BATCH = 1024
+
+# Rough Python cost of one tracked pair: two dict entries, a heap tuple and two index set entries
+SKETCH_ENTRY_BYTES = 250
+
+_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+                         0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53,
+                         0x94D049BB133111EB, 0xBF58476D1CE4E5B9], dtype=np.uint64)
+
+
+@lru_cache(maxsize=256)
+def _pair_positions(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions (i, j), i < j, of every pair in a basket of n items."""
+    return np.triu_indices(n, 1)
+
+
+# ----------------------------------------------------------------------
+# SPACE-SAVING HEAVY HITTERS
+# ----------------------------------------------------------------------
+class SpaceSaving:
+    """
+    Weighted Space-Saving over at most `capacity` keys.
+
+    When the table is full the key with the smallest counter is replaced and
+    the newcomer inherits that counter as its error. Counters never
+    underestimate, overestimate by at most their error, and any key whose
+    true count exceeds total / capacity is guaranteed to be in the table.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self.counts: Dict[tuple, int] = {}
+        self.errors: Dict[tuple, int] = {}
+        # One entry per tracked key; entries go stale when a count grows and are fixed lazily
+        self._heap: List[Tuple[int, tuple]] = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _pop_min(self) -> Tuple[int, tuple]:
+        heap = self._heap
+        while True:
+            count, key = heap[0]
+            current = self.counts[key]
+            if current == count:
+                heapq.heappop(heap)
+                return count, key
+            heapq.heapreplace(heap, (current, key))
+
+    def add(self, key: tuple, weight: int = 1) -> Optional[tuple]:
+        """Count `key`; returns the key that was evicted to make room, if any."""
+        if key in self.counts:
+            self.counts[key] += weight
+            return None
+        if len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0
+            heapq.heappush(self._heap, (weight, key))
+            return None
+
+        floor, evicted = self._pop_min()
+        del self.counts[evicted]
+        del self.errors[evicted]
+        self.counts[key] = floor + weight
+        self.errors[key] = floor
+        heapq.heappush(self._heap, (floor + weight, key))
+        return evicted
+
+    @property
+    def min_count(self) -> int:
+        """Upper bound on the count of anything not in the table."""
+        if len(self.counts) < self.capacity:
+            return 0
+        count, key = self._pop_min()
+        heapq.heappush(self._heap, (count, key))
+        return count
+
+
+# ----------------------------------------------------------------------
+# BOUNDED-MEMORY PAIR STATISTICS
+# ----------------------------------------------------------------------
+class PairSketch:
+    """
+    Drop-in for PairStats when the number of distinct pairs is too large
+    to hold: item counts stay exact, pair counts go to a Count-Min sketch
+    plus a Space-Saving table of the heaviest pairs. Those two and the
+    batch of pairs waiting to be hashed are sized from `memory_mb`; the
+    item vocabulary and the exact item counts (a float64 array) are extra
+    and grow with the number of distinct items, O(items), never with pairs.
+
+    A pair's count is the smaller of its two overestimates. Partners of a
+    product come from the Space-Saving table, so every pair seen more than
+    pair_total / capacity times is always returned. error_bounds() reports
+    the guarantees for the data seen so far.
+    """
+
+    def __init__(self, memory_mb: float = 8.0, depth: int = 4):
+        if not 1 <= depth <= len(_MULTIPLIERS):
+            raise ValueError(f"depth must be between 1 and {len(_MULTIPLIERS)}")
+        budget = int(memory_mb * 1024 * 1024)
+
+        # BATCH_SHARE for the pair batch, the rest split between Count-Min counters and tracked pairs
+        self.depth = depth
+        batch_budget = int(budget * BATCH_SHARE)
+        self.batch_size = max(MIN_BATCH, batch_budget // (BATCH_PAIR_BYTES + BATCH_ROW_BYTES * depth))
+        rest = budget - batch_budget
+        self.width = max(16, rest // 2 // (depth * 8))
+        self.table = np.zeros((depth, self.width), dtype=np.int64)
+        self.heavy = SpaceSaving(max(1, rest // 2 // SKETCH_ENTRY_BYTES))
+        self.memory_mb = memory_mb
+
+        self.items: List[str] = []
+        self.item_index: Dict[str, int] = {}
+        # Grown by doubling, the first len(item_index) entries are in use
+        self._item_counts = np.zeros(16, dtype=np.float64)
+        self._partners: Dict[int, Set[tuple]] = {}
+        self.n_tx = 0.0
+        self.pair_total = 0
+
+    def __bool__(self):
+        return len(self.heavy) > 0
+
+    @classmethod
+    def from_baskets(cls, baskets: Iterable[Sequence[str]],
+                     weights: Optional[Sequence[float]] = None,
+                     memory_mb: float = 8.0, depth: int = 4) -> "PairSketch":
+        sketch = cls(memory_mb, depth)
+        sketch.add_baskets(baskets, weights)
+        return sketch
+
+    # ------------------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------------------
+    def _hash(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Bucket of every (a, b) pair in each Count-Min row, shape (depth, pairs)."""
+        x = (a.astype(np.uint64) << np.uint64(32)) | b.astype(np.uint64)
+        mixed = x[None, :] * _MULTIPLIERS[:self.depth, None]
+        return ((mixed >> np.uint64(29)) % np.uint64(self.width)).astype(np.int64)
+
+    def add_baskets(self, baskets: Iterable[Sequence[str]], weights: Optional[Sequence[float]] = None):
+        baskets = [b if isinstance(b, (list, tuple, set)) else [] for b in baskets]
+        if weights is None:
+            weights = [1] * len(baskets)
+
+        index = self.item_index
+        batch = self.batch_size
+        firsts = np.empty(batch, dtype=np.int64)
+        seconds = np.empty(batch, dtype=np.int64)
+        pair_weights = np.empty(batch, dtype=np.int64)
+        filled = 0
+        for basket, weight in zip(baskets, weights):
+            weight = int(weight)
+            codes = sorted({index.setdefault(str(i).lower(), len(index)) for i in basket})
+            if len(index) > len(self._item_counts):
+                grown = np.zeros(max(len(index), 2 * len(self._item_counts)), dtype=np.float64)
+                grown[:len(self._item_counts)] = self._item_counts
+                self._item_counts = grown
+            self._item_counts[codes] += weight
+            self.n_tx += weight
+
+            if len(codes) < 2:
+                continue
+            codes = np.asarray(codes, dtype=np.int64)
+            left, right = _pair_positions(len(codes))
+            left, right = codes[left], codes[right]
+            for key in zip(left.tolist(), right.tolist()):
+                self._track(key, weight)
+            # A long basket can fill the batch several times over
+            start = 0
+            while start < len(left):
+                take = min(batch - filled, len(left) - start)
+                firsts[filled:filled + take] = left[start:start + take]
+                seconds[filled:filled + take] = right[start:start + take]
+                pair_weights[filled:filled + take] = weight
+                filled += take
+                start += take
+                if filled == batch:
+                    self._add_pairs(firsts, seconds, pair_weights)
+                    filled = 0
+        self._add_pairs(firsts[:filled], seconds[:filled], pair_weights[:filled])
+        self.items = list(index)
+
+    def _add_pairs(self, firsts: np.ndarray, seconds: np.ndarray, pair_weights: np.ndarray):
+        if not len(firsts):
+            return
+        buckets = self._hash(firsts, seconds)
+        for row in range(self.depth):
+            np.add.at(self.table[row], buckets[row], pair_weights)
+        self.pair_total += int(pair_weights.sum())
+
+    def _track(self, key: tuple, weight: int):
+        evicted = self.heavy.add(key, weight)
+        if evicted is not None:
+            for code in evicted:
+                self._partners[code].discard(evicted)
+        for code in key:
+            self._partners.setdefault(code, set()).add(key)
+
+    # ------------------------------------------------------------------
+    # ESTIMATES
+    # ------------------------------------------------------------------
+    @property
+    def item_counts(self) -> np.ndarray:
+        return self._item_counts[:len(self.item_index)]
+
+    @property
+    def item_support(self) -> Dict[str, float]:
+        n = self.n_tx or 1.0
+        return {item: count / n for item, count in zip(self.items, self._item_counts.tolist())}
+
+    def _estimate(self, keys: List[tuple]) -> np.ndarray:
+        """min(Space-Saving counter, Count-Min estimate), both are upper bounds."""
+        if not keys:
+            return np.zeros(0)
+        a = np.array([k[0] for k in keys])
+        b = np.array([k[1] for k in keys])
+        buckets = self._hash(a, b)
+        cm = self.table[np.arange(self.depth)[:, None], buckets].min(axis=0)
+        floor = self.heavy.min_count
+        ss = np.array([self.heavy.counts.get(k, floor) for k in keys])
+        return np.minimum(cm, ss).astype(np.float64)
+
+    def pair_count(self, a: str, b: str) -> float:
+        ia = self.item_index.get(a)
+        ib = self.item_index.get(b)
+        if ia is None or ib is None or ia == ib:
+            return 0.0
+        return float(self._estimate([(min(ia, ib), max(ia, ib))])[0])
+
+    def confidence(self, a: str, b: str) -> float:
+        """P(b | a), an upper estimate"""
+        ia = self.item_index.get(a)
+        if ia is None or self._item_counts[ia] == 0:
+            return 0.0
+        return self.pair_count(a, b) / self._item_counts[ia]
+
+    def lift(self, a: str, b: str) -> float:
+        ib = self.item_index.get(b)
+        if ib is None or self._item_counts[ib] == 0:
+            return 0.0
+        return self.confidence(a, b) / (self._item_counts[ib] / self.n_tx)
+
+    def row(self, product: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Tracked partners of `product` as (partner_indices, confidence, lift), like PairStats.row."""
+        ia = self.item_index.get(product)
+        empty = np.zeros(0)
+        if ia is None or self._item_counts[ia] == 0:
+            return empty.astype(np.int64), empty, empty
+
+        keys = sorted(self._partners.get(ia, ()))
+        partners = np.array([k[1] if k[0] == ia else k[0] for k in keys], dtype=np.int64)
+        counts = self._estimate(keys)
+        item_counts = self.item_counts
+        conf = np.minimum(counts / item_counts[ia], 1.0) if len(keys) else empty
+        lift = conf / (item_counts[partners] / self.n_tx) if len(keys) else empty
+        return partners, conf, lift
+
+    def associations_for(self, product: str, min_conf: float = 0.05) -> List[Tuple[str, float]]:
+        """(other_item, confidence_percent) sorted by confidence descending."""
+        partners, conf, _ = self.row(product)
+        keep = conf >= min_conf
+        partners, conf = partners[keep], conf[keep]
+        order = np.argsort(-conf, kind="stable")
+        return [(self.items[partners[k]], float(conf[k]) * 100.0) for k in order]
+
+    def error_bounds(self) -> Dict[str, float]:
+        """
+        pair_total: weighted pair occurrences seen
+        heavy_hitter_count: any pair counted more often than this is always tracked
+        max_overcount: largest amount a tracked pair's count can be too high
+        cm_additive_error: Count-Min overestimate bound, holding with probability 1 - cm_delta
+        """
+        epsilon = math.e / self.width
+        return {
+            "pair_total": self.pair_total,
+            "tracked_pairs": len(self.heavy),
+            "capacity": self.heavy.capacity,
+            "heavy_hitter_count": self.pair_total / self.heavy.capacity,
+            "max_overcount": max(self.heavy.errors.values(), default=0),
+            "cm_width": self.width,
+            "cm_depth": self.depth,
+            "cm_epsilon": epsilon,
+            "cm_delta": math.exp(-self.depth),
+            "cm_additive_error": epsilon * self.pair_total,
+            "memory_mb": self.memory_mb,
+        }
@@ -0,0 +1,168 @@
+import argparse
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import formulas
+from candidate_trie import CandidateTrie, encode_transactions
+from eclat import inclusive_support
+
+
+# ----------------------------------------------------------------------
+# PARTITIONS
+# ----------------------------------------------------------------------
+# A partition is a cleaned transaction CSV (transaction_id, items as a comma
+# separated string, optional weight), e.g. what preprocessing/ingest.py --out writes.
+def read_partition(path):
+    data = pd.read_csv(path)
+    data['items'] = [sorted(set(str(items).split(','))) for items in data['items']]
+    return data
+
+
+def split_csv(path, out_dir, rows_per_partition=100000):
+    """Stream a large cleaned CSV into partition files without loading it whole."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index, chunk in enumerate(pd.read_csv(path, chunksize=rows_per_partition)):
+        part = out_dir / f'part-{index:05d}.csv'
+        chunk.to_csv(part, index=False)
+        paths.append(part)
+    return paths
+
+
+def _local_support(engine, minimum_support, n):
+    #Eclat's own threshold would drop items with count == ceil(n*s) that apriori keeps,
+    #inclusive_support lowers it by exactly that one count for a partition of any size
+    if engine == 'eclat':
+        return inclusive_support(minimum_support, n)
+    return minimum_support
+
+
+# ----------------------------------------------------------------------
+# WORKERS
+# ----------------------------------------------------------------------
+def _mine_partition(args):
+    """Pass one: itemsets frequent within a single partition."""
+    path, engine, minimum_support = args
+    data = read_partition(path)
+    n = int(data['weight'].sum()) if 'weight' in data.columns else len(data)
+
+    if engine == 'eclat':
+        from eclat import eclat as mine
+    else:
+        from apiori import apriori as mine
+    found = mine(data, _local_support(engine, minimum_support, n), return_itemsets=True)
+    if found == -1:
+        return set(), n
+    counts, _ = found
+    return set(counts), n
+
+
+def _count_partition(args):
+    """Pass two: exact counts of every global candidate within a single partition."""
+    path, candidates = args
+    data = read_partition(path)
+    weights = [int(w) for w in data['weight']] if 'weight' in data.columns else None
+
+    item_ids = {}
+    for itemset in candidates:
+        for item in itemset:
+            item_ids.setdefault(item, len(item_ids))
+    encoded = encode_transactions(data['items'].tolist(), item_ids)
+
+    by_size = defaultdict(list)
+    for itemset in candidates:
+        by_size[len(itemset)].append(itemset)
+
+    counts = {}
+    for itemsets in by_size.values():
+        trie = CandidateTrie([item_ids[item] for item in itemset] for itemset in itemsets)
+        trie.count_all(encoded, weights)
+        found = trie.counts()
+        for itemset in itemsets:
+            counts[itemset] = found[tuple(sorted(item_ids[item] for item in itemset))]
+
+    total = sum(weights) if weights is not None else len(encoded)
+    return counts, total
+
+
+def _run(func, tasks, workers):
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(func, tasks))
+    return [func(task) for task in tasks]
+
+
+# ----------------------------------------------------------------------
+# SON
+# ----------------------------------------------------------------------
+def son_mine(partitions, minimum_support=0.2, minimum_confidence=0.5, engine='apriori', workers=None, return_itemsets=False):
+    """
+    Savasere-Omiecinski-Navathe two pass mining over on-disk partitions.
+
+    Any globally frequent itemset is frequent in at least one partition, so
+    pass one mines every partition locally with `engine` and unions the
+    results into the candidate set. Pass two reads every partition once more
+    and counts the candidates exactly. Only one partition is in memory per
+    worker, and the data is read exactly twice.
+
+    Returns the same rules as apriori(), -1 when nothing is frequent, or
+    ({sorted itemset: support count}, total) with return_itemsets.
+    """
+    start_time = time.time()
+    partitions = [Path(p) for p in partitions]
+    if not partitions:
+        raise ValueError('No partitions given')
+    workers = workers or min(len(partitions), os.cpu_count() or 1)
+
+    local = _run(_mine_partition, [(p, engine, minimum_support) for p in partitions], workers)
+    candidates = set()
+    for found, _ in local:
+        candidates |= found
+
+    support_counts = {}
+    total = sum(n for _, n in local)
+    if candidates:
+        candidate_list = sorted(candidates)
+        counted = _run(_count_partition, [(p, candidate_list) for p in partitions], workers)
+        totals = defaultdict(int)
+        for counts, _ in counted:
+            for itemset, count in counts.items():
+                totals[itemset] += count
+        support_counts = {itemset: count for itemset, count in totals.items()
+                          if total and count / total >= minimum_support}
+
+    elapsed_time_ms = (time.time() - start_time) * 1000
+    print(f'SON completed in {elapsed_time_ms} ms ({len(partitions)} partitions, {len(candidates)} candidates)')
+
+    if return_itemsets:
+        return support_counts, total
+    if not support_counts:
+        return -1
+    return formulas.generate_rules_from_counts(minimum_confidence, support_counts, total)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mine partitioned transaction CSVs with the SON algorithm.')
+    parser.add_argument('partitions', nargs='+', help='cleaned transaction CSVs, one per partition')
+    parser.add_argument('--min-support', type=float, default=0.2)
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--engine', choices=('apriori', 'eclat'), default='apriori')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rules = son_mine(args.partitions, args.min_support, args.min_confidence, args.engine, args.workers)
+    if rules == -1:
+        print('No frequent itemsets')
+        return
+    for rule in sorted(rules, key=lambda r: -r.confidence):
+        print(rule)
+
+
+if __name__ == '__main__':
+    main()
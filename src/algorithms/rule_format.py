@@ -0,0 +1,353 @@
+import argparse
+import hashlib
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+# BINARY RULE FORMAT
+# ----------------------------------------------------------------------
+# Layout (little-endian, every section starts on an 8 byte boundary):
+#
+#   header       MAGIC, version, n_items, n_rules, catalog fingerprint,
+#                section offsets
+#   items        item names, utf-8, concatenated
+#   item_offsets int64[n_items + 1]  item k is items[off[k]:off[k+1]]
+#   ante_offsets int64[n_rules + 1]  rule i uses ante_ids[off[i]:off[i+1]]
+#   ante_ids     int32[...]
+#   cons_offsets int64[n_rules + 1]
+#   cons_ids     int32[...]
+#   support      float64[n_rules]
+#   confidence   float64[n_rules]
+#   lift         float64[n_rules]
+#
+# Readers memory-map the file, so opening it costs the same for ten rules
+# or ten million. Item names are stored by offset, so any name (even one
+# with a newline) round-trips. Version 1 files kept names newline separated
+# without item_offsets and are still read.
+#
+# apriori()/eclat() write it when given rules_path (batch by batch through
+# RuleWriter when they also have a memory budget); the recommendation
+# service reads it with --rules-file and the CLI below prints it. The
+# desktop UI does not read or write it.
+
+MAGIC = b"DMRULES\0"
+VERSION = 2
+SECTIONS = ("items", "item_offsets", "ante_offsets", "ante_ids", "cons_offsets", "cons_ids",
+            "support", "confidence", "lift")
+HEADER = struct.Struct("<8sHHIQ16s" + "Q" * len(SECTIONS))
+V1_SECTIONS = tuple(name for name in SECTIONS if name != "item_offsets")
+V1_HEADER = struct.Struct("<8sHHIQ16s" + "Q" * len(V1_SECTIONS))
+PREFIX = struct.Struct("<8sH")
+
+
+def find_products_csv():
+    here = Path(__file__).resolve()
+    for parent in [here] + list(here.parents):
+        candidate = parent / "data" / "products.csv"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def catalog_fingerprint(product_names=None) -> bytes:
+    """16 byte hash of the sorted, lower-cased product catalog."""
+    if product_names is None:
+        path = find_products_csv()
+        if path is None:
+            return bytes(16)
+        import pandas as pd
+        product_names = pd.read_csv(path)["product_name"].tolist()
+    names = sorted({str(n).strip().lower() for n in product_names})
+    return hashlib.sha256("\n".join(names).encode("utf-8")).digest()[:16]
+
+
+def _pad(n: int) -> int:
+    return (8 - n % 8) % 8
+
+
+def _section_offsets(sizes):
+    """Start of every section after the header, each on an 8 byte boundary."""
+    offsets = []
+    position = HEADER.size + _pad(HEADER.size)
+    for size in sizes:
+        offsets.append(position)
+        position += size + _pad(size)
+    return offsets
+
+
+def _encode_items(items):
+    encoded = [str(item).encode("utf-8") for item in items]
+    item_offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(name) for name in encoded], out=item_offsets[1:])
+    return b"".join(encoded), item_offsets.tobytes()
+
+
+# ----------------------------------------------------------------------
+# WRITING
+# ----------------------------------------------------------------------
+def write_rule_arrays(path, items, ante_offsets, ante_ids, cons_offsets, cons_ids,
+                      support, confidence, lift, fingerprint: bytes = None):
+    """Write already columnar rule data."""
+    if fingerprint is None:
+        fingerprint = catalog_fingerprint()
+
+    sections = [
+        *_encode_items(items),
+        np.asarray(ante_offsets, dtype="<i8").tobytes(),
+        np.asarray(ante_ids, dtype="<i4").tobytes(),
+        np.asarray(cons_offsets, dtype="<i8").tobytes(),
+        np.asarray(cons_ids, dtype="<i4").tobytes(),
+        np.asarray(support, dtype="<f8").tobytes(),
+        np.asarray(confidence, dtype="<f8").tobytes(),
+        np.asarray(lift, dtype="<f8").tobytes(),
+    ]
+
+    offsets = _section_offsets([len(data) for data in sections])
+    n_rules = len(ante_offsets) - 1
+    header = HEADER.pack(MAGIC, VERSION, 0, len(items), n_rules, fingerprint, *offsets)
+
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(bytes(_pad(HEADER.size)))
+        for data in sections:
+            f.write(data)
+            f.write(bytes(_pad(len(data))))
+    return n_rules
+
+
+def write_rules(path, rules, fingerprint: bytes = None):
+    """Write a set of AssociationRule objects (as returned by apriori/eclat)."""
+    if rules == -1:
+        rules = []
+    rules = list(rules)
+
+    items = sorted({i for r in rules for i in r.first | r.second})
+    item_ids = {item: k for k, item in enumerate(items)}
+
+    ante_offsets = [0]
+    cons_offsets = [0]
+    ante_ids = []
+    cons_ids = []
+    for r in rules:
+        ante_ids.extend(sorted(item_ids[i] for i in r.first))
+        cons_ids.extend(sorted(item_ids[i] for i in r.second))
+        ante_offsets.append(len(ante_ids))
+        cons_offsets.append(len(cons_ids))
+
+    return write_rule_arrays(
+        path, items, ante_offsets, ante_ids, cons_offsets, cons_ids,
+        [r.support for r in rules],
+        [r.confidence for r in rules],
+        [r.lift for r in rules],
+        fingerprint
+    )
+
+
+class RuleWriter:
+    """
+    Rule file written batch by batch. Rule columns are spooled to temporary
+    files next to `path` and joined into the rule file by close(), so only
+    the item names stay in memory however many rules are added.
+    """
+
+    COLUMNS = (("ante_offsets", "<i8"), ("ante_ids", "<i4"), ("cons_offsets", "<i8"),
+               ("cons_ids", "<i4"), ("support", "<f8"), ("confidence", "<f8"), ("lift", "<f8"))
+
+    def __init__(self, path, fingerprint: bytes = None):
+        self.path = Path(path)
+        self.fingerprint = catalog_fingerprint() if fingerprint is None else fingerprint
+        self.items = []
+        self._item_ids = {}
+        self.n_rules = 0
+        self._n_ante = 0
+        self._n_cons = 0
+        self._spool_dir = Path(tempfile.mkdtemp(prefix="rules_", dir=self.path.parent))
+        self._spools = {name: open(self._spool_dir / name, "wb") for name, _ in self.COLUMNS}
+        for name in ("ante_offsets", "cons_offsets"):
+            self._spools[name].write(np.zeros(1, dtype="<i8").tobytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def _ids(self, items):
+        ids = []
+        for item in sorted(items):
+            k = self._item_ids.get(item)
+            if k is None:
+                k = self._item_ids[item] = len(self.items)
+                self.items.append(item)
+            ids.append(k)
+        return ids
+
+    def add(self, rules):
+        """Append AssociationRule objects."""
+        columns = {name: [] for name, _ in self.COLUMNS}
+        for r in rules:
+            ante = self._ids(r.first)
+            cons = self._ids(r.second)
+            self._n_ante += len(ante)
+            self._n_cons += len(cons)
+            columns["ante_ids"].extend(ante)
+            columns["cons_ids"].extend(cons)
+            columns["ante_offsets"].append(self._n_ante)
+            columns["cons_offsets"].append(self._n_cons)
+            columns["support"].append(r.support)
+            columns["confidence"].append(r.confidence)
+            columns["lift"].append(r.lift)
+            self.n_rules += 1
+        for name, dtype in self.COLUMNS:
+            self._spools[name].write(np.asarray(columns[name], dtype=dtype).tobytes())
+
+    def close(self):
+        """Write the rule file and drop the spooled columns; returns the rule count."""
+        for spool in self._spools.values():
+            spool.close()
+        head = dict(zip(("items", "item_offsets"), _encode_items(self.items)))
+        sizes = [len(head[name]) if name in head else (self._spool_dir / name).stat().st_size
+                 for name in SECTIONS]
+        header = HEADER.pack(MAGIC, VERSION, 0, len(self.items), self.n_rules, self.fingerprint,
+                             *_section_offsets(sizes))
+        with open(self.path, "wb") as f:
+            f.write(header)
+            f.write(bytes(_pad(HEADER.size)))
+            for name, size in zip(SECTIONS, sizes):
+                if name in head:
+                    f.write(head[name])
+                else:
+                    with open(self._spool_dir / name, "rb") as spool:
+                        shutil.copyfileobj(spool, f)
+                f.write(bytes(_pad(size)))
+        self._discard()
+        return self.n_rules
+
+    def _discard(self):
+        for spool in self._spools.values():
+            spool.close()
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
+
+
+# ----------------------------------------------------------------------
+# READING
+# ----------------------------------------------------------------------
+class RuleFile:
+    """Memory-mapped view over a rule file. Columns are numpy arrays."""
+
+    def __init__(self, path, expected_fingerprint: bytes = None):
+        self.path = Path(path)
+        self._buf = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if len(self._buf) < PREFIX.size:
+            raise ValueError(f"{self.path} is not a rule file")
+        magic, version = PREFIX.unpack(bytes(self._buf[:PREFIX.size]))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a rule file")
+        if version > VERSION:
+            raise ValueError(f"Rule file version {version} is newer than supported ({VERSION})")
+        header, self._sections = (V1_HEADER, V1_SECTIONS) if version == 1 else (HEADER, SECTIONS)
+        if len(self._buf) < header.size:
+            raise ValueError(f"{self.path} is not a rule file")
+
+        _magic, _version, _flags, n_items, n_rules, fingerprint, *offsets = \
+            header.unpack(bytes(self._buf[:header.size]))
+        if expected_fingerprint is not None and fingerprint != expected_fingerprint:
+            raise ValueError("Rule file was mined against a different product catalog")
+
+        self.version = version
+        self.fingerprint = fingerprint
+        self.n_rules = n_rules
+        self._offsets = dict(zip(self._sections, offsets))
+
+        if version == 1:
+            raw_items = bytes(self._section("items", n_bytes=self._section_end("items"))).rstrip(b"\0")
+            self.items = raw_items.decode("utf-8").split("\n") if n_items else []
+        else:
+            ends = self._array("item_offsets", "<i8", n_items + 1).tolist()
+            raw_items = bytes(self._section("items", ends[-1]))
+            self.items = [raw_items[a:b].decode("utf-8") for a, b in zip(ends[:-1], ends[1:])]
+
+        self.ante_offsets = self._array("ante_offsets", "<i8", n_rules + 1)
+        self.cons_offsets = self._array("cons_offsets", "<i8", n_rules + 1)
+        self.ante_ids = self._array("ante_ids", "<i4", int(self.ante_offsets[-1]))
+        self.cons_ids = self._array("cons_ids", "<i4", int(self.cons_offsets[-1]))
+        self.support = self._array("support", "<f8", n_rules)
+        self.confidence = self._array("confidence", "<f8", n_rules)
+        self.lift = self._array("lift", "<f8", n_rules)
+
+    def _section_end(self, name):
+        idx = self._sections.index(name)
+        start = self._offsets[name]
+        end = self._offsets[self._sections[idx + 1]] if idx + 1 < len(self._sections) else len(self._buf)
+        return end - start
+
+    def _section(self, name, n_bytes):
+        start = self._offsets[name]
+        return self._buf[start:start + n_bytes]
+
+    def _array(self, name, dtype, count):
+        size = np.dtype(dtype).itemsize
+        return self._section(name, count * size).view(dtype)
+
+    def __len__(self):
+        return self.n_rules
+
+    def antecedent(self, i):
+        ids = self.ante_ids[self.ante_offsets[i]:self.ante_offsets[i + 1]]
+        return tuple(self.items[k] for k in ids)
+
+    def consequent(self, i):
+        ids = self.cons_ids[self.cons_offsets[i]:self.cons_offsets[i + 1]]
+        return tuple(self.items[k] for k in ids)
+
+    def iter_rules(self):
+        """Yield (antecedent, consequent, support, confidence, lift) lazily."""
+        for i in range(self.n_rules):
+            yield (self.antecedent(i), self.consequent(i),
+                   float(self.support[i]), float(self.confidence[i]), float(self.lift[i]))
+
+    def __iter__(self):
+        """AssociationRule objects one at a time, so a file can stand in for a rule set."""
+        from formulas import AssociationRule
+        for row in self.iter_rules():
+            yield AssociationRule.from_metrics(*row)
+
+    def to_rules(self):
+        """Materialize AssociationRule objects. Only sensible for small files."""
+        return set(self)
+
+
+def read_rules(path, expected_fingerprint: bytes = None) -> RuleFile:
+    return RuleFile(path, expected_fingerprint)
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a binary rule file.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--limit", type=int, default=20, help="rules to print (0 for header only)")
+    args = parser.parse_args(argv)
+
+    rf = read_rules(args.path)
+    print(f"Version: {rf.version}")
+    print(f"Rules: {len(rf)}")
+    print(f"Items: {len(rf.items)}")
+    print(f"Catalog fingerprint: {rf.fingerprint.hex()}"
+          f"{' (matches)' if rf.fingerprint == catalog_fingerprint() else ' (different catalog)'}")
+    print()
+    for i in range(min(args.limit, len(rf))):
+        print(f"{set(rf.antecedent(i))} -> {set(rf.consequent(i))}  "
+              f"support={rf.support[i]:.3f} confidence={rf.confidence[i]:.3f} lift={rf.lift[i]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import shelve
+import shutil
+import tempfile
+from collections.abc import MutableMapping
+from itertools import islice
+from pathlib import Path
+
+#Rough per-entry costs used to turn a memory budget into entry counts
+ITEMSET_ENTRY_BYTES = 200   #tuple key + count + dict slot
+CANDIDATE_BYTES = 400       #trie nodes and leaf index for one candidate
+RULE_SPLIT_BYTES = 300      #antecedent/consequent tuples, counts and metrics for one candidate rule
+
+
+def entries_for_budget(memory_budget_mb, entry_bytes):
+    if memory_budget_mb is None:
+        return None
+    return max(1, int(memory_budget_mb * 1024 * 1024 / entry_bytes))
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items; one list with everything if size is None."""
+    if size is None:
+        yield list(iterable)
+        return
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+#Dictionary of itemset tuple -> value that keeps up to max_in_memory entries in RAM
+#and moves everything after that into a shelve file in a temporary directory
+class SpillDict(MutableMapping):
+    def __init__(self, max_in_memory=None, directory=None):
+        self.max_in_memory = max_in_memory
+        self.directory = directory
+        self._mem = {}
+        self._disk = None
+        self._tmpdir = None
+
+    @property
+    def spilled(self):
+        return len(self._disk) if self._disk is not None else 0
+
+    @staticmethod
+    def _encode(key):
+        return "\x1f".join(key)
+
+    @staticmethod
+    def _decode(key):
+        return tuple(key.split("\x1f"))
+
+    def _open_disk(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="mining_spill_", dir=self.directory)
+        self._disk = shelve.open(str(Path(self._tmpdir) / "itemsets"))
+
+    def __setitem__(self, key, value):
+        if key in self._mem:
+            self._mem[key] = value
+            return
+        if self.max_in_memory is None or len(self._mem) < self.max_in_memory:
+            if self._disk is None or self._encode(key) not in self._disk:
+                self._mem[key] = value
+                return
+        if self._disk is None:
+            self._open_disk()
+        self._disk[self._encode(key)] = value
+
+    def __getitem__(self, key):
+        if key in self._mem:
+            return self._mem[key]
+        if self._disk is not None:
+            encoded = self._encode(key)
+            if encoded in self._disk:
+                return self._disk[encoded]
+        raise KeyError(key)
+
+    def __delitem__(self, key):
+        if key in self._mem:
+            del self._mem[key]
+        elif self._disk is not None and self._encode(key) in self._disk:
+            del self._disk[self._encode(key)]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        yield from list(self._mem)
+        if self._disk is not None:
+            for key in list(self._disk.keys()):
+                yield self._decode(key)
+
+    def __len__(self):
+        return len(self._mem) + self.spilled
+
+    def unwrap(self):
+        """The in-memory dict when nothing was spilled, otherwise this SpillDict, still open."""
+        if self._disk is None:
+            return self._mem
+        return self
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,201 @@
+import math
+from collections import deque
+from itertools import combinations
+from typing import Dict, Iterable, List, Tuple
+
+
+# ----------------------------------------------------------------------
+# STREAMING MINER (Lossy Counting over a sliding window)
+# ----------------------------------------------------------------------
+class StreamingMiner:
+    """
+    Keep approximate frequent itemsets and pair stats for a live stream
+    of baskets.
+
+    Only the last `window_size` transactions are considered. Single items
+    are counted exactly; itemsets of size 2..max_itemset_size are tracked
+    with Lossy Counting over the window: the stream is cut into buckets of
+    ceil(1 / epsilon) transactions and every itemset keeps one count per
+    bucket. When a bucket closes, counts of 1 in it are dropped, so an
+    itemset loses at most one occurrence per bucket still in the window and
+    its count is under-estimated by at most epsilon * window_size. Bucket
+    counts leave with their transactions, so the counts never drift no
+    matter how long the stream runs.
+    """
+
+    def __init__(self, window_size: int = 1000, epsilon: float = 0.01,
+                 max_itemset_size: int = 3):
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1")
+        if not 0 < epsilon < 1:
+            raise ValueError("epsilon must be between 0 and 1")
+
+        self.window_size = window_size
+        self.epsilon = epsilon
+        self.max_itemset_size = max(2, max_itemset_size)
+        self.bucket_width = math.ceil(1 / epsilon)
+
+        self.window: deque = deque()
+        self.item_counts: Dict[str, int] = {}
+        # itemset -> [window count, {bucket: count in that bucket}]
+        self.itemset_counts: Dict[Tuple[str, ...], list] = {}
+        self.seen = 0
+
+    def __len__(self):
+        return len(self.window)
+
+    @property
+    def current_bucket(self) -> int:
+        """Bucket of the newest transaction, counted from the start of the stream."""
+        return (self.seen - 1) // self.bucket_width if self.seen else 0
+
+    @property
+    def max_error(self) -> int:
+        """Most occurrences any itemset count in the window can be missing."""
+        return math.ceil(len(self.window) / self.bucket_width)
+
+    def _normalize(self, items: Iterable[str]) -> Tuple[str, ...]:
+        cleaned = {str(i).strip().lower() for i in items}
+        cleaned.discard("")
+        return tuple(sorted(cleaned))
+
+    def _subsets(self, basket: Tuple[str, ...]):
+        for size in range(2, min(self.max_itemset_size, len(basket)) + 1):
+            yield from combinations(basket, size)
+
+    # ------------------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------------------
+    def add_transaction(self, items: Iterable[str]):
+        """Push one transaction into the window, evicting the oldest if full."""
+        basket = self._normalize(items)
+        self.window.append(basket)
+        self.seen += 1
+
+        for item in basket:
+            self.item_counts[item] = self.item_counts.get(item, 0) + 1
+
+        bucket = self.current_bucket
+        for itemset in self._subsets(basket):
+            entry = self.itemset_counts.get(itemset)
+            if entry is None:
+                self.itemset_counts[itemset] = [1, {bucket: 1}]
+            else:
+                entry[0] += 1
+                entry[1][bucket] = entry[1].get(bucket, 0) + 1
+
+        if len(self.window) > self.window_size:
+            # The oldest transaction in the window is number seen - window_size
+            self._evict(self.window.popleft(), (self.seen - self.window_size - 1) // self.bucket_width)
+
+        if self.seen % self.bucket_width == 0:
+            self._prune(bucket)
+
+    def add_transactions(self, transactions: Iterable[Iterable[str]]):
+        for items in transactions:
+            self.add_transaction(items)
+
+    def _evict(self, basket: Tuple[str, ...], bucket: int):
+        for item in basket:
+            count = self.item_counts.get(item, 0) - 1
+            if count > 0:
+                self.item_counts[item] = count
+            else:
+                self.item_counts.pop(item, None)
+
+        for itemset in self._subsets(basket):
+            entry = self.itemset_counts.get(itemset)
+            # A bucket count that is still held counted every occurrence in
+            # that bucket; a dropped one no longer holds this occurrence
+            if entry is None or bucket not in entry[1]:
+                continue
+            entry[0] -= 1
+            entry[1][bucket] -= 1
+            if entry[1][bucket] == 0:
+                del entry[1][bucket]
+            if entry[0] == 0:
+                del self.itemset_counts[itemset]
+
+    def _prune(self, bucket: int):
+        """Drop single occurrences in the bucket that just closed."""
+        stale = []
+        for itemset, entry in self.itemset_counts.items():
+            if entry[1].get(bucket) == 1:
+                del entry[1][bucket]
+                entry[0] -= 1
+                if entry[0] == 0:
+                    stale.append(itemset)
+        for itemset in stale:
+            del self.itemset_counts[itemset]
+
+    def clear(self):
+        self.window.clear()
+        self.item_counts.clear()
+        self.itemset_counts.clear()
+        self.seen = 0
+
+    # ------------------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------------------
+    def support(self, itemset) -> float:
+        n = len(self.window)
+        if n == 0:
+            return 0.0
+        key = self._normalize([itemset] if isinstance(itemset, str) else itemset)
+        if len(key) == 1:
+            return self.item_counts.get(key[0], 0) / n
+        entry = self.itemset_counts.get(key)
+        return entry[0] / n if entry else 0.0
+
+    def frequent_itemsets(self, minimum_support: float = 0.2) -> Dict[Tuple[str, ...], float]:
+        """
+        Return {itemset: support} for every itemset whose window support is
+        at least minimum_support (no false negatives); itemsets down to
+        about minimum_support - epsilon can be included too.
+        """
+        n = len(self.window)
+        if n == 0:
+            return {}
+        threshold = max(minimum_support * n - self.max_error, 0)
+
+        found = {(item,): count / n for item, count in self.item_counts.items()
+                 if count >= threshold}
+        for itemset, (count, _) in self.itemset_counts.items():
+            if count >= threshold:
+                found[itemset] = count / n
+        return found
+
+    def pair_confidence(self) -> Dict[Tuple[str, str], float]:
+        """Ordered pair confidences P(b|a) over the current window."""
+        conf: Dict[Tuple[str, str], float] = {}
+        for itemset, (count, _) in self.itemset_counts.items():
+            if len(itemset) != 2:
+                continue
+            a, b = itemset
+            if self.item_counts.get(a):
+                conf[(a, b)] = min(count / self.item_counts[a], 1.0)
+            if self.item_counts.get(b):
+                conf[(b, a)] = min(count / self.item_counts[b], 1.0)
+        return conf
+
+    def associations_for(self, product: str, min_conf: float = 0.05):
+        """
+        Same shape as ProductBrowser._get_associations_for: a list of
+        (other_item, confidence_percent) sorted by confidence descending.
+        """
+        product = product.strip().lower()
+        base = self.item_counts.get(product, 0)
+        if base == 0:
+            return []
+
+        scores: Dict[str, float] = {}
+        for itemset, (count, _) in self.itemset_counts.items():
+            if len(itemset) != 2 or product not in itemset:
+                continue
+            other = itemset[1] if itemset[0] == product else itemset[0]
+            conf = min(count / base, 1.0)
+            if conf >= min_conf:
+                scores[other] = conf
+
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return [(item, conf * 100.0) for item, conf in ranked]
@@ -0,0 +1,93 @@
+import numpy as np
+
+#Items present in at least this fraction of transactions are stored as bitmaps
+DENSE_THRESHOLD = 1 / 32
+
+#Number of set bits for every byte value
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+#Compact tidset over transaction positions 0..n_tx-1. Sparse sets are sorted int32
+#arrays (4 bytes per tid), dense ones are packed bitmaps (n_tx / 8 bytes). Intersections
+#pick a merge, a bitmap probe or AND + popcount depending on the two representations
+class Tidset:
+    __slots__ = ('dense', 'data', 'n_tx', 'count')
+
+    def __init__(self, dense, data, n_tx, count):
+        self.dense = dense
+        self.data = data
+        self.n_tx = n_tx
+        self.count = count
+
+    @classmethod
+    def from_positions(cls, positions, n_tx, dense_threshold=DENSE_THRESHOLD):
+        arr = np.unique(np.asarray(positions, dtype=np.int32))
+        return cls._choose(arr, n_tx, dense_threshold)
+
+    @classmethod
+    def _from_sorted(cls, arr, n_tx):
+        return cls(False, arr, n_tx, len(arr))
+
+    @classmethod
+    def _from_bits(cls, bits, n_tx, count=None):
+        if count is None:
+            count = int(_POPCOUNT8[bits].sum())
+        return cls(True, bits, n_tx, count)
+
+    @classmethod
+    def _choose(cls, arr, n_tx, dense_threshold=DENSE_THRESHOLD):
+        if n_tx and len(arr) >= dense_threshold * n_tx:
+            mask = np.zeros(n_tx, dtype=bool)
+            mask[arr] = True
+            return cls._from_bits(np.packbits(mask, bitorder='little'), n_tx, len(arr))
+        return cls._from_sorted(arr, n_tx)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def to_array(self):
+        """Sorted int32 positions."""
+        if not self.dense:
+            return self.data
+        bits = np.unpackbits(self.data, count=self.n_tx, bitorder='little')
+        return np.flatnonzero(bits).astype(np.int32)
+
+    def __and__(self, other):
+        return self.intersect(other)
+
+    def intersect(self, other):
+        if self.dense and other.dense:
+            bits = np.bitwise_and(self.data, other.data)
+            count = int(_POPCOUNT8[bits].sum())
+            if count < DENSE_THRESHOLD * self.n_tx:
+                return Tidset._from_sorted(Tidset._from_bits(bits, self.n_tx, count).to_array(), self.n_tx)
+            return Tidset._from_bits(bits, self.n_tx, count)
+
+        if self.dense or other.dense:
+            sparse, dense = (other, self) if self.dense else (self, other)
+            arr = sparse.data
+            hit = (dense.data[arr >> 3] >> (arr & 7).astype(np.uint8)) & 1
+            return Tidset._from_sorted(arr[hit.astype(bool)], self.n_tx)
+
+        #Both sparse: binary-search the smaller array in the larger one
+        small, large = (self.data, other.data) if len(self.data) <= len(other.data) else (other.data, self.data)
+        if len(small) == 0 or len(large) == 0:
+            return Tidset._from_sorted(np.zeros(0, dtype=np.int32), self.n_tx)
+        idx = np.searchsorted(large, small)
+        idx[idx == len(large)] = 0
+        return Tidset._from_sorted(small[large[idx] == small], self.n_tx)
+
+
+def intersect_all(tidsets):
+    """Intersect smallest first and stop early once the result is empty."""
+    ordered = sorted(tidsets, key=len)
+    result = ordered[0]
+    for other in ordered[1:]:
+        if result.count == 0:
+            break
+        result = result.intersect(other)
+    return result
@@ -1,35 +1,52 @@
+import argparse
 import sys
 from pathlib import Path
 import tkinter as tk
 from tkinter import messagebox
 
-# Make sure src/ and project root are on sys.path
+# Make sure src/ and project root are on sys.path, and the flat algorithm modules can be found
 current_file = Path(__file__).resolve()
 src_dir = current_file.parent         # .../src
 project_root = src_dir.parent         # repo root
 
 sys.path.insert(0, str(src_dir))
 sys.path.insert(0, str(project_root))
+sys.path.append(str(src_dir / "algorithms"))
 
 from ui.product_browser import ProductBrowser
+from ui.responsiveness import DiagnosticsWindow, ResponsivenessMonitor
+
+# ProductBrowser methods also timed when called directly (Tk callbacks are always timed)
+TIMED_METHODS = (
+    "finalize_transaction", "import_transactions", "run_preprocessing", "query_associations",
+    "run_mining", "restore_session", "_build_association_stats",
+)
 
 
 class App(tk.Tk):
-    def __init__(self):
+    def __init__(self, session_dir: Path | None = None):
         super().__init__()
+        self.session_dir = session_dir
         self.title("Data Mining Shopping Interface")
         self.geometry("1100x650")
+
+        # Installed before the widgets exist so every callback they register is timed
+        self.monitor = ResponsivenessMonitor(self, sizes=lambda: self.browser.diagnostic_sizes())
+        self.monitor.install()
         self._create_widgets()
+        self.monitor.instrument(self.browser, TIMED_METHODS)
         self._create_menu()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _create_menu(self):
         menubar = tk.Menu(self)
 
         file_menu = tk.Menu(menubar, tearoff=0)
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self._on_close)
         menubar.add_cascade(label="File", menu=file_menu)
 
         help_menu = tk.Menu(menubar, tearoff=0)
+        help_menu.add_command(label="UI Diagnostics", command=self._show_diagnostics)
         help_menu.add_command(label="About", command=self._show_about)
         menubar.add_cascade(label="Help", menu=help_menu)
 
@@ -39,8 +56,8 @@ class App(tk.Tk):
         frame = tk.Frame(self, padx=12, pady=12)
         frame.pack(fill=tk.BOTH, expand=True)
 
-        browser = ProductBrowser(frame)
-        browser.pack(fill=tk.BOTH, expand=True)
+        self.browser = ProductBrowser(frame, session_dir=self.session_dir)
+        self.browser.pack(fill=tk.BOTH, expand=True)
 
         self.status_var = tk.StringVar(value="Ready")
         status = tk.Label(
@@ -52,6 +69,15 @@ class App(tk.Tk):
         )
         status.pack(side=tk.BOTTOM, fill=tk.X)
 
+    def _on_close(self):
+        # Let the session writer finish so the next start restores everything
+        self.browser.close_session()
+        self.monitor.uninstall()
+        self.destroy()
+
+    def _show_diagnostics(self):
+        DiagnosticsWindow(self, self.monitor)
+
     def _show_about(self):
         messagebox.showinfo(
             "About",
@@ -61,8 +87,13 @@ class App(tk.Tk):
         )
 
 
-def run_app():
-    app = App()
+def run_app(argv=None):
+    parser = argparse.ArgumentParser(description="Data Mining Shopping Interface")
+    parser.add_argument("--session", type=Path, default=None, metavar="DIR",
+                        help="save the session to DIR in the background and reopen it on the next start")
+    args = parser.parse_args(argv)
+
+    app = App(args.session)
     app.mainloop()
 
 
@@ -0,0 +1,189 @@
+import argparse
+import glob
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Allow running this file directly as well as importing it from src/
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from preprocessing.preprocessing import clean_data, compress_baskets
+
+
+# Report fields that add up across files
+SUMMED_FIELDS = (
+    "original_total",
+    "blank_removed",
+    "empty_transactions",
+    "single_item_removed",
+    "invalid_item_transactions",
+    "duplicates_removed",
+    "valid_transactions",
+    "total_items",
+)
+
+
+# ----------------------------------------------------------------------
+# FILE DISCOVERY
+# ----------------------------------------------------------------------
+def find_files(source) -> List[Path]:
+    """A directory (every *.csv inside), a glob pattern or a single file."""
+    path = Path(source)
+    if path.is_dir():
+        return sorted(path.glob("*.csv"))
+    if path.is_file():
+        return [path]
+    return sorted(Path(p) for p in glob.glob(str(source)))
+
+
+# ----------------------------------------------------------------------
+# PER-FILE WORKER
+# ----------------------------------------------------------------------
+# File the worker is cleaning, prefixed to its log lines so interleaved reports stay readable
+_source: Optional[str] = None
+
+
+def _tag_source(record: logging.LogRecord) -> bool:
+    if _source is not None:
+        record.msg = f"[{_source}] {record.msg}"
+    return True
+
+
+def _init_worker(log_queue):
+    """Runs once per worker process: send log records to the parent, which alone writes the log file."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    handler = QueueHandler(log_queue)
+    handler.addFilter(_tag_source)
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def _clean_file(path: Path) -> Tuple[pd.DataFrame, dict]:
+    """Runs in a worker process: read and clean one partition."""
+    global _source
+    _source = path.name
+    df = pd.read_csv(path)
+    cleaned, report = clean_data(df, return_report=True)
+    cleaned = cleaned[["transaction_id", "items"]].rename(
+        columns={"transaction_id": "source_transaction_id"}
+    )
+    cleaned["source_file"] = path.name
+    return cleaned, report
+
+
+# ----------------------------------------------------------------------
+# REPORT MERGING
+# ----------------------------------------------------------------------
+def merge_reports(reports: List[dict], merged_data: pd.DataFrame) -> dict:
+    """Combine per-file cleaning reports into the clean_data report schema."""
+    merged = {field: sum(int(r.get(field) or 0) for r in reports) for field in SUMMED_FIELDS}
+
+    # Distinct items can't be summed, count them on the merged data
+    merged["unique_items"] = len({item for items in merged_data["items"] for item in items})
+    merged["unique_baskets"] = int(merged_data.shape[0]) if "weight" in merged_data.columns else None
+
+    # Workers run side by side, so report the worst single file for memory
+    for field in ("memory_peak_tracemalloc_bytes", "memory_current_tracemalloc_bytes",
+                  "memory_rss_before_bytes", "memory_rss_after_bytes", "memory_rss_delta_bytes"):
+        values = [r.get(field) for r in reports if r.get(field) is not None]
+        merged[field] = max(values) if values else None
+
+    merged["files"] = len(reports)
+    return merged
+
+
+# ----------------------------------------------------------------------
+# PIPELINE
+# ----------------------------------------------------------------------
+class IngestResult:
+    """Consolidated, cleaned transactions from many files plus the merged report."""
+
+    def __init__(self, data: pd.DataFrame, report: dict, files: List[Path]):
+        self.data = data
+        self.report = report
+        self.files = files
+
+    def encoded(self) -> Tuple[List[str], List[Tuple[int, ...]]]:
+        """(item names, transactions as sorted item id tuples)."""
+        item_ids: Dict[str, int] = {}
+        encoded = []
+        for items in self.data["items"]:
+            encoded.append(tuple(sorted({item_ids.setdefault(i, len(item_ids)) for i in items})))
+        return list(item_ids), encoded
+
+
+def ingest(source, workers: Optional[int] = None, compress: bool = False) -> IngestResult:
+    """
+    Clean every CSV matched by `source` in a process pool and merge them
+    into one transaction set. Transaction ids are renumbered globally; the
+    original id and file are kept in source_transaction_id / source_file.
+    Workers send their log records through a queue to this process, so the
+    log file has one writer and every line is tagged with its source file.
+    """
+    files = find_files(source)
+    if not files:
+        raise FileNotFoundError(f"No CSV files found for {source}")
+
+    workers = workers or min(len(files), os.cpu_count() or 1)
+    if workers > 1 and len(files) > 1:
+        log_queue = multiprocessing.Queue()
+        listener = QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+        listener.start()
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(log_queue,)) as pool:
+                results = list(pool.map(_clean_file, files))
+        finally:
+            listener.stop()
+    else:
+        results = [_clean_file(f) for f in files]
+
+    frames = [frame for frame, _ in results]
+    data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=["source_transaction_id", "items", "source_file"]
+    )
+    data.insert(0, "transaction_id", range(1, len(data) + 1))
+
+    if compress:
+        data = compress_baskets(data)
+
+    report = merge_reports([r for _, r in results], data)
+    return IngestResult(data, report, files)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean daily transaction CSVs in parallel.")
+    parser.add_argument("source", help="directory or glob of transaction CSVs")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--compress", action="store_true", help="collapse identical baskets")
+    parser.add_argument("--out", type=Path, default=None, help="write the consolidated CSV here")
+    args = parser.parse_args(argv)
+
+    result = ingest(args.source, args.workers, args.compress)
+
+    print()
+    print("Consolidated Report")
+    print("--------------------------------")
+    for key, value in result.report.items():
+        print(f"{key}: {value}")
+
+    if args.out is not None:
+        out = result.data.copy()
+        out["items"] = out["items"].map(",".join)
+        out.to_csv(args.out, index=False)
+        print(f"Wrote {len(out)} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import logging
 from pathlib import Path
@@ -56,10 +57,11 @@ def print_all(data):
 # ----------------------------------------------------------------------
 # CLEAN DATA
 # ----------------------------------------------------------------------
-def clean_data(data, return_report: bool = False):
+def clean_data(data, return_report: bool = False, compress: bool = False):
     """
     Clean transaction DataFrame.
     Returns cleaned DataFrame and, optionally, a report dictionary.
+    With compress=True identical baskets are collapsed (see compress_baskets).
     """
 
     # Start memory tracking
@@ -91,40 +93,21 @@ def clean_data(data, return_report: bool = False):
 
     data["items"] = data["items"].str.lower()
 
-    drop_list = set()
-    empty_count = 0
-    single_count = 0
-    dupes = 0
-    bad_items = 0
-
-    # DETECT "(empty)" marker and split items
-    for index, row in data.iterrows():
-        raw = str(row["items"]).strip()
-
-        if raw == "(empty)":
-            empty_count += 1
-            drop_list.add(index)
-            data.at[index, "items"] = []
-            continue
-
-        # Split into list
-        data.at[index, "items"] = raw.split(",")
-
-    # STRIP SPACES, REMOVE EMPTY STRINGS, FIND SINGLES/EMPTY
-    for index, row in data.iterrows():
-        if index in drop_list:
-            continue
-
-        cleaned_items = [i.strip() for i in row["items"] if i.strip()]
-        data.at[index, "items"] = cleaned_items
-
-        if len(cleaned_items) == 0:
-            empty_count += 1
-            drop_list.add(index)
-
-        elif len(cleaned_items) == 1:
-            single_count += 1
-            drop_list.add(index)
+    # One row per (transaction, item): split, explode and strip in vectorized passes
+    position = np.arange(len(data))
+    raw = pd.Series(data["items"].values, index=position)
+    empty_marker = raw.eq("(empty)")
+    # Whitespace around commas goes in one regex pass per row instead of a strip per item
+    exploded = raw.mask(empty_marker, "").str.replace(r"\s*,\s*", ",", regex=True).str.split(",").explode()
+    exploded = exploded[exploded.notna() & (exploded != "")]
+    entries = pd.DataFrame({"row": exploded.index.values, "item": exploded.values})
+
+    # DETECT "(empty)" marker, EMPTY AND SINGLE-ITEM TRANSACTIONS
+    lengths = np.bincount(entries["row"].values, minlength=len(data)) if len(data) else np.zeros(0, dtype=int)
+    empty_rows = empty_marker.values | (lengths == 0)
+    single_rows = ~empty_marker.values & (lengths == 1)
+    empty_count = int(empty_rows.sum())
+    single_count = int(single_rows.sum())
 
     logger.info(f"Empty item transactions: {empty_count}")
     logger.info(f"Single-item transactions: {single_count}")
@@ -137,37 +120,28 @@ def clean_data(data, return_report: bool = False):
     except Exception:
         valid_products = set()
 
-    for index, row in data.iterrows():
-        if index in drop_list:
-            continue
-
-        for item in row["items"]:
-            if item not in valid_products:
-                bad_items += 1
-                drop_list.add(index)
-                break
+    invalid_rows = np.zeros(len(data), dtype=bool)
+    invalid_rows[entries.loc[~entries["item"].isin(valid_products), "row"].values] = True
+    invalid_rows &= ~(empty_rows | single_rows)
+    bad_items = int(invalid_rows.sum())
 
     logger.info(f"Transactions with invalid items: {bad_items}")
 
-    # REMOVE DUPLICATE ITEMS WITHIN A TRANSACTION
-    for index, row in data.iterrows():
-        items = row["items"]
-        seen = set()
-        unique_items = []
-
-        for it in items:
-            if it not in seen:
-                seen.add(it)
-                unique_items.append(it)
-
-        dupes += len(items) - len(unique_items)
-        data.at[index, "items"] = unique_items
+    # REMOVE DUPLICATE ITEMS WITHIN A TRANSACTION (first occurrence kept)
+    repeated = entries.duplicated(["row", "item"]).values
+    dupes = int(repeated.sum())
+    entries = entries[~repeated]
 
     logger.info(f"Duplicate items removed: {dupes}")
 
     # DROP BAD TRANSACTIONS
-    if drop_list:
-        data = data.drop(list(drop_list))
+    keep = ~(empty_rows | single_rows | invalid_rows)
+    entries = entries[keep[entries["row"].values]]
+    data = data[keep].copy()
+    ends = np.cumsum(np.bincount(entries["row"].values, minlength=len(keep))[keep])
+    values = entries["item"].tolist()
+    starts = np.concatenate(([0], ends[:-1])).tolist()
+    data["items"] = [values[a:b] for a, b in zip(starts, ends.tolist())]
 
     # FINAL STATS
     logger.info("")
@@ -184,6 +158,11 @@ def clean_data(data, return_report: bool = False):
     logger.info(f"Total Items: {item_count}")
     logger.info(f"Unique Items: {unique_count}")
 
+    # OPTIONAL BASKET COMPRESSION
+    if compress:
+        data = compress_baskets(data)
+        logger.info(f"Unique Baskets: {data.shape[0]}")
+
     # MEMORY REPORT
     try:
         current_alloc, peak_alloc = tracemalloc.get_traced_memory()
@@ -216,6 +195,7 @@ def clean_data(data, return_report: bool = False):
         "valid_transactions": valid_transactions,
         "total_items": item_count,
         "unique_items": unique_count,
+        "unique_baskets": int(data.shape[0]) if compress else None,
         "memory_peak_tracemalloc_bytes": peak_alloc,
         "memory_current_tracemalloc_bytes": current_alloc,
         "memory_rss_before_bytes": rss_before,
@@ -224,3 +204,57 @@ def clean_data(data, return_report: bool = False):
     }
 
     return (data, report) if return_report else data
+
+
+# ----------------------------------------------------------------------
+# CLEAN ONE BASKET
+# ----------------------------------------------------------------------
+_valid_products = None
+
+
+def clean_basket(items):
+    """
+    One transaction's items by the rules clean_data applies: stripped,
+    lower-cased, blank entries and repeats dropped (first occurrence kept).
+    Returns None when clean_data would drop the whole transaction: empty,
+    a single item, or an item that is not in the catalog.
+    """
+    global _valid_products
+    if _valid_products is None:
+        try:
+            _valid_products = set(products["product_name"].astype(str).str.lower().str.strip().values)
+        except Exception:
+            _valid_products = set()
+
+    entries = [item for item in (str(i).strip().lower() for i in items) if item]
+    # Like clean_data, repeats count towards the single-item check and are dropped afterwards
+    if len(entries) < 2 or not _valid_products.issuperset(entries):
+        return None
+    return list(dict.fromkeys(entries))
+
+
+# ----------------------------------------------------------------------
+# COMPRESS IDENTICAL BASKETS
+# ----------------------------------------------------------------------
+def compress_baskets(data):
+    """
+    Collapse transactions with identical item sets into one row each.
+
+    Returns a frame with columns transaction_id (first id of the group),
+    items (sorted list) and weight (how many transactions it stands for).
+    Miners and association stats use the weight as the row's multiplicity,
+    so their work scales with distinct baskets instead of raw rows.
+    """
+    weights = data["weight"] if "weight" in data.columns else pd.Series(1, index=data.index)
+    grouped = pd.DataFrame({
+        "key": [tuple(sorted(items)) for items in data["items"]],
+        "transaction_id": data["transaction_id"].values,
+        "weight": weights.values,
+    }).groupby("key", sort=False)
+
+    firsts = grouped["transaction_id"].first()
+    return pd.DataFrame({
+        "transaction_id": firsts.values,
+        "items": [list(key) for key in firsts.index],
+        "weight": grouped["weight"].sum().astype(int).values,
+    })
@@ -0,0 +1,165 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+
+# ----------------------------------------------------------------------
+# ENCODED ITEM COLUMN
+# ----------------------------------------------------------------------
+class EncodedItems:
+    """
+    Item lists decoded on access from CSR style arrays: `ids` holds every
+    item id back to back and `ends[i]` is where row i stops. The arrays may
+    be memory-mapped, so a restored session costs nothing until rows are
+    displayed. Rows appended later are kept as plain lists.
+    """
+
+    def __init__(self, vocab: Sequence[str], ends, ids):
+        self.vocab = list(vocab)
+        self.ends = ends
+        self.ids = ids
+        self.tail: List[List[str]] = []
+
+    def __len__(self):
+        return len(self.ends) + len(self.tail)
+
+    def _decode(self, position: int) -> List[str]:
+        start = int(self.ends[position - 1]) if position else 0
+        vocab = self.vocab
+        return [vocab[i] for i in self.ids[start:int(self.ends[position])].tolist()]
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("item row out of range")
+        base = len(self.ends)
+        return self._decode(position) if position < base else self.tail[position - base]
+
+    def __iter__(self) -> Iterator[List[str]]:
+        for position in range(len(self.ends)):
+            yield self._decode(position)
+        yield from self.tail
+
+    def append(self, items: List[str]):
+        self.tail.append(items)
+
+    def extend(self, items: Iterable[List[str]]):
+        self.tail.extend(items)
+
+
+# ----------------------------------------------------------------------
+# COLUMNAR TRANSACTION STORE
+# ----------------------------------------------------------------------
+class TransactionStore:
+    """
+    Transactions kept as parallel columns (ids and item lists).
+
+    Bulk loads append whole columns in one operation instead of building a
+    dict per row, and the id index / unique item set are maintained as
+    data is added so the UI never has to rescan everything.
+    """
+
+    def __init__(self):
+        self.tids: List[int] = []
+        self.items: List[List[str]] = []
+        self.index: Dict[int, int] = {}  # transaction_id -> position
+        self.unique_items: Set[str] = set()
+
+    @classmethod
+    def from_encoded(cls, tids: Sequence[int], vocab: Sequence[str], ends, ids) -> "TransactionStore":
+        """Store over encoded (possibly memory-mapped) item arrays, see EncodedItems."""
+        store = cls()
+        store.tids = [int(t) for t in tids]
+        store.items = EncodedItems(vocab, ends, ids)
+        store.index = dict(zip(store.tids, range(len(store.tids))))
+        used = sorted(set(ids[:int(ends[-1])].tolist())) if len(ends) else []
+        store.unique_items = {str(vocab[i]).lower() for i in used}
+        return store
+
+    def __len__(self):
+        return len(self.tids)
+
+    def __bool__(self):
+        return bool(self.tids)
+
+    def __getitem__(self, position: int) -> dict:
+        return {"transaction_id": self.tids[position], "items": self.items[position]}
+
+    def __iter__(self) -> Iterator[dict]:
+        for tid, items in zip(self.tids, self.items):
+            yield {"transaction_id": tid, "items": items}
+
+    @property
+    def max_tid(self) -> int:
+        return max(self.index) if self.index else 0
+
+    def append(self, tid: int, items: List[str]):
+        self.index[tid] = len(self.tids)
+        self.tids.append(tid)
+        self.items.append(items)
+        self.unique_items.update(i.lower() for i in items)
+
+    def extend(self, tids: Iterable[int], items: Iterable[List[str]]):
+        """Append whole columns at once."""
+        tids = list(tids)
+        items = list(items)
+        if len(tids) != len(items):
+            raise ValueError("tids and items must have the same length")
+
+        start = len(self.tids)
+        self.tids.extend(tids)
+        self.items.extend(items)
+        self.index.update(zip(tids, range(start, start + len(tids))))
+        if items:
+            self.unique_items.update(i.lower() for i in set().union(*items))
+
+    def find(self, tid: int) -> Optional[int]:
+        return self.index.get(tid)
+
+    def clear(self):
+        self.tids.clear()
+        self.items = []
+        self.index.clear()
+        self.unique_items.clear()
+
+    def to_frame(self):
+        """Raw frame in the shape clean_data expects."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            "transaction_id": self.tids,
+            "items": [",".join(i) if i else "(empty)" for i in self.items],
+        })
+
+
+# ----------------------------------------------------------------------
+# VECTORIZED CSV PARSING
+# ----------------------------------------------------------------------
+def parse_transactions_frame(df):
+    """
+    Split the 'items' column of a raw transactions frame in one vectorized
+    step. Blank rows are dropped, whitespace around items is trimmed and
+    empty entries are removed.
+
+    Returns (tids, items) as plain lists ready for TransactionStore.extend.
+    """
+    if "transaction_id" not in df.columns or "items" not in df.columns:
+        raise ValueError("CSV must contain 'transaction_id' and 'items' columns")
+
+    raw = df["items"]
+    raw = raw[raw.notna()].astype(str)
+    raw = raw[raw.str.strip().str.len() > 0]
+
+    normalized = (
+        raw.str.replace(r"\s*,[\s,]*", ",", regex=True)
+           .str.strip()
+           .str.strip(",")
+    )
+
+    tids = df.loc[normalized.index, "transaction_id"].astype(int).tolist()
+    items = normalized.str.split(",").tolist()
+    # Rows that were only commas normalize to "" and must give [] rather than [""]
+    for k in (normalized.str.len().to_numpy() == 0).nonzero()[0]:
+        items[k] = []
+    return tids, items
@@ -0,0 +1 @@
+"""Local recommendation service for DataMiningShoppingInterface."""
@@ -0,0 +1,106 @@
+import argparse
+import json
+import random
+import threading
+import time
+from typing import List, Optional
+from urllib.parse import quote
+from urllib.request import urlopen
+
+
+# ----------------------------------------------------------------------
+# LOAD TEST FOR THE LOCAL RECOMMENDATION SERVICE
+# ----------------------------------------------------------------------
+def _fetch(url: str, timeout: float = 5.0) -> dict:
+    with urlopen(url, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def run_load_test(base_url: str, products: List[str], requests: int = 2000,
+                  concurrency: int = 8, basket_size: int = 2, top_n: int = 5,
+                  seed: int = 0) -> dict:
+    """
+    Fire `requests` random basket lookups from `concurrency` threads and
+    return client-side latency percentiles and throughput.
+    """
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(requests):
+        basket = rng.sample(products, min(basket_size, len(products)))
+        urls.append(f"{base_url}/recommend?items={quote(','.join(basket))}&n={top_n}")
+
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    position = [0]
+
+    def worker():
+        while True:
+            with lock:
+                if position[0] >= len(urls):
+                    return
+                url = urls[position[0]]
+                position[0] += 1
+            start = time.perf_counter()
+            try:
+                _fetch(url)
+                ok = True
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors[0] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000.0
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall if wall > 0 else 0.0,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load-test the recommendation service on localhost.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--basket-size", type=int, default=2)
+    parser.add_argument("--products", default="milk,bread,butter,eggs,cheese,yogurt,apple,banana,orange,coffee")
+    args = parser.parse_args(argv)
+
+    products = [p.strip() for p in args.products.split(",") if p.strip()]
+    client = run_load_test(args.url, products, args.requests, args.concurrency, args.basket_size)
+
+    print("CLIENT")
+    print("--------------------------------")
+    for key, value in client.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+    print()
+    print("SERVER")
+    print("--------------------------------")
+    for key, value in _fetch(f"{args.url}/metrics").items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Make sure src/ is importable and the flat algorithm modules can be found
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+sys.path.insert(0, str(src_dir))
+sys.path.append(str(src_dir / "algorithms"))
+
+from algorithms.basket_scoring import BasketScorer
+
+
+# ----------------------------------------------------------------------
+# LRU RESPONSE CACHE
+# ----------------------------------------------------------------------
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ----------------------------------------------------------------------
+# LATENCY METRICS
+# ----------------------------------------------------------------------
+class LatencyStats:
+    """Rolling window of request latencies plus lifetime throughput counters."""
+
+    def __init__(self, window: int = 10000):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def record(self, seconds: float, ok: bool = True):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            if not ok:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+            errors = self.errors
+        uptime = time.perf_counter() - self.started
+
+        def pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000.0
+
+        return {
+            "requests": count,
+            "errors": errors,
+            "uptime_s": uptime,
+            "throughput_rps": count / uptime if uptime > 0 else 0.0,
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": samples[-1] * 1000.0 if samples else 0.0,
+        }
+
+
+# ----------------------------------------------------------------------
+# IN-MEMORY RECOMMENDATION INDEX
+# ----------------------------------------------------------------------
+class RecommendationIndex(BasketScorer):
+    """
+    BasketScorer with the service's response shape: only rules whose
+    antecedent is inside the basket are visited, and each suggested item
+    keeps its most confident rule.
+    """
+
+    @classmethod
+    def from_rule_file(cls, rule_file) -> "RecommendationIndex":
+        index = cls()
+        for first, second, _support, confidence, lift in rule_file.iter_rules():
+            index.add_rule(first, second, confidence, lift)
+        return index
+
+    def recommend(self, basket: Iterable[str], top_n: int = 5) -> List[dict]:
+        basket = frozenset(str(i).strip().lower() for i in basket)
+        best: Dict[str, Tuple[float, float]] = {}
+        for consequent, conf, lift in self.matching_rules(basket):
+            for target in consequent:
+                if target in basket:
+                    continue
+                if target not in best or conf > best[target][0]:
+                    best[target] = (conf, lift)
+
+        ranked = sorted(best.items(), key=lambda x: (-x[1][0], -x[1][1], x[0]))
+        return [
+            {"item": item, "confidence": conf, "lift": lift}
+            for item, (conf, lift) in ranked[:top_n]
+        ]
+
+
+# ----------------------------------------------------------------------
+# SERVICE
+# ----------------------------------------------------------------------
+class RecommendationService:
+    def __init__(self, index: RecommendationIndex, cache_size: int = 4096):
+        self.index = index
+        self.cache = LRUCache(cache_size)
+        self.stats = LatencyStats()
+
+    def recommend(self, basket: Iterable[str], top_n: int = 5) -> List[dict]:
+        key = (frozenset(str(i).strip().lower() for i in basket), top_n)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.index.recommend(key[0], top_n)
+            self.cache.put(key, result)
+        return result
+
+    def metrics(self) -> dict:
+        out = self.stats.snapshot()
+        out.update({
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "rules_indexed": self.index.rule_count,
+        })
+        return out
+
+
+def make_handler(service: RecommendationService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _recommend(self, items: List[str], top_n: int):
+            start = time.perf_counter()
+            ok = True
+            try:
+                if not items:
+                    ok = False
+                    self._send(400, {"error": "no items given"})
+                    return
+                if top_n is None or top_n < 0:
+                    ok = False
+                    self._send(400, {"error": "n must be a non-negative integer"})
+                    return
+                recs = service.recommend(items, top_n)
+                self._send(200, {"items": items, "recommendations": recs})
+            finally:
+                service.stats.record(time.perf_counter() - start, ok)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/recommend":
+                query = parse_qs(url.query)
+                raw = ",".join(query.get("items", []) + query.get("product", []))
+                items = [s.strip() for s in raw.split(",") if s.strip()]
+                try:
+                    top_n = int(query.get("n", ["5"])[0])
+                except ValueError:
+                    top_n = None
+                self._recommend(items, top_n)
+            elif url.path == "/metrics":
+                self._send(200, service.metrics())
+            elif url.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/recommend":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                items = [str(i) for i in payload.get("items", [])]
+                top_n = int(payload.get("n", 5))
+            except (ValueError, TypeError, AttributeError):
+                self._send(400, {"error": "invalid JSON body"})
+                return
+            self._recommend(items, top_n)
+
+        def log_message(self, format, *args):
+            pass  # keep the hot path quiet
+
+    return Handler
+
+
+# ----------------------------------------------------------------------
+# LOADING
+# ----------------------------------------------------------------------
+def build_index(transactions_csv: Path, source: str = "pairs",
+                minimum_support: float = 0.2, minimum_confidence: float = 0.5,
+                rules_file: Optional[Path] = None) -> RecommendationIndex:
+    """
+    Index rules from a saved rule file, or clean the transactions file and
+    index either pair stats or freshly mined rules.
+    """
+    if rules_file is not None:
+        from rule_format import read_rules
+        return RecommendationIndex.from_rule_file(read_rules(rules_file))
+
+    import pandas as pd
+    from preprocessing.preprocessing import clean_data
+
+    cleaned = clean_data(pd.read_csv(transactions_csv))
+
+    if source == "pairs":
+        from algorithms.cooccurrence import PairStats
+        return RecommendationIndex.from_pair_stats(PairStats.from_baskets(cleaned["items"].tolist()))
+    if source == "apriori":
+        from apiori import apriori
+        return RecommendationIndex.from_rules(apriori(cleaned, minimum_support, minimum_confidence))
+    if source == "eclat":
+        from eclat import eclat
+        return RecommendationIndex.from_rules(eclat(cleaned, minimum_support, minimum_confidence))
+    raise ValueError(f"Unknown source: {source}")
+
+
+def serve(service: RecommendationService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None):
+    default_csv = src_dir.parent / "data" / "sample_transactions.csv"
+
+    parser = argparse.ArgumentParser(description="Serve product recommendations over HTTP/JSON.")
+    parser.add_argument("--transactions", type=Path, default=default_csv)
+    parser.add_argument("--source", choices=["pairs", "eclat", "apriori"], default="pairs")
+    parser.add_argument("--rules-file", type=Path, default=None,
+                        help="serve rules saved with rule_format instead of mining")
+    parser.add_argument("--min-support", type=float, default=0.2)
+    parser.add_argument("--min-confidence", type=float, default=0.5)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    index = build_index(args.transactions, args.source, args.min_support,
+                        args.min_confidence, args.rules_file)
+    service = RecommendationService(index, args.cache_size)
+    server = serve(service, args.host, args.port)
+    print(f"Serving {index.rule_count} rules on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
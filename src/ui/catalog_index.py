@@ -0,0 +1,142 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# ----------------------------------------------------------------------
+# PRODUCT NAME INDEX
+# ----------------------------------------------------------------------
+class CatalogIndex:
+    """
+    Search index over product names for incremental lookup.
+
+    Prefix queries bisect a sorted list of names and of the individual words
+    in each name, so they cost O(log n + matches). Longer queries that are
+    not prefixes fall back to trigram posting lists: the rarest trigram of
+    the query gives the candidates, which are then checked with a substring
+    test. build_trigrams() is meant to run off the UI thread after startup;
+    until it finishes substring queries scan the names instead.
+    """
+
+    def __init__(self, products: Sequence[dict]):
+        self.names: List[str] = []
+        self.categories: List[str] = []
+        for row in products:
+            name = (row.get("product_name") or "").strip()
+            if not name:
+                continue
+            self.names.append(name)
+            self.categories.append((row.get("category") or "").strip() or "other")
+
+        self.keys = [" ".join(name.lower().split()) for name in self.names]
+        self._alphabetical = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+
+        # Position of every product in category-then-name order
+        order = sorted(range(len(self.names)), key=lambda i: (self.categories[i].lower(), self.keys[i]))
+        self.rank = [0] * len(order)
+        for position, i in enumerate(order):
+            self.rank[i] = position
+        self.order = order
+
+        words = sorted((word, i) for i, key in enumerate(self.keys) for word in key.split())
+        self._words = [word for word, _ in words]
+        self._word_ids = [i for _, i in words]
+
+        self._trigram_index: Optional[Dict[str, List[int]]] = None
+        self._exact = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, name: str) -> Optional[int]:
+        return self._exact.get(name.strip().lower())
+
+    # ------------------------------------------------------------------
+    # SEARCH
+    # ------------------------------------------------------------------
+    def _word_prefix(self, query: str) -> Set[int]:
+        """Products with a word starting with `query`."""
+        found = set()
+        k = bisect_left(self._words, query)
+        while k < len(self._words) and self._words[k].startswith(query):
+            found.add(self._word_ids[k])
+            k += 1
+        return found
+
+    def build_trigrams(self):
+        index: Dict[str, List[int]] = {}
+        for i, key in enumerate(self.keys):
+            for gram in _trigrams(key):
+                index.setdefault(gram, []).append(i)
+        self._trigram_index = index
+
+    def _substring(self, query: str) -> Set[int]:
+        index = self._trigram_index
+        if index is None:
+            return {i for i, key in enumerate(self.keys) if query in key}
+        postings = [index.get(gram, ()) for gram in _trigrams(query)]
+        if not postings:
+            return set()
+        rarest = min(postings, key=len)
+        return {i for i in rarest if query in self.keys[i]}
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Product indices matching `query`. Names starting with it come first,
+        then names with a word starting with it, then any other names
+        containing it; each block is alphabetical.
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            return self._alphabetical[:limit] if limit is not None else list(self._alphabetical)
+
+        words = self._word_prefix(query.split()[0])
+        if " " in query:
+            words = {i for i in words if query in self.keys[i]}
+        blocks = [words]
+        if len(query) >= 3:
+            blocks.append(self._substring(query))
+
+        result = []
+        seen = set()
+        for block in blocks:
+            for i in sorted(block - seen, key=self._prefix_key(query)):
+                result.append(i)
+                if limit is not None and len(result) >= limit:
+                    return result
+            seen |= block
+        return result
+
+    def _prefix_key(self, query: str):
+        keys = self.keys
+        return lambda i: (not keys[i].startswith(query), keys[i])
+
+    # ------------------------------------------------------------------
+    # CATEGORY GROUPING
+    # ------------------------------------------------------------------
+    def grouped_rows(self, indices: Optional[Iterable[int]] = None,
+                     collapsed: Iterable[str] = ()) -> Tuple[List[Tuple[str, int]], Dict[str, int]]:
+        """
+        Rows for a category-grouped view: ("category", first product) heads
+        every group, followed by ("product", index) rows unless the category
+        is collapsed. `indices` defaults to the whole catalog.
+
+        Returns (rows, {category: number of matching products}).
+        """
+        members = self.order if indices is None else sorted(indices, key=self.rank.__getitem__)
+        collapsed = set(collapsed)
+        rows: List[Tuple[str, int]] = []
+        sizes: Dict[str, int] = {}
+        current = None
+        for i in members:
+            category = self.categories[i]
+            if category != current:
+                rows.append(("category", i))
+                current = category
+            sizes[category] = sizes.get(category, 0) + 1
+            if category not in collapsed:
+                rows.append(("product", i))
+        return rows, sizes
@@ -1,8 +1,14 @@
 import csv
+import threading
+import time
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional
+
+from ui.catalog_index import CatalogIndex
+from ui.session import SessionStore
+from ui.virtual_table import VirtualTable
 
 # Optional pandas support
 try:
@@ -13,9 +19,51 @@ except ImportError:
 
 # Preprocessing function
 try:
-    from preprocessing.preprocessing import clean_data
+    from preprocessing.preprocessing import clean_basket, clean_data, compress_baskets
 except Exception:
+    clean_basket = None
     clean_data = None
+    compress_baskets = None
+
+from algorithms.basket_scoring import BasketScorer
+from algorithms.cooccurrence import PairStats
+from algorithms.pair_sketch import PairSketch
+from preprocessing.transaction_store import TransactionStore, parse_transactions_frame
+
+# Live sliding-window miner for streamed baskets
+try:
+    from algorithms.streaming import StreamingMiner
+except Exception:
+    StreamingMiner = None
+
+# Mining lattice, cost estimates and single-product constrained mining (flat algorithm modules, see main.py)
+try:
+    from constrained import mine_containing
+    from explain import explain
+    from lattice import ItemsetLattice
+except Exception:
+    mine_containing = None
+    explain = None
+    ItemsetLattice = None
+
+# Thresholds for rules mined for the query panel
+QUERY_MIN_SUPPORT = 0.02
+QUERY_MIN_CONFIDENCE = 0.3
+QUERY_MAX_RULES = 5
+# Multi-item rules and Run Mining work on a background thread, checked for completion this often
+QUERY_POLL_MS = 50
+# Ask before starting a mining run projected to take longer than this
+MINING_CONFIRM_SECONDS = 30
+
+# Catalog search waits this long after the last keystroke
+CATALOG_SEARCH_DELAY_MS = 120
+# Suggestions offered by the product query box
+QUERY_SUGGESTIONS = 50
+
+# Session changes are written this long after the last one, on a background thread
+SESSION_SAVE_DELAY_MS = 2000
+# The writer is checked for failures this often until it is idle again
+SESSION_CHECK_MS = 250
 
 
 # ----------------------------------------------------------------------
@@ -41,34 +89,64 @@ class ProductBrowser(tk.Frame):
     """Main GUI for browsing products and constructing transactions."""
 
     def __init__(self, parent, products_csv: Path | None = None,
-                 transactions_csv: Path | None = None, *args, **kwargs):
+                 transactions_csv: Path | None = None, session_dir: Path | None = None,
+                 pair_sketch_mb: float | None = None, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
 
         # Locate data files
         self.products_csv = Path(products_csv) if products_csv else find_products_csv()
         self.transactions_csv = Path(transactions_csv) if transactions_csv else \
             self.products_csv.parent / "sample_transactions.csv"
+        # Sessions are opt-in: without session_dir nothing is saved or restored
+        self.session = SessionStore(session_dir) if session_dir else None
+        self._session_rows = 0            # transactions already handed to the writer
+        self._derived_version = 0         # bumped whenever association stats are rebuilt
+        self._session_derived_version = 0
+        self._session_save_pending = False
 
         # Data containers
         self.products: List[dict] = []
-        self.transactions: List[dict] = []
+        self.catalog = CatalogIndex([])
+        self.catalog_rows: List[tuple] = []
+        self.catalog_sizes: Dict[str, int] = {}
+        self.collapsed_categories: set = set()
+        self._catalog_search_job = None
+        self.transactions = TransactionStore()
         self.current_transaction: List[str] = []
         self.next_transaction_id: int = 1
 
-        # Mining stats (built from cleaned transactions)
+        # Mining stats (built from cleaned transactions); with pair_sketch_mb pair
+        # counts are kept in a fixed-size sketch instead of an exact matrix
+        self.pair_sketch_mb = pair_sketch_mb
         self.item_support: Dict[str, float] = {}
-        self.pair_confidence: Dict[Tuple[str, str], float] = {}
+        self.pair_stats = PairStats()
+        self.basket_scorer = BasketScorer()
+        self.mining_baskets = None
+        self.mining_result = None
+        # Itemsets mined once at the lowest support, re-filtered when the thresholds change
+        self.lattice = None
+        # Bumped by every query, so multi-item rules from an older query are dropped
+        self._query_generation = 0
+        # Bumped when a mining run starts or is cancelled, so a cancelled run's result is dropped
+        self._mining_generation = 0
+
+        # Sliding-window stats fed one transaction at a time
+        self.stream_miner = StreamingMiner() if StreamingMiner is not None else None
 
         # UI state
         self.status_var = tk.StringVar(value="Ready")
         self.stats_var = tk.StringVar(value="Transactions: 0 | Unique items: 0")
-        self.mining_method = tk.StringVar(value="eclat")  # default method
+        self.mining_method = tk.StringVar(value="auto")  # default method
+        self.mining_support = tk.DoubleVar(value=QUERY_MIN_SUPPORT)
+        self.mining_confidence = tk.DoubleVar(value=QUERY_MIN_CONFIDENCE)
+        self.use_live_window = tk.BooleanVar(value=False)
 
         # Load products & build UI
         self._load_products()
         self._create_widgets()
 
         self.new_transaction()
+        self.restore_session()
         self._update_stats()
 
     # ------------------------------------------------------------------
@@ -83,6 +161,10 @@ class ProductBrowser(tk.Frame):
             messagebox.showerror("Error", f"Could not load products.csv:\n{e}")
             self.products = []
 
+        self.catalog = CatalogIndex(self.products)
+        # Substring search scans names until the trigram index is ready
+        threading.Thread(target=self.catalog.build_trigrams, daemon=True).start()
+
     # ------------------------------------------------------------------
     # UI CONSTRUCTION
     # ------------------------------------------------------------------
@@ -109,10 +191,20 @@ class ProductBrowser(tk.Frame):
         alg_frame = tk.Frame(top)
         alg_frame.pack(side=tk.LEFT, padx=10)
         tk.Label(alg_frame, text="Mining Method:").pack(side=tk.LEFT)
+        tk.Radiobutton(alg_frame, text="Auto",
+                       variable=self.mining_method, value="auto").pack(side=tk.LEFT)
         tk.Radiobutton(alg_frame, text="Eclat",
                        variable=self.mining_method, value="eclat").pack(side=tk.LEFT)
         tk.Radiobutton(alg_frame, text="Apriori",
                        variable=self.mining_method, value="apriori").pack(side=tk.LEFT)
+        self.mine_btn = tk.Button(alg_frame, text="Run Mining", command=self.run_mining,
+                                  state=tk.NORMAL if ItemsetLattice is not None else tk.DISABLED)
+        self.mine_btn.pack(side=tk.LEFT, padx=4)
+        for label, var in (("Support:", self.mining_support), ("Confidence:", self.mining_confidence)):
+            tk.Label(alg_frame, text=label).pack(side=tk.LEFT)
+            tk.Spinbox(alg_frame, from_=0.01, to=1.0, increment=0.01, width=5,
+                       textvariable=var).pack(side=tk.LEFT)
+            var.trace_add("write", lambda *_: self._apply_thresholds())
 
         tk.Label(top, textvariable=self.status_var).pack(side=tk.RIGHT, padx=6)
         tk.Label(self, textvariable=self.stats_var).pack(fill=tk.X)
@@ -125,31 +217,22 @@ class ProductBrowser(tk.Frame):
         left = tk.LabelFrame(main, text="Products (click to add)")
         left.pack(side=tk.LEFT, fill=tk.Y, padx=6, pady=6)
 
-        canvas = tk.Canvas(left, width=220, borderwidth=0, highlightthickness=0)
-        scroll = tk.Scrollbar(left, orient="vertical", command=canvas.yview)
-        canvas.configure(yscrollcommand=scroll.set)
-        scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        btn_frame = tk.Frame(canvas)
-        canvas.create_window((0, 0), window=btn_frame, anchor="nw")
-
-        def _on_config(event):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-
-        btn_frame.bind("<Configure>", _on_config)
-
-        for row in self.products:
-            name = row.get("product_name", "").strip()
-            if not name:
-                continue
-            tk.Button(
-                btn_frame,
-                text=name,
-                width=22,
-                anchor="w",
-                command=lambda n=name: self.add_to_current(n)
-            ).pack(fill="x", pady=1)
+        self.catalog_search_var = tk.StringVar()
+        search = tk.Entry(left, textvariable=self.catalog_search_var, width=26)
+        search.pack(fill=tk.X, padx=2, pady=(2, 4))
+        self.catalog_search_var.trace_add("write", lambda *_: self._schedule_catalog_search())
+
+        self.catalog_table = VirtualTable(
+            left,
+            columns=[("name", "Product", 200, "w")],
+            row_count=lambda: len(self.catalog_rows),
+            get_row=self._catalog_row,
+            on_activate=self._on_catalog_activate,
+            show_headings=False,
+            height=20
+        )
+        self.catalog_table.pack(fill=tk.BOTH, expand=True)
+        self._apply_catalog_search()
 
         # ----- CURRENT TRANSACTION -----
         mid = tk.LabelFrame(main, text="Current Transaction")
@@ -166,13 +249,24 @@ class ProductBrowser(tk.Frame):
         tk.Button(mid_btns, text="Finalize Transaction", command=self.finalize_transaction)\
             .pack(side=tk.LEFT, padx=4)
 
+        # Live basket suggestions
+        tk.Label(mid, text="Suggested for this basket:").pack(anchor="w", padx=6)
+        self.suggest_var = tk.StringVar(value="(add items to see suggestions)")
+        tk.Label(mid, textvariable=self.suggest_var, width=40, anchor="w",
+                 wraplength=260, justify=tk.LEFT).pack(padx=6, pady=4)
+
         # ----- RAW TRANSACTIONS -----
         right = tk.LabelFrame(main, text="Transactions (Raw)")
         right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=6, pady=6)
 
-        self.raw_tree = ttk.Treeview(right, columns=("items",), show="headings", height=12)
-        self.raw_tree.heading("items", text="Items")
-        self.raw_tree.column("items", width=320, anchor="w")
+        self.raw_tree = VirtualTable(
+            right,
+            columns=[("tid", "ID", 60, "center"), ("items", "Items", 320, "w")],
+            row_count=lambda: len(self.transactions),
+            get_row=self._raw_row,
+            find_row=self._find_raw_row,
+            height=12
+        )
         self.raw_tree.pack(fill=tk.BOTH, expand=True)
 
         # ----- PRODUCT INSIGHTS PANEL -----
@@ -181,22 +275,73 @@ class ProductBrowser(tk.Frame):
 
         tk.Label(insights, text="Select a product:").pack(anchor="w")
 
-        product_names = [p.get("product_name", "") for p in self.products]
         self.query_var = tk.StringVar()
         self.query_box = ttk.Combobox(
             insights,
             textvariable=self.query_var,
-            values=product_names,
+            values=[self.catalog.names[i] for i in self.catalog.search("", QUERY_SUGGESTIONS)],
             state="normal"
         )
         self.query_box.pack(fill=tk.X, pady=4)
+        # Only the best matches for what has been typed so far are offered
+        self.query_box.bind("<KeyRelease>", self._update_query_suggestions)
 
         tk.Button(insights, text="Find Associations",
                   command=self.query_associations).pack(pady=4)
+        tk.Checkbutton(
+            insights,
+            text="Use live window",
+            variable=self.use_live_window,
+            state=tk.NORMAL if self.stream_miner is not None else tk.DISABLED
+        ).pack(anchor="w")
 
         self.query_results = tk.Text(insights, height=14, wrap="word")
         self.query_results.pack(fill=tk.BOTH, expand=True)
 
+    # ------------------------------------------------------------------
+    # CATALOG
+    # ------------------------------------------------------------------
+    def _schedule_catalog_search(self):
+        if self._catalog_search_job is not None:
+            self.after_cancel(self._catalog_search_job)
+        self._catalog_search_job = self.after(CATALOG_SEARCH_DELAY_MS, self._apply_catalog_search)
+
+    def _apply_catalog_search(self):
+        """Rebuild the grouped rows for the current search text."""
+        self._catalog_search_job = None
+        query = self.catalog_search_var.get().strip()
+        matches = self.catalog.search(query) if query else None
+        # A search shows every match, so groups are only collapsed while browsing
+        collapsed = () if query else self.collapsed_categories
+        self.catalog_rows, self.catalog_sizes = self.catalog.grouped_rows(matches, collapsed)
+        self.catalog_table.scroll_to(0)
+
+    def _catalog_row(self, index: int) -> tuple:
+        kind, i = self.catalog_rows[index]
+        if kind == "category":
+            category = self.catalog.categories[i]
+            marker = "▸" if category in self.collapsed_categories and \
+                not self.catalog_search_var.get().strip() else "▾"
+            return (f"{marker} {category} ({self.catalog_sizes[category]})",)
+        return (f"    {self.catalog.names[i]}",)
+
+    def _on_catalog_activate(self, index: int):
+        kind, i = self.catalog_rows[index]
+        if kind == "product":
+            self.add_to_current(self.catalog.names[i])
+            return
+        if self.catalog_search_var.get().strip():
+            return
+        category = self.catalog.categories[i]
+        self.collapsed_categories ^= {category}
+        first = self.catalog_table.first
+        self.catalog_rows, self.catalog_sizes = self.catalog.grouped_rows(None, self.collapsed_categories)
+        self.catalog_table.scroll_to(first)
+
+    def _update_query_suggestions(self, _event=None):
+        matches = self.catalog.search(self.query_var.get(), QUERY_SUGGESTIONS)
+        self.query_box["values"] = [self.catalog.names[i] for i in matches]
+
     # ------------------------------------------------------------------
     # TRANSACTION MANAGEMENT
     # ------------------------------------------------------------------
@@ -204,16 +349,40 @@ class ProductBrowser(tk.Frame):
         self.current_transaction.append(product_name)
         self.current_var.set(", ".join(self.current_transaction))
         self.status_var.set(f"Added {product_name}")
+        self._update_suggestions()
 
     def new_transaction(self):
         self.current_transaction = []
         self.current_var.set("(empty)")
         self.status_var.set("Started a new transaction")
+        self._update_suggestions()
+
+    def _update_suggestions(self, top_n: int = 5):
+        """Score the whole current basket against the antecedent index."""
+        if not self.current_transaction:
+            self.suggest_var.set("(add items to see suggestions)")
+            return
+        if not self.basket_scorer:
+            if self.mining_result is not None:
+                self.suggest_var.set("(no rules at these thresholds)")
+            else:
+                self.suggest_var.set("(no association data yet)")
+            return
+
+        ranked = self.basket_scorer.score(self.current_transaction, top_n=top_n)
+        if not ranked:
+            self.suggest_var.set("(no suggestions for this basket)")
+            return
+        self.suggest_var.set(", ".join(f"{item} ({conf * 100:.0f}%)" for item, conf in ranked))
 
     def _add_transaction(self, tid: int, items: List[str]):
-        self.transactions.append({"transaction_id": tid, "items": items})
-        display = ", ".join(items) if items else "(empty)"
-        self.raw_tree.insert("", "end", iid=str(tid), values=(display,))
+        self.transactions.append(tid, items)
+        self.raw_tree.schedule_refresh()
+        self.schedule_session_save()
+        if self.stream_miner is not None:
+            basket = self._stream_basket(items)
+            if basket:
+                self.stream_miner.add_transaction(basket)
         if tid >= self.next_transaction_id:
             self.next_transaction_id = tid + 1
 
@@ -222,6 +391,7 @@ class ProductBrowser(tk.Frame):
         self._add_transaction(tid, list(self.current_transaction))
         self.current_transaction = []
         self.current_var.set("(empty)")
+        self._update_suggestions()
         self.status_var.set(f"Finalized transaction {tid}")
         self._update_stats()
 
@@ -229,12 +399,46 @@ class ProductBrowser(tk.Frame):
         self.run_preprocessing(silent=True)
 
     def clear_transactions(self):
+        # Also drops the restored store's memory maps before the session writer truncates the files
         self.transactions.clear()
-        self.raw_tree.delete(*self.raw_tree.get_children())
+        self.raw_tree.refresh()
+        if self.stream_miner is not None:
+            self.stream_miner.clear()
         self.next_transaction_id = 1
+        self._session_rows = 0
+        self.schedule_session_save()
         self._update_stats()
         self.status_var.set("Cleared all transactions")
 
+    @staticmethod
+    def _stream_basket(items: List[str]) -> Optional[List[str]]:
+        """The basket as preprocessing leaves it, None for transactions it drops."""
+        if clean_basket is None:
+            return items or None
+        return clean_basket(items)
+
+    def _feed_stream_tail(self, items):
+        """Feed the last window's worth of cleaned baskets; older ones would be evicted straight away."""
+        tail = []
+        for raw in reversed(items):
+            basket = self._stream_basket(raw)
+            if basket:
+                tail.append(basket)
+                if len(tail) >= self.stream_miner.window_size:
+                    break
+        self.stream_miner.add_transactions(reversed(tail))
+
+    def _raw_row(self, index: int) -> tuple:
+        items = self.transactions.items[index]
+        display = ", ".join(items) if items else "(empty)"
+        return (self.transactions.tids[index], display)
+
+    def _find_raw_row(self, key: str) -> Optional[int]:
+        try:
+            return self.transactions.find(int(key))
+        except ValueError:
+            return None
+
     # ------------------------------------------------------------------
     # IMPORT CSV
     # ------------------------------------------------------------------
@@ -245,17 +449,8 @@ class ProductBrowser(tk.Frame):
         loaded = 0
         try:
             if pd_available:
-                df = pd.read_csv(path)
-                if "transaction_id" not in df.columns or "items" not in df.columns:
-                    raise ValueError("CSV must contain 'transaction_id' and 'items' columns")
-                for _, row in df.iterrows():
-                    items_raw = row["items"]
-                    if pd.isna(items_raw) or not str(items_raw).strip():
-                        continue
-                    items = [s.strip() for s in str(items_raw).split(",") if s.strip()]
-                    tid = int(row["transaction_id"])
-                    self._add_transaction(tid, items)
-                    loaded += 1
+                df = pd.read_csv(path, dtype={"items": str})
+                loaded = self._bulk_add_transactions(*parse_transactions_frame(df))
             else:
                 with open(path, newline="", encoding="utf-8") as f:
                     reader = csv.DictReader(f)
@@ -270,18 +465,49 @@ class ProductBrowser(tk.Frame):
 
             self.status_var.set(f"Imported {loaded} transactions")
             self._update_stats()
-            self.run_preprocessing(silent=True)
+            # Let the table repaint first, then preprocess the whole batch once
+            self.after_idle(lambda: self.run_preprocessing(silent=True))
 
         except Exception as e:
             messagebox.showerror("Import Failed", f"Could not import CSV:\n{e}")
 
+    def _bulk_add_transactions(self, tids: List[int], items: List[List[str]]) -> int:
+        """
+        Append parsed columns in one operation. The table repaint is
+        scheduled once and the caller runs preprocessing once afterwards.
+        """
+        if not tids:
+            return 0
+
+        self.transactions.extend(tids, items)
+        self.raw_tree.schedule_refresh()
+        self.schedule_session_save()
+
+        if self.stream_miner is not None:
+            self._feed_stream_tail(items)
+
+        self.next_transaction_id = max(self.next_transaction_id, max(tids) + 1)
+        return len(tids)
+
     # ------------------------------------------------------------------
     # STATS
     # ------------------------------------------------------------------
+    def diagnostic_sizes(self) -> dict:
+        """Data sizes logged next to slow handlers and main loop stalls."""
+        sizes = {
+            "transactions": len(self.transactions),
+            "unique_items": len(self.transactions.unique_items),
+            "catalog": len(self.catalog),
+            "pairs": int(self.pair_stats.cooc.nnz) if hasattr(self.pair_stats, "cooc") else len(self.pair_stats.heavy),
+        }
+        if self.mining_baskets is not None:
+            sizes["mining_rows"] = len(self.mining_baskets)
+        return sizes
+
     def _update_stats(self):
-        unique_items = {i.lower() for t in self.transactions for i in t["items"]}
         self.stats_var.set(
-            f"Transactions: {len(self.transactions)} | Unique items: {len(unique_items)}"
+            f"Transactions: {len(self.transactions)} | "
+            f"Unique items: {len(self.transactions.unique_items)}"
         )
 
     # ------------------------------------------------------------------
@@ -298,13 +524,7 @@ class ProductBrowser(tk.Frame):
                 messagebox.showinfo("Preprocessing", "No transactions to preprocess.")
             return
 
-        df = pd.DataFrame([
-            {
-                "transaction_id": t["transaction_id"],
-                "items": ",".join(t["items"]) if t["items"] else "(empty)"
-            }
-            for t in self.transactions
-        ])
+        df = self.transactions.to_frame()
 
         try:
             cleaned, report = clean_data(df, return_report=True)
@@ -327,36 +547,271 @@ class ProductBrowser(tk.Frame):
         """
         From cleaned transactions, compute:
         - item_support[item] = support in [0,1]
-        - pair_confidence[(a,b)] = P(b|a)
+        - pair_stats: sparse co-occurrence matrix giving P(b|a) and lift
+        - basket_scorer: antecedent index used for live basket suggestions until
+          Run Mining replaces it with the mined rules
         """
-        item_counts: Dict[str, int] = {}
-        pair_counts: Dict[Tuple[str, str], int] = {}
-
-        # Count supports
-        for _, row in cleaned_df.iterrows():
-            items = row.get("items", [])
-            if not isinstance(items, list):
-                continue
-            # Deduplicate within transaction just in case
-            unique_items = list(dict.fromkeys([str(i).lower() for i in items]))
-            for a in unique_items:
-                item_counts[a] = item_counts.get(a, 0) + 1
-            # Ordered pairs for confidence
-            for i in range(len(unique_items)):
-                for j in range(len(unique_items)):
-                    if i == j:
-                        continue
-                    a = unique_items[i]
-                    b = unique_items[j]
-                    pair_counts[(a, b)] = pair_counts.get((a, b), 0) + 1
-
-        n_tx = int(cleaned_df.shape[0]) or 1
-
-        self.item_support = {item: cnt / n_tx for item, cnt in item_counts.items()}
-        self.pair_confidence = {}
-        for (a, b), cnt in pair_counts.items():
-            base = item_counts.get(a, 1)
-            self.pair_confidence[(a, b)] = cnt / base
+        # Identical baskets are counted once, weighted by how often they occur
+        baskets = compress_baskets(cleaned_df) if compress_baskets is not None else cleaned_df
+        weights = baskets["weight"].to_numpy() if "weight" in baskets.columns else None
+        self.mining_baskets = baskets
+        self.mining_result = None
+        self.lattice = None
+        if self.pair_sketch_mb:
+            self.pair_stats = PairSketch.from_baskets(baskets["items"].tolist(), weights,
+                                                      memory_mb=self.pair_sketch_mb)
+        else:
+            self.pair_stats = PairStats.from_baskets(baskets["items"].tolist(), weights)
+        self.item_support = self.pair_stats.item_support
+        self.basket_scorer = BasketScorer.from_pair_stats(self.pair_stats)
+        self._derived_version += 1
+        self.schedule_session_save()
+
+    # ------------------------------------------------------------------
+    # SESSION SNAPSHOTS
+    # ------------------------------------------------------------------
+    def schedule_session_save(self):
+        """Coalesce bursts of changes into one background snapshot."""
+        if self.session is not None and not self._session_save_pending:
+            self._session_save_pending = True
+            self.after(SESSION_SAVE_DELAY_MS, self.save_session)
+
+    def _session_snapshot(self) -> dict:
+        """Only rows added since the last save, plus the derived stats if they were rebuilt."""
+        start = self._session_rows
+        snapshot = {
+            "start": start,
+            "tids": self.transactions.tids[start:],
+            "items": self.transactions.items[start:],
+            "next_transaction_id": self.next_transaction_id,
+        }
+        if self._derived_version != self._session_derived_version:
+            snapshot["derived"] = {
+                "cleaned": getattr(self, "last_cleaned", None),
+                "baskets": self.mining_baskets,
+                "report": getattr(self, "last_report", None),
+                # Sketches are rebuilt from the cleaned data instead of saved
+                "pair_stats": self.pair_stats if isinstance(self.pair_stats, PairStats) and self.pair_stats else None,
+            }
+            self._session_derived_version = self._derived_version
+        self._session_rows = len(self.transactions)
+        return snapshot
+
+    def save_session(self):
+        self._session_save_pending = False
+        self.session.submit(self._session_snapshot())
+        self.after(SESSION_CHECK_MS, self._check_session_writer)
+
+    def _check_session_writer(self):
+        """Report a failed background save in the status bar once the writer is idle."""
+        if self.session.busy:
+            self.after(SESSION_CHECK_MS, self._check_session_writer)
+            return
+        error = self._take_session_error()
+        if error is not None:
+            self.status_var.set(f"Session save failed, retried on the next change: {error}")
+
+    def _take_session_error(self) -> Optional[Exception]:
+        error = self.session.take_error()
+        if error is not None:
+            # Send everything after the last good snapshot again, derived stats included
+            self._session_rows = min(self._session_rows, self.session.saved_rows())
+            self._session_derived_version = -1
+        return error
+
+    def close_session(self):
+        """Write anything pending and wait for the writer, call before the window closes."""
+        if self.session is None:
+            return
+        self.save_session()
+        self.session.flush()
+        error = self._take_session_error()
+        if error is not None:
+            messagebox.showerror("Session", f"The session could not be saved:\n{error}")
+
+    def restore_session(self):
+        """Reopen the last session from its memory-mapped snapshot."""
+        if self.session is None:
+            return
+        try:
+            meta = self.session.read_meta()
+            if meta is None:
+                return
+            self.transactions = self.session.load_transactions(meta)
+            pair_stats = self.session.load_pair_stats(meta)
+        except Exception as e:
+            self.status_var.set(f"Could not restore session: {e}")
+            return
+
+        self._session_rows = len(self.transactions)
+        if self.stream_miner is not None:
+            self._feed_stream_tail(self.transactions.items)
+        self.next_transaction_id = max(meta.get("next_transaction_id", 1), self.transactions.max_tid + 1)
+        self.raw_tree.refresh()
+
+        if pair_stats is not None:
+            self.pair_stats = pair_stats
+            self.item_support = pair_stats.item_support
+            self.basket_scorer = BasketScorer.from_pair_stats(pair_stats)
+        if meta.get("report") is not None:
+            self.last_report = meta["report"]
+
+        # Frames are only needed for mining and the report table, decode them after the first paint
+        self.after_idle(lambda: self._restore_session_frames(meta))
+        self.status_var.set(f"Restored session ({len(self.transactions)} transactions)")
+
+    def _restore_session_frames(self, meta: dict):
+        try:
+            cleaned = self.session.load_frame(meta, "cleaned")
+            baskets = self.session.load_frame(meta, "baskets")
+        except Exception as e:
+            self.status_var.set(f"Could not restore session data: {e}")
+            return
+        if cleaned is not None:
+            self.last_cleaned = cleaned
+            if getattr(self, "last_report", None) is not None:
+                self.view_report_btn.config(state=tk.NORMAL)
+        if baskets is not None:
+            self.mining_baskets = baskets
+        # Sketch-backed stats are not part of the snapshot, rebuild them from the restored data
+        if cleaned is not None and not self.pair_stats:
+            self._build_association_stats(cleaned)
+
+    # ------------------------------------------------------------------
+    # MINING
+    # ------------------------------------------------------------------
+    def _thresholds(self):
+        try:
+            return float(self.mining_support.get()), float(self.mining_confidence.get())
+        except (tk.TclError, ValueError):
+            return None
+
+    def run_mining(self):
+        """
+        Mine the cleaned transactions with the selected engine ('auto' picks
+        one). The itemsets are kept as a lattice at the lowest support used,
+        so changing the thresholds afterwards only filters them. The cost
+        estimate and the mining run on a background thread.
+        """
+        if self.mining_baskets is None:
+            self.run_preprocessing(silent=True)
+        if self.mining_baskets is None:
+            messagebox.showinfo("Mining", "No transactions to mine.")
+            return
+        thresholds = self._thresholds()
+        if thresholds is None:
+            messagebox.showerror("Mining", "Support and confidence must be numbers.")
+            return
+        support, confidence = thresholds
+        base = min(support, QUERY_MIN_SUPPORT)
+        engine = self.mining_method.get()
+        baskets = self.mining_baskets
+        # The button cancels the run until it finishes
+        self._mining_generation += 1
+        self.mine_btn.config(text="Cancel Mining", command=self.cancel_mining)
+
+        if explain is None:
+            self._start_lattice_mining(baskets, base, engine)
+            return
+        # Built from the same baskets; sketch-backed stats have no exact pair matrix to reuse
+        pair_stats = self.pair_stats if isinstance(self.pair_stats, PairStats) and self.pair_stats else None
+        self._start_mining_thread(
+            "Estimating mining cost",
+            lambda: explain(baskets, base, confidence, pair_stats=pair_stats),
+            lambda result: self._confirm_mining(result, baskets, base, engine),
+        )
+
+    def cancel_mining(self):
+        """Stop waiting for the current run; its thread finishes in the background and is ignored."""
+        self._mining_generation += 1
+        self._mining_done()
+        self.status_var.set("Mining cancelled")
+
+    def _mining_done(self):
+        self.mine_btn.config(text="Run Mining", command=self.run_mining)
+
+    def _start_mining_thread(self, label: str, work, done):
+        """
+        Run `work` on a background thread, showing `label` and the elapsed
+        time, then call `done` with its result dict on the Tk thread unless
+        the run was cancelled meanwhile.
+        """
+        result = {}
+
+        def target():
+            try:
+                result["value"] = work()
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self.status_var.set(f"{label}... (Cancel Mining to stop)")
+        self.after(QUERY_POLL_MS, self._poll_mining_thread, thread, result, done,
+                   label, time.time(), self._mining_generation)
+
+    def _poll_mining_thread(self, thread: threading.Thread, result: dict, done,
+                            label: str, started: float, generation: int):
+        if generation != self._mining_generation:
+            return
+        if thread.is_alive():
+            self.status_var.set(f"{label}... {time.time() - started:.0f} s (Cancel Mining to stop)")
+            self.after(QUERY_POLL_MS, self._poll_mining_thread, thread, result, done,
+                       label, started, generation)
+            return
+        done(result)
+
+    def _confirm_mining(self, result: dict, baskets, base: float, engine: str):
+        if "error" in result:
+            self._mining_failed(result["error"])
+            return
+        plan = result["value"]
+        planned = plan.auto_engine if engine == "auto" else engine
+        if plan.truncated or plan.engines[planned]["seconds"] > MINING_CONFIRM_SECONDS:
+            if not messagebox.askyesno("Mining", f"{plan.summary()}\n\nRun {planned} anyway?"):
+                self.cancel_mining()
+                return
+        self._start_lattice_mining(baskets, base, engine)
+
+    def _start_lattice_mining(self, baskets, base: float, engine: str):
+        self._start_mining_thread(
+            f"Mining at support {base:g}",
+            lambda: ItemsetLattice.mine(baskets, base, engine),
+            lambda result: self._finish_lattice_mining(result, baskets),
+        )
+
+    def _finish_lattice_mining(self, result: dict, baskets):
+        if "error" in result:
+            self._mining_failed(result["error"])
+            return
+        self._mining_done()
+        # Preprocessing rebuilt the baskets while mining, the lattice no longer matches them
+        if baskets is not self.mining_baskets:
+            self.status_var.set("Transactions changed while mining; Run Mining again")
+            return
+        self.lattice = result["value"]
+        self._apply_thresholds()
+
+    def _mining_failed(self, error: Exception):
+        self._mining_done()
+        self.status_var.set("Mining failed")
+        messagebox.showerror("Error", f"Mining failed:\n{error}")
+
+    def _apply_thresholds(self):
+        """Answer the current support / confidence from the lattice without mining again."""
+        thresholds = self._thresholds()
+        if self.lattice is None or thresholds is None:
+            return
+        support, confidence = thresholds
+        if support < self.lattice.base_support:
+            self.status_var.set(f"Mined at support {self.lattice.base_support:g}; Run Mining again to go lower")
+            return
+        self.mining_result = self.lattice.result(support, confidence)
+        # Live suggestions use the mined rules, multi-item antecedents included
+        self.basket_scorer = BasketScorer.from_rules(self.mining_result.rules)
+        self._update_suggestions()
+        self.status_var.set(f"{self.mining_result.summary()} from itemsets mined at "
+                            f"support {self.lattice.base_support:g}")
 
     # ------------------------------------------------------------------
     # VIEW REPORT
@@ -407,35 +862,48 @@ class ProductBrowser(tk.Frame):
         table_frame = tk.Frame(win)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        tree = ttk.Treeview(table_frame, columns=("tid", "items"), show="headings")
-        tree.heading("tid", text="Transaction ID")
-        tree.heading("items", text="Items")
-        tree.column("tid", width=120, anchor="center")
-        tree.column("items", width=650, anchor="w")
+        # Rows are rendered on demand, so opening the report costs the same
+        # for ten transactions or a million.
+        tid_col = cleaned_df["transaction_id"]
+        items_col = cleaned_df["items"]
 
-        vsb = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=vsb.set)
-
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-
-        for _, row in cleaned_df.iterrows():
-            tid = row.get("transaction_id")
-            items = row.get("items")
+        def get_row(index: int) -> tuple:
+            items = items_col.iat[index]
             if isinstance(items, list):
                 items = ", ".join(items)
-            tree.insert("", "end", values=(tid, items))
+            return (tid_col.iat[index], items)
+
+        def find_row(key: str) -> Optional[int]:
+            try:
+                tid = int(key)
+            except ValueError:
+                return None
+            hits = (tid_col.to_numpy() == tid).nonzero()[0]
+            return int(hits[0]) if len(hits) else None
+
+        table = VirtualTable(
+            table_frame,
+            columns=[("tid", "Transaction ID", 120, "center"), ("items", "Items", 650, "w")],
+            row_count=lambda: int(cleaned_df.shape[0]),
+            get_row=get_row,
+            find_row=find_row
+        )
+        table.pack(fill=tk.BOTH, expand=True)
 
     # ------------------------------------------------------------------
     # INTERACTIVE QUERY
     # ------------------------------------------------------------------
     def query_associations(self):
+        self._query_generation += 1
         product = self.query_var.get().strip().lower()
         if not product:
             messagebox.showinfo("Query", "Please select a product.")
             return
 
-        if not self.pair_confidence:
+        live = self.use_live_window.get() and self.stream_miner is not None
+        has_data = len(self.stream_miner) > 0 if live else bool(self.pair_stats)
+
+        if not has_data:
             self.query_results.delete("1.0", tk.END)
             self.query_results.insert(
                 "1.0",
@@ -444,7 +912,14 @@ class ProductBrowser(tk.Frame):
             )
             return
 
-        associations = self._get_associations_for(product)
+        mined = False
+        if live:
+            associations = self.stream_miner.associations_for(product)
+        else:
+            associations = self.mining_result.associations_for(product) if self.mining_result else []
+            mined = bool(associations)
+            if not mined:
+                associations = self._get_associations_for(product)
 
         self.query_results.delete("1.0", tk.END)
 
@@ -455,10 +930,23 @@ class ProductBrowser(tk.Frame):
             )
             return
 
-        method = self.mining_method.get().capitalize()
+        method = "Pairwise"
+        if live:
+            method = f"Live window ({len(self.stream_miner)} tx)"
+        elif mined:
+            method = self.mining_result.engine.capitalize()
         result_text = (
             f"{method} Associations for '{product}':\n\n"
         )
+        if mined:
+            result_text = f"{self.mining_result.summary()}\n\n" + result_text
+        elif not live and isinstance(self.pair_stats, PairSketch):
+            bounds = self.pair_stats.error_bounds()
+            result_text = (
+                f"Sketch ({bounds['memory_mb']:g} MB): pairs seen more than "
+                f"{bounds['heavy_hitter_count']:.0f} times are always listed, "
+                f"counts are at most {bounds['max_overcount']} too high\n\n"
+            ) + result_text
         for item, pct in associations:
             result_text += f" • {item} — {pct:.1f}%\n"
 
@@ -471,16 +959,58 @@ class ProductBrowser(tk.Frame):
         )
 
         self.query_results.insert("1.0", result_text)
+        if not live:
+            self._start_multi_item_rules(product)
+
+    def _start_multi_item_rules(self, product: str):
+        """Mine the multi-item rules for `product` on a background thread and append them when done."""
+        if mine_containing is None or self.mining_baskets is None:
+            return
+        baskets = self.mining_baskets
+        result = {}
+
+        def work():
+            try:
+                result["text"] = self._multi_item_rules_text(baskets, product)
+            except Exception as e:
+                result["text"] = f"\n\nMulti-item rules failed: {e}\n"
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        # The placeholder after this mark is replaced by the rules
+        self.query_results.mark_set("multi_item_rules", "end-1c")
+        self.query_results.mark_gravity("multi_item_rules", tk.LEFT)
+        self.query_results.insert(tk.END, "\n\nMining multi-item rules...")
+        self.after(QUERY_POLL_MS, self._finish_multi_item_rules, thread, result, self._query_generation)
+
+    def _finish_multi_item_rules(self, thread: threading.Thread, result: dict, generation: int):
+        if generation != self._query_generation:
+            return
+        if thread.is_alive():
+            self.after(QUERY_POLL_MS, self._finish_multi_item_rules, thread, result, generation)
+            return
+        self.query_results.delete("multi_item_rules", tk.END)
+        self.query_results.insert(tk.END, result.get("text", ""))
+
+    @staticmethod
+    def _multi_item_rules_text(baskets, product: str) -> str:
+        """Rules with more than two items involving `product`, mined on the product's transactions only."""
+        rules = mine_containing(baskets, product, QUERY_MIN_SUPPORT, QUERY_MIN_CONFIDENCE, max_size=3)
+        if rules == -1:
+            return ""
+        rules = [r for r in rules if len(r.first) + len(r.second) > 2]
+        if not rules:
+            return ""
+        rules.sort(key=lambda r: (-r.confidence, -r.lift))
+        text = "\n\nMulti-item rules:\n"
+        for r in rules[:QUERY_MAX_RULES]:
+            text += (f" • {', '.join(sorted(r.first))} → {', '.join(sorted(r.second))}"
+                     f" — {r.confidence * 100:.1f}% (lift {r.lift:.2f})\n")
+        return text
 
     def _get_associations_for(self, product: str, min_conf: float = 0.05):
         """
         Return a list of (other_item, confidence_percent) for the given product,
         sorted by confidence descending.
         """
-        scores: Dict[str, float] = {}
-        for (a, b), conf in self.pair_confidence.items():
-            if a == product and conf >= min_conf:
-                scores[b] = max(scores.get(b, 0.0), conf)
-
-        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        return [(item, conf * 100.0) for item, conf in ranked]
+        return self.pair_stats.associations_for(product, min_conf)
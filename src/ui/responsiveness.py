@@ -0,0 +1,362 @@
+import json
+import time
+import tkinter as tk
+from collections import deque
+from pathlib import Path
+from tkinter import ttk, filedialog, messagebox
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+# Histogram bucket upper edges in ms; the last bucket holds everything slower
+BUCKET_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Latencies kept per handler for the rolling histogram and percentiles
+HISTORY = 1000
+
+# The heartbeat asks to run every HEARTBEAT_MS; arriving STALL_MS late means the loop was blocked
+HEARTBEAT_MS = 100
+STALL_MS = 200
+# Handlers slower than this are logged with the data sizes at the time
+SLOW_HANDLER_MS = 100
+EVENT_LOG = 500
+
+DIAGNOSTICS_REFRESH_MS = 1000
+
+
+def _handler_name(func) -> str:
+    """Readable name of a Tk callback, e.g. ProductBrowser.finalize_transaction."""
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None) or repr(func)
+    # after() wraps callbacks in a local callit that copies the wrapped function's __name__
+    if name.endswith("<locals>.callit"):
+        name = f"after:{func.__name__}"
+    return name
+
+
+# ----------------------------------------------------------------------
+# ROLLING HISTOGRAM
+# ----------------------------------------------------------------------
+class LatencyHistogram:
+    """Last HISTORY latencies of one handler, bucketed, plus lifetime totals."""
+
+    def __init__(self, history: int = HISTORY):
+        self.samples: deque = deque(maxlen=history)
+        self.buckets = [0] * (len(BUCKET_EDGES_MS) + 1)
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @staticmethod
+    def _bucket(ms: float) -> int:
+        for k, edge in enumerate(BUCKET_EDGES_MS):
+            if ms <= edge:
+                return k
+        return len(BUCKET_EDGES_MS)
+
+    def record(self, ms: float):
+        if len(self.samples) == self.samples.maxlen:
+            self.buckets[self._bucket(self.samples[0])] -= 1
+        self.samples.append(ms)
+        self.buckets[self._bucket(ms)] += 1
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self) -> dict:
+        samples = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        labels = [f"<={edge}ms" for edge in BUCKET_EDGES_MS] + [f">{BUCKET_EDGES_MS[-1]}ms"]
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ms,
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": self.max_ms,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+# ----------------------------------------------------------------------
+# MAIN LOOP MONITOR
+# ----------------------------------------------------------------------
+class ResponsivenessMonitor:
+    """
+    Times the Tk callbacks of one root window (commands, bindings, after()
+    jobs) and watches for main loop stalls.
+
+    install() hooks tkinter's CallWrapper until uninstall(). Only callbacks
+    registered on widgets of `root` while installed are timed, other roots
+    are left alone, and widgets passed to exclude() (the diagnostics window)
+    are never timed. After uninstall() the hooked callbacks call straight
+    through. install() must run before the widgets whose callbacks should be
+    timed are created.
+
+    instrument() additionally times named methods when they are called
+    directly, e.g. run_preprocessing from inside finalize_transaction, and
+    uninstall() puts the original methods back. A heartbeat after() job
+    measures how late it runs; a late beat is logged as a stall and blamed
+    on the slowest handler that ran since the previous beat, together with
+    the data sizes reported by `sizes`.
+    """
+
+    def __init__(self, root: tk.Misc, sizes: Optional[Callable[[], dict]] = None):
+        self.root = root
+        self.sizes = sizes
+        self.handlers: Dict[str, LatencyHistogram] = {}
+        self.heartbeat = LatencyHistogram()
+        self.events: deque = deque(maxlen=EVENT_LOG)
+        self.started = time.time()
+        self._original_wrapper = None
+        self._wrapper = None
+        self._active = False
+        self._excluded: List[str] = []
+        self._instrumented: List[tuple] = []   # (obj, name, instance attribute it replaced or None)
+        self._beat_command = None
+        self._beat_job = None
+        self._expected = 0.0
+        self._depth = 0
+        self._slowest: Optional[tuple] = None   # (ms, name) since the last beat
+
+    # ------------------------------------------------------------------
+    # TIMING
+    # ------------------------------------------------------------------
+    def _sizes(self) -> dict:
+        if self.sizes is None:
+            return {}
+        try:
+            return self.sizes()
+        except Exception:
+            return {}
+
+    def record(self, name: str, ms: float, outermost: bool = True):
+        self.handlers.setdefault(name, LatencyHistogram()).record(ms)
+        if outermost and (self._slowest is None or ms > self._slowest[0]):
+            self._slowest = (ms, name)
+        if ms >= SLOW_HANDLER_MS:
+            self._log("slow_handler", handler=name, ms=round(ms, 1), sizes=self._sizes())
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        monitor = self
+
+        def call(*args, **kwargs):
+            if not monitor._active:
+                return func(*args, **kwargs)
+            monitor._depth += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                monitor._depth -= 1
+                monitor.record(name, (time.perf_counter() - start) * 1000, monitor._depth == 0)
+        call.__name__ = getattr(func, "__name__", name)
+        return call
+
+    def instrument(self, obj, names: Iterable[str]):
+        """Time direct calls of obj.<name> for each name until uninstall() (callbacks are timed by install())."""
+        for name in names:
+            method = getattr(obj, name)
+            self._instrumented.append((obj, name, obj.__dict__.get(name)))
+            setattr(obj, name, self.timed(f"{type(obj).__name__}.{name}", method))
+        self._active = True
+
+    def uninstrument(self):
+        """Put back the methods replaced by instrument()."""
+        for obj, name, replaced in reversed(self._instrumented):
+            if replaced is None:
+                obj.__dict__.pop(name, None)
+            else:
+                setattr(obj, name, replaced)
+        self._instrumented = []
+
+    def exclude(self, widget: tk.Misc):
+        """Never time callbacks of `widget` or its children, e.g. the monitor's own window."""
+        self._excluded.append(str(widget))
+
+    def _times(self, widget) -> bool:
+        if widget is None or not self._active:
+            return False
+        try:
+            if widget._root() is not self.root._root():
+                return False
+        except AttributeError:
+            return False
+        path = str(widget)
+        return not any(path == p or path.startswith(p + ".") for p in self._excluded)
+
+    def install(self):
+        if self._original_wrapper is not None:
+            return
+        monitor = self
+        original = tk.CallWrapper
+
+        class TimedCallWrapper(original):
+            def __init__(self, func, subst, widget):
+                super().__init__(func, subst, widget)
+                if monitor._times(widget):
+                    self.func = monitor.timed(_handler_name(func), func)
+
+        # Registered before the hook so the heartbeat does not time itself
+        self._beat_command = self.root.register(self._beat)
+        self._original_wrapper = original
+        self._wrapper = TimedCallWrapper
+        self._active = True
+        tk.CallWrapper = TimedCallWrapper
+        self._schedule_beat()
+
+    def uninstall(self):
+        """Stop timing: restore CallWrapper and instrumented methods, stop the heartbeat."""
+        self._active = False
+        if self._original_wrapper is not None:
+            # Leave a wrapper someone installed on top of ours in place, ours now calls straight through
+            if tk.CallWrapper is self._wrapper:
+                tk.CallWrapper = self._original_wrapper
+            self._original_wrapper = None
+            self._wrapper = None
+        self.uninstrument()
+        try:
+            if self._beat_job is not None:
+                self.root.tk.call("after", "cancel", self._beat_job)
+            if self._beat_command is not None:
+                self.root.deletecommand(self._beat_command)
+        except tk.TclError:
+            pass
+        self._beat_job = None
+        self._beat_command = None
+
+    # ------------------------------------------------------------------
+    # HEARTBEAT
+    # ------------------------------------------------------------------
+    def _schedule_beat(self):
+        self._expected = time.perf_counter() + HEARTBEAT_MS / 1000
+        self._beat_job = self.root.tk.call("after", HEARTBEAT_MS, self._beat_command)
+
+    def _beat(self):
+        late_ms = max(0.0, (time.perf_counter() - self._expected) * 1000)
+        self.heartbeat.record(late_ms)
+        if late_ms >= STALL_MS:
+            ms, name = self._slowest if self._slowest else (0.0, None)
+            self._log("stall", ms=round(late_ms, 1), handler=name, handler_ms=round(ms, 1),
+                      sizes=self._sizes())
+        self._slowest = None
+        self._schedule_beat()
+
+    # ------------------------------------------------------------------
+    # REPORTING
+    # ------------------------------------------------------------------
+    def _log(self, kind: str, **fields):
+        self.events.append({"time": time.time(), "kind": kind, **fields})
+
+    def stalls(self) -> List[dict]:
+        return [e for e in self.events if e["kind"] == "stall"]
+
+    def snapshot(self) -> dict:
+        return {
+            "uptime_s": time.time() - self.started,
+            "heartbeat_ms": HEARTBEAT_MS,
+            "stall_ms": STALL_MS,
+            "heartbeat_lateness": self.heartbeat.snapshot(),
+            "handlers": {name: h.snapshot() for name, h in self.handlers.items()},
+            "events": list(self.events),
+            "sizes": self._sizes(),
+        }
+
+    def export(self, path):
+        """Write the snapshot (histograms, stalls, slow handlers) as JSON."""
+        Path(path).write_text(json.dumps(self.snapshot(), indent=2, default=str))
+
+
+# ----------------------------------------------------------------------
+# DIAGNOSTICS WINDOW
+# ----------------------------------------------------------------------
+class DiagnosticsWindow(tk.Toplevel):
+    """Handler latency table, stall log and export button, refreshed every second."""
+
+    COLUMNS = ("handler", "calls", "p50", "p99", "max", "total")
+
+    def __init__(self, parent, monitor: ResponsivenessMonitor):
+        super().__init__(parent)
+        self.title("UI Responsiveness")
+        self.geometry("900x560")
+        self.monitor = monitor
+        # The window's own refresh, buttons and bindings would otherwise show up in the table
+        monitor.exclude(self)
+        self._job = None
+
+        top = tk.Frame(self)
+        top.pack(fill=tk.X, padx=10, pady=(10, 4))
+        self.summary_var = tk.StringVar()
+        tk.Label(top, textvariable=self.summary_var, anchor="w").pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(top, text="Export Log...", command=self.export).pack(side=tk.RIGHT)
+
+        self.table = ttk.Treeview(self, columns=self.COLUMNS, show="headings", height=12)
+        for col, width in zip(self.COLUMNS, (360, 70, 80, 80, 80, 90)):
+            self.table.heading(col, text=col if col in ("handler", "calls") else f"{col} (ms)")
+            self.table.column(col, width=width, anchor="w" if col == "handler" else "e")
+        self.table.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.table.bind("<<TreeviewSelect>>", lambda _e: self.refresh(reschedule=False))
+
+        self.detail = tk.Text(self, height=12, wrap="none")
+        self.detail.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def refresh(self, reschedule: bool = True):
+        snap = self.monitor.snapshot()
+        beat = snap["heartbeat_lateness"]
+        self.summary_var.set(
+            f"Heartbeat lateness p50 {beat['p50_ms']:.0f} ms, p99 {beat['p99_ms']:.0f} ms, "
+            f"max {beat['max_ms']:.0f} ms | stalls: {len(self.monitor.stalls())}"
+        )
+
+        selected = self.table.selection()
+        selected = selected[0] if selected else None
+        self.table.delete(*self.table.get_children())
+        ordered = sorted(snap["handlers"].items(), key=lambda kv: -kv[1]["total_ms"])
+        for name, h in ordered:
+            self.table.insert("", tk.END, iid=name, values=(
+                name, h["calls"], f"{h['p50_ms']:.1f}", f"{h['p99_ms']:.1f}",
+                f"{h['max_ms']:.1f}", f"{h['total_ms']:.0f}"
+            ))
+        if selected and self.table.exists(selected):
+            self.table.selection_set(selected)
+
+        lines = []
+        if selected in snap["handlers"]:
+            lines.append(f"{selected} latency histogram (last {HISTORY} calls):")
+            for label, count in snap["handlers"][selected]["histogram"].items():
+                lines.append(f"  {label:>10} {count:6d} {'#' * min(count, 60)}")
+            lines.append("")
+        lines.append("Recent stalls and slow handlers:")
+        for event in reversed(snap["events"][-50:]):
+            stamp = time.strftime("%H:%M:%S", time.localtime(event["time"]))
+            if event["kind"] == "stall":
+                lines.append(f"  {stamp} stall {event['ms']} ms, slowest handler "
+                             f"{event['handler']} ({event['handler_ms']} ms) {event['sizes']}")
+            else:
+                lines.append(f"  {stamp} {event['handler']} took {event['ms']} ms {event['sizes']}")
+        self.detail.delete("1.0", tk.END)
+        self.detail.insert("1.0", "\n".join(lines))
+
+        if reschedule:
+            self._job = self.after(DIAGNOSTICS_REFRESH_MS, self.refresh)
+
+    def export(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export responsiveness log",
+            defaultextension=".json", filetypes=[("JSON", "*.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            self.monitor.export(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not export log:\n{e}", parent=self)
+
+    def close(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self.destroy()
@@ -0,0 +1,339 @@
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from algorithms.cooccurrence import PairStats
+from preprocessing.transaction_store import TransactionStore
+
+
+SESSION_VERSION = 3
+
+# Append-only columns: tid per row, end offset per row, item ids back to back. Transactions
+# live in tx_<column>.bin, the cleaned and compressed frames in <frame>_<column>.bin
+TX_FILES = {"tids": np.int64, "ends": np.int64, "ids": np.int32}
+FRAMES = ("cleaned", "baskets")
+
+
+def _replace_json(path: Path, payload: dict):
+    tmp = path.with_suffix(".tmp")
+    # Report values can be numpy scalars
+    tmp.write_text(json.dumps(payload, default=lambda o: o.item() if hasattr(o, "item") else str(o)))
+    os.replace(tmp, path)
+
+
+def _save_array(path: Path, array):
+    tmp = path.with_name(path.stem + ".tmp.npy")
+    np.save(tmp, np.ascontiguousarray(array))
+    os.replace(tmp, path)
+
+
+PAIR_PARTS = ("counts", "data", "indices", "indptr")
+
+
+def _pair_file(directory: Path, generation: int, part: str) -> Path:
+    return directory / f"pairs_{generation}_{part}.npy"
+
+
+def _read_column(path: Path, name: str, count: int, start: int = 0) -> np.ndarray:
+    """Rows [start, start + count) of a column file, read into memory rather than memory-mapped."""
+    dtype = np.dtype(TX_FILES[name])
+    if not count or not path.exists():
+        return np.zeros(0, dtype=dtype)
+    return np.fromfile(path, dtype=dtype, count=count, offset=start * dtype.itemsize)
+
+
+def _append_column(path: Path, name: str, values):
+    with open(path, "ab") as f:
+        f.write(np.asarray(values).astype(TX_FILES[name]).tobytes())
+
+
+def _truncate_column(path: Path, name: str, count: int):
+    with open(path, "ab") as f:
+        f.truncate(count * np.dtype(TX_FILES[name]).itemsize)
+
+
+# ----------------------------------------------------------------------
+# SESSION SNAPSHOTS
+# ----------------------------------------------------------------------
+class SessionStore:
+    """
+    Binary snapshot of a ProductBrowser session in one directory.
+
+    Transactions are appended to raw column files as they arrive, so saving
+    after a new basket writes only that basket. The cleaned and compressed
+    frames are stored the same way: a rebuilt frame is encoded with numpy
+    and only the rows past the unchanged prefix on disk are appended
+    (basket weights are small and rewritten as .npy files). meta.json
+    is replaced last and records how many rows are valid, so an interrupted
+    write never corrupts the previous snapshot.
+
+    Writes run on a background thread. Restore memory-maps the transaction
+    columns and pair stats; the writer itself never maps a file it may
+    truncate, and truncates only after the UI dropped its own maps (a clear).
+    Pair stats are never rewritten in place (Windows refuses to replace a
+    mapped file): each save goes to new generation-numbered files named in
+    meta.json, and older generations are removed once nothing maps them.
+    A failed write is kept in last_error for the UI to report.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.vocab: List[str] = []
+        self.vocab_index: Dict[str, int] = {}
+        self.meta: dict = {}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[Exception] = None
+
+    # ------------------------------------------------------------------
+    # BACKGROUND WRITER
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, snapshot: dict):
+        """Queue a snapshot built by the UI thread (see ProductBrowser._session_snapshot)."""
+        self.start()
+        self._queue.put(snapshot)
+
+    def flush(self):
+        """Block until every queued snapshot is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    @property
+    def busy(self) -> bool:
+        """Snapshots are queued or being written."""
+        return self._queue.unfinished_tasks > 0
+
+    def take_error(self) -> Optional[Exception]:
+        """The first write failure since the previous call, if any."""
+        error, self.last_error = self.last_error, None
+        return error
+
+    def saved_rows(self) -> int:
+        """Transactions the snapshot on disk holds; call while the writer is idle."""
+        meta = self.meta or self.read_meta()
+        return meta["rows"] if meta else 0
+
+    def _run(self):
+        while True:
+            snapshot = self._queue.get()
+            try:
+                self.write(snapshot)
+            except Exception as e:
+                # Keep the first failure, later snapshots usually fail because of it
+                self.last_error = self.last_error or e
+                # meta.json still describes the last good snapshot, start again from it
+                self.meta = {}
+            finally:
+                self._queue.task_done()
+
+    # ------------------------------------------------------------------
+    # WRITING
+    # ------------------------------------------------------------------
+    def _encode(self, rows):
+        ids = []
+        lengths = []
+        index = self.vocab_index
+        for items in rows:
+            for item in items:
+                if item not in index:
+                    index[item] = len(self.vocab)
+                    self.vocab.append(item)
+                ids.append(index[item])
+            lengths.append(len(items))
+        return np.asarray(ids, dtype=np.int32), np.asarray(lengths, dtype=np.int64)
+
+    def _encode_column(self, items: pd.Series) -> np.ndarray:
+        """Item ids of every row back to back; only the distinct items are looked up in Python."""
+        codes, uniques = pd.factorize(items.explode().dropna())
+        index = self.vocab_index
+        for item in uniques:
+            if item not in index:
+                index[item] = len(self.vocab)
+                self.vocab.append(item)
+        lookup = np.array([index[item] for item in uniques], dtype=np.int32)
+        return lookup[codes] if len(codes) else np.zeros(0, dtype=np.int32)
+
+    def _truncate(self, prefix: str, info: dict, rows: int):
+        """Drop rows past `rows` from the <prefix>_*.bin columns described by `info`."""
+        ends = _read_column(self.directory / f"{prefix}_ends.bin", "ends", 1, rows - 1) if rows else []
+        id_count = int(ends[0]) if len(ends) else 0
+        for name, count in (("tids", rows), ("ends", rows), ("ids", id_count)):
+            _truncate_column(self.directory / f"{prefix}_{name}.bin", name, count)
+        info["rows"] = rows
+        info["ids"] = id_count
+
+    def write(self, snapshot: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self.meta:
+            self.meta = self.read_meta() or {"version": SESSION_VERSION, "rows": 0, "ids": 0}
+            self.vocab = list(self.meta.get("vocab", []))
+            self.vocab_index = {item: i for i, item in enumerate(self.vocab)}
+
+        # Transactions were cleared: what was derived from the old ones no longer applies
+        if snapshot["start"] < self.meta["rows"]:
+            for name in FRAMES + ("pair_stats", "report"):
+                self.meta.pop(name, None)
+        # Rows between the saved ones and this snapshot were lost with a failed write
+        if snapshot["start"] > self.meta["rows"]:
+            raise RuntimeError(f"Transactions {self.meta['rows']} to {snapshot['start']} were not saved")
+        # Anything past what meta.json vouches for is a leftover and gets cut first
+        self._truncate("tx", self.meta, min(snapshot["start"], self.meta["rows"]))
+
+        ids, lengths = self._encode(snapshot["items"])
+        if len(lengths):
+            ends = self.meta["ids"] + np.cumsum(lengths)
+            for name, values in (("tids", np.asarray(snapshot["tids"], dtype=np.int64)),
+                                 ("ends", ends), ("ids", ids)):
+                _append_column(self.directory / f"tx_{name}.bin", name, values)
+            self.meta["rows"] += len(lengths)
+            self.meta["ids"] += len(ids)
+
+        derived = snapshot.get("derived")
+        if derived is not None:
+            for name in FRAMES:
+                self._write_frame(name, derived.get(name))
+            self._write_pair_stats(derived.get("pair_stats"))
+            self.meta["report"] = derived.get("report")
+
+        self.meta["next_transaction_id"] = snapshot.get("next_transaction_id", 1)
+        self.meta["vocab"] = self.vocab
+        _replace_json(self.directory / "meta.json", self.meta)
+        self._remove_old_pair_stats()
+
+    def _saved_prefix(self, name: str, info: dict, tids: np.ndarray, ends: np.ndarray, ids: np.ndarray) -> int:
+        """Number of leading rows of the saved frame identical to the new one."""
+        rows = min(info["rows"], len(tids))
+        saved_tids = _read_column(self.directory / f"{name}_tids.bin", "tids", rows)
+        saved_ends = _read_column(self.directory / f"{name}_ends.bin", "ends", rows)
+        if len(saved_tids) < rows or len(saved_ends) < rows:
+            return 0
+        changed = np.flatnonzero((saved_tids != tids[:rows]) | (saved_ends != ends[:rows]))
+        rows = int(changed[0]) if len(changed) else rows
+        n_ids = int(ends[rows - 1]) if rows else 0
+        saved_ids = _read_column(self.directory / f"{name}_ids.bin", "ids", n_ids)
+        if len(saved_ids) < n_ids:
+            return 0
+        changed = np.flatnonzero(saved_ids != ids[:n_ids])
+        # First row holding a changed id
+        return int(np.searchsorted(ends, changed[0], side="right")) if len(changed) else rows
+
+    def _write_frame(self, name: str, frame):
+        if frame is None:
+            self.meta.pop(name, None)
+            return
+        # Cleaning works row by row, so a rebuilt frame usually only adds rows to the saved one
+        tids = frame["transaction_id"].to_numpy(dtype=np.int64)
+        ends = np.cumsum(frame["items"].map(len).to_numpy(dtype=np.int64))
+        ids = self._encode_column(frame["items"])
+        info = self.meta.get(name) or {"rows": 0, "ids": 0}
+        kept = self._saved_prefix(name, info, tids, ends, ids)
+        self._truncate(name, info, kept)
+
+        first_id = int(ends[kept - 1]) if kept else 0
+        for column, values in (("tids", tids[kept:]), ("ends", ends[kept:]), ("ids", ids[first_id:])):
+            _append_column(self.directory / f"{name}_{column}.bin", column, values)
+        # Weights of baskets already saved change as well, the column is small enough to rewrite
+        weighted = "weight" in frame.columns
+        if weighted:
+            _save_array(self.directory / f"{name}_weight.npy", frame["weight"].to_numpy(dtype=np.int64))
+        self.meta[name] = {"rows": int(len(frame)), "ids": int(ends[-1]) if len(ends) else 0,
+                           "weighted": weighted}
+
+    def _write_pair_stats(self, stats: Optional[PairStats]):
+        if stats is None:
+            self.meta.pop("pair_stats", None)
+            return
+        generation = self.meta.get("pair_generation", 0) + 1
+        cooc = stats.cooc
+        for part, array in zip(PAIR_PARTS, (stats.item_counts, cooc.data, cooc.indices, cooc.indptr)):
+            np.save(_pair_file(self.directory, generation, part), np.ascontiguousarray(array))
+        self.meta["pair_generation"] = generation
+        self.meta["pair_stats"] = {"items": stats.items, "n_tx": stats.n_tx, "shape": list(cooc.shape),
+                                   "generation": generation}
+
+    def _remove_old_pair_stats(self):
+        """Delete pair stats files meta.json no longer names; ones still mapped are retried next write."""
+        current = (self.meta.get("pair_stats") or {}).get("generation")
+        keep = {_pair_file(self.directory, current, part).name for part in PAIR_PARTS} if current else set()
+        for path in self.directory.glob("pairs_*.npy"):
+            if path.name not in keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    # ------------------------------------------------------------------
+    # RESTORING
+    # ------------------------------------------------------------------
+    def read_meta(self) -> Optional[dict]:
+        path = self.directory / "meta.json"
+        if not path.exists():
+            return None
+        meta = json.loads(path.read_text())
+        if meta.get("version") != SESSION_VERSION:
+            return None
+        return meta
+
+    def exists(self) -> bool:
+        return self.read_meta() is not None
+
+    def _column(self, name: str, count: int):
+        path = self.directory / f"tx_{name}.bin"
+        if not count or not path.exists():
+            return np.zeros(0, dtype=TX_FILES[name])
+        return np.memmap(path, dtype=TX_FILES[name], mode="r", shape=(count,))
+
+    def load_transactions(self, meta: dict) -> TransactionStore:
+        rows = meta["rows"]
+        return TransactionStore.from_encoded(
+            self._column("tids", rows), meta["vocab"],
+            self._column("ends", rows), self._column("ids", meta["ids"])
+        )
+
+    def load_frame(self, meta: dict, name: str) -> Optional[pd.DataFrame]:
+        """Decode a saved cleaned / compressed frame back into the shape clean_data returns."""
+        info = meta.get(name)
+        if info is None:
+            return None
+        # Read, not memory-mapped: the writer appends to and truncates these files
+        vocab = meta["vocab"]
+        ends = _read_column(self.directory / f"{name}_ends.bin", "ends", info["rows"]).tolist()
+        ids = _read_column(self.directory / f"{name}_ids.bin", "ids", info["ids"]).tolist()
+        items = []
+        start = 0
+        for end in ends:
+            items.append([vocab[i] for i in ids[start:end]])
+            start = end
+        frame = pd.DataFrame({
+            "transaction_id": _read_column(self.directory / f"{name}_tids.bin", "tids", info["rows"]),
+            "items": items,
+        })
+        if info["weighted"]:
+            frame["weight"] = np.load(self.directory / f"{name}_weight.npy")
+        return frame
+
+    def load_pair_stats(self, meta: dict) -> Optional[PairStats]:
+        info = meta.get("pair_stats")
+        if info is None:
+            return None
+        stats = PairStats()
+        stats.items = list(info["items"])
+        stats.item_index = {item: i for i, item in enumerate(stats.items)}
+        counts, data, indices, indptr = (np.load(_pair_file(self.directory, info["generation"], part), mmap_mode="r")
+                                         for part in PAIR_PARTS)
+        stats.item_counts = counts
+        stats.cooc = sparse.csr_matrix((data, indices, indptr), shape=tuple(info["shape"]), copy=False)
+        stats.n_tx = float(info["n_tx"])
+        return stats
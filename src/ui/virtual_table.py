@@ -0,0 +1,234 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+# ----------------------------------------------------------------------
+# VIRTUALIZED TREEVIEW
+# ----------------------------------------------------------------------
+class VirtualTable(tk.Frame):
+    """
+    Treeview that only holds the rows currently on screen.
+
+    Rows are pulled on demand from `get_row(index)`, so the number of Tk
+    items stays constant no matter how large the underlying data is.
+    Scrolling moves a window over the data instead of the widget. The
+    selection is kept as a data index and re-applied to whichever slot
+    shows that row after every repaint.
+    """
+
+    def __init__(self, parent,
+                 columns: Sequence[Tuple[str, str, int, str]],
+                 row_count: Callable[[], int],
+                 get_row: Callable[[int], tuple],
+                 find_row: Optional[Callable[[str], Optional[int]]] = None,
+                 jump_label: str = "Go to ID:",
+                 height: int = 12,
+                 on_activate: Optional[Callable[[int], None]] = None,
+                 show_headings: bool = True,
+                 *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+
+        self.row_count = row_count
+        self.get_row = get_row
+        self.find_row = find_row
+        self.on_activate = on_activate
+        self.first = 0
+        self.visible = height
+        self.selected: Optional[int] = None
+        self._refresh_pending = False
+        self._painting = False
+
+        if find_row is not None:
+            jump = tk.Frame(self)
+            jump.pack(fill=tk.X, pady=(0, 4))
+            tk.Label(jump, text=jump_label).pack(side=tk.LEFT)
+            self.jump_var = tk.StringVar()
+            entry = tk.Entry(jump, textvariable=self.jump_var, width=12)
+            entry.pack(side=tk.LEFT, padx=4)
+            entry.bind("<Return>", lambda _e: self.jump_to(self.jump_var.get()))
+            tk.Button(jump, text="Go",
+                      command=lambda: self.jump_to(self.jump_var.get())).pack(side=tk.LEFT)
+
+        body = tk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+
+        self.tree = ttk.Treeview(body, columns=[c[0] for c in columns],
+                                 show="headings" if show_headings else "", height=height)
+        for col_id, heading, width, anchor in columns:
+            self.tree.heading(col_id, text=heading)
+            self.tree.column(col_id, width=width, anchor=anchor)
+
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda _e: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda _e: self.scroll_by(3))
+        self.tree.bind("<Up>", lambda _e: self._on_key(-1))
+        self.tree.bind("<Down>", lambda _e: self._on_key(1))
+        self.tree.bind("<Prior>", lambda _e: self._on_key(-self.visible))
+        self.tree.bind("<Next>", lambda _e: self._on_key(self.visible))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        if on_activate is not None:
+            self.tree.bind("<ButtonRelease-1>", self._on_click)
+            self.tree.bind("<Return>", lambda _e: self._activate_selected())
+
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # RENDERING
+    # ------------------------------------------------------------------
+    def _slot(self, k: int) -> str:
+        return f"row{k}"
+
+    def refresh(self):
+        """Re-render the visible window from the data source."""
+        self._refresh_pending = False
+        total = self.row_count()
+        self.first = max(0, min(self.first, total - self.visible))
+
+        for k in range(self.visible):
+            idx = self.first + k
+            slot = self._slot(k)
+            if idx < total:
+                values = self.get_row(idx)
+                if self.tree.exists(slot):
+                    self.tree.item(slot, values=values)
+                else:
+                    self.tree.insert("", "end", iid=slot, values=values)
+            elif self.tree.exists(slot):
+                self.tree.delete(slot)
+
+        # Drop slots left over from a taller window
+        for slot in self.tree.get_children():
+            if int(slot[3:]) >= self.visible:
+                self.tree.delete(slot)
+
+        if self.selected is not None and self.selected >= total:
+            self.selected = None
+        self._paint_selection()
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _paint_selection(self):
+        """Select the slot showing the selected data row, or nothing if it is off screen."""
+        k = None if self.selected is None else self.selected - self.first
+        slot = self._slot(k) if k is not None and 0 <= k < self.visible else None
+        self._painting = True
+        try:
+            if slot is not None and self.tree.exists(slot):
+                self.tree.selection_set(slot)
+                self.tree.focus(slot)
+            else:
+                self.tree.selection_set(())
+        finally:
+            self._painting = False
+
+    def schedule_refresh(self):
+        """Coalesce many data changes into a single repaint."""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh)
+
+    # ------------------------------------------------------------------
+    # SCROLLING
+    # ------------------------------------------------------------------
+    def scroll_to(self, index: int):
+        self.first = max(0, index)
+        self.refresh()
+
+    def scroll_by(self, rows: int):
+        self.scroll_to(self.first + rows)
+
+    def _on_scrollbar(self, *args):
+        total = self.row_count()
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.visible
+            self.scroll_by(step)
+
+    def _on_mousewheel(self, event):
+        self.scroll_by(-1 if event.delta > 0 else 1)
+        return "break"
+
+    def _on_key(self, rows: int):
+        """Move the selection, scrolling just enough to keep it on screen."""
+        total = self.row_count()
+        if not total:
+            return "break"
+        current = self.first if self.selected is None else self.selected + rows
+        self.select(max(0, min(total - 1, current)))
+        return "break"
+
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visible = max(1, event.height // row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
+
+    # ------------------------------------------------------------------
+    # SELECTION + ACTIVATION
+    # ------------------------------------------------------------------
+    def index_of(self, slot: str) -> Optional[int]:
+        """Data index shown in a Treeview slot."""
+        if not slot or not self.tree.exists(slot):
+            return None
+        return self.first + int(slot[3:])
+
+    def select(self, index: Optional[int]):
+        """Select data row `index` (None clears) and scroll it into view."""
+        self.selected = index
+        if index is not None:
+            if index < self.first:
+                self.first = index
+            elif index >= self.first + self.visible:
+                self.first = index - self.visible + 1
+        self.refresh()
+
+    def _on_select(self, _event):
+        if self._painting:
+            return
+        chosen = self.tree.selection()
+        idx = self.index_of(chosen[0]) if chosen else None
+        if idx is not None and idx < self.row_count():
+            self.selected = idx
+
+    def _activate(self, slot: str):
+        idx = self.index_of(slot)
+        if idx is not None and idx < self.row_count():
+            self.on_activate(idx)
+
+    def _activate_selected(self):
+        if self.selected is not None and self.selected < self.row_count():
+            self.on_activate(self.selected)
+
+    def _on_click(self, event):
+        self._activate(self.tree.identify_row(event.y))
+
+    # ------------------------------------------------------------------
+    # JUMP TO ID
+    # ------------------------------------------------------------------
+    def jump_to(self, key: Any) -> bool:
+        """Scroll so the row identified by `key` is at the top and select it."""
+        if self.find_row is None:
+            return False
+        idx = self.find_row(str(key).strip())
+        if idx is None:
+            self.bell()
+            return False
+        self.selected = idx
+        self.scroll_to(idx)
+        return True
+
+    def visible_rows(self) -> List[tuple]:
+        return [self.tree.item(slot, "values") for slot in self.tree.get_children()]
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Same layout main.py sets up: src/ for packages, src/algorithms for the flat algorithm modules
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.append(str(ROOT / "src" / "algorithms"))
+
+DATA = ROOT / "data"
+
+
+def catalog():
+    return set(pd.read_csv(DATA / "products.csv")["product_name"].str.strip().str.lower())
+
+
+@pytest.fixture(scope="session")
+def transactions():
+    """Sample transactions as a mining frame (transaction_id, items), restricted to catalog items."""
+    known = catalog()
+    raw = pd.read_csv(DATA / "sample_transactions.csv")
+    rows = []
+    for tid, items in zip(raw["transaction_id"], raw["items"].fillna("")):
+        basket = sorted({i.strip().lower() for i in str(items).split(",")} & known)
+        if basket:
+            rows.append((int(tid), basket))
+    return pd.DataFrame(rows, columns=["transaction_id", "items"])
+
+
+def rule_key(rules):
+    """Rules as comparable {(antecedent, consequent): (support, confidence, lift)}."""
+    if rules == -1:
+        return {}
+    return {
+        (frozenset(r.first), frozenset(r.second)): (round(r.support, 9), round(r.confidence, 9), round(r.lift, 9))
+        for r in rules
+    }
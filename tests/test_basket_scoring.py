@@ -0,0 +1,52 @@
+import pytest
+
+from apiori import apriori
+from basket_scoring import BasketScorer
+from formulas import AssociationRule
+
+
+def brute_force_score(rules, basket, aggregate):
+    basket = {i.lower() for i in basket}
+    scores = {}
+    for r in rules:
+        if not r.first <= basket:
+            continue
+        for item in r.second - basket:
+            if aggregate == "max":
+                scores[item] = max(scores.get(item, 0.0), r.confidence)
+            elif aggregate == "sum":
+                scores[item] = scores.get(item, 0.0) + r.confidence
+            else:
+                scores[item] = 1.0 - (1.0 - scores.get(item, 0.0)) * (1.0 - r.confidence)
+    return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+
+
+def test_two_item_antecedent_changes_the_score():
+    rules = [
+        AssociationRule.from_metrics("bread", "jam", 0.2, 0.3, 1.1),
+        AssociationRule.from_metrics(("bread", "butter"), "jam", 0.1, 0.9, 3.0),
+    ]
+    scorer = BasketScorer.from_rules(rules)
+    assert scorer.score(["bread"]) == [("jam", 0.3)]
+    assert scorer.score(["Butter", "bread"]) == [("jam", 0.9)]
+    single_only = BasketScorer.from_rules(rules[:1])
+    assert single_only.score(["butter", "bread"]) == [("jam", 0.3)]
+
+
+@pytest.mark.parametrize("aggregate", BasketScorer.AGGREGATES)
+def test_ranking_matches_brute_force_on_mined_rules(transactions, aggregate):
+    rules = apriori(transactions, 0.03, 0.2)
+    assert any(len(r.first) > 1 for r in rules)
+    scorer = BasketScorer.from_rules(rules)
+    assert len(scorer) == len(rules)
+    for basket in transactions["items"].iloc[:40]:
+        partial = basket[:-1] or basket
+        got = scorer.score(partial, top_n=100, aggregate=aggregate)
+        expected = brute_force_score(rules, partial, aggregate)
+        assert [item for item, _ in got] == [item for item, _ in expected]
+        assert [s for _, s in got] == pytest.approx([s for _, s in expected])
+
+
+def test_unknown_aggregate():
+    with pytest.raises(ValueError):
+        BasketScorer().score(["bread"], aggregate="mean")
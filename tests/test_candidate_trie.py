@@ -0,0 +1,49 @@
+from itertools import combinations
+
+import pytest
+
+from candidate_trie import CandidateTrie, encode_transactions
+
+
+@pytest.fixture(scope="module")
+def encoded(transactions):
+    items = sorted({item for row in transactions["items"] for item in row})
+    return encode_transactions(transactions["items"], {item: k for k, item in enumerate(items)}), len(items)
+
+
+def brute_force(encoded, candidates, weights=None):
+    weights = weights or [1] * len(encoded)
+    return {c: sum(w for row, w in zip(encoded, weights) if set(c) <= set(row)) for c in candidates}
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4])
+def test_counts_match_brute_force(encoded, size):
+    rows, n_items = encoded
+    candidates = list(combinations(range(n_items), size))
+    if size > 2:
+        # Every candidate that occurs at least once, plus some that never do
+        candidates = sorted({c for row in rows for c in combinations(row, size)} | set(candidates[:50]))
+    trie = CandidateTrie(candidates)
+    trie.count_all(rows)
+    assert trie.counts() == brute_force(rows, candidates)
+
+
+def test_weighted_counts_and_hits(encoded):
+    rows, n_items = encoded
+    weights = [k % 3 + 1 for k in range(len(rows))]
+    candidates = list(combinations(range(n_items), 2))
+    trie = CandidateTrie(candidates)
+    for row, weight in zip(rows, weights):
+        hits = trie.count_transaction_hits(row, weight)
+        # Every item of a transaction is in (length - 1) of its pairs
+        assert hits == ({item: len(row) - 1 for item in row} if len(row) > 1 else {})
+    assert trie.counts() == brute_force(rows, candidates, weights)
+
+
+def test_candidates_must_share_a_size():
+    with pytest.raises(ValueError):
+        CandidateTrie([(1, 2), (3,)])
+
+
+def test_encode_sorts_and_drops_unknown_items():
+    assert encode_transactions([["b", "a", "b", "zz"]], {"a": 1, "b": 0}) == [(0, 1)]
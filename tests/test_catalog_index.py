@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+from conftest import DATA
+
+from ui.catalog_index import CatalogIndex
+
+
+@pytest.fixture(scope="module")
+def products():
+    rows = pd.read_csv(DATA / "products.csv").to_dict("records")
+    # Multi-word names with stray spaces and a row without a name
+    rows += [{"product_name": "Whole Milk", "category": "dairy"},
+             {"product_name": "  Skim  milk ", "category": "dairy"},
+             {"product_name": "", "category": "ignored"}]
+    return rows
+
+
+def brute_force(index, query):
+    query = " ".join(query.lower().split())
+    keys = index.keys
+    words = {i for i, key in enumerate(keys) if any(w.startswith(query.split()[0]) for w in key.split())}
+    if " " in query:
+        words = {i for i in words if query in keys[i]}
+    contains = {i for i, key in enumerate(keys) if query in key} if len(query) >= 3 else set()
+    ranked = sorted(words, key=lambda i: (not keys[i].startswith(query), keys[i]))
+    ranked += sorted(contains - words, key=lambda i: (not keys[i].startswith(query), keys[i]))
+    return ranked
+
+
+@pytest.mark.parametrize("query", ["m", "mi", "milk", "ilk", "skim m", "  MILK ", "zzz", "ea"])
+def test_search_matches_brute_force(products, query):
+    index = CatalogIndex(products)
+    scanned = index.search(query)
+    assert scanned == brute_force(index, query)
+    index.build_trigrams()
+    assert index.search(query) == scanned
+    assert index.search(query, limit=2) == scanned[:2]
+
+
+def test_blank_query_lists_everything_alphabetically(products):
+    index = CatalogIndex(products)
+    assert len(index) == len(products) - 1
+    assert [index.keys[i] for i in index.search("")] == sorted(index.keys)
+    assert index.find(" whole milk") == index.names.index("Whole Milk")
+
+
+def test_grouped_rows(products):
+    index = CatalogIndex(products)
+    matches = index.search("milk")
+    rows, sizes = index.grouped_rows(matches, collapsed={"dairy"})
+    assert sum(sizes.values()) == len(matches)
+    heads = [index.categories[i] for kind, i in rows if kind == "category"]
+    assert heads == sorted(sizes, key=str.lower)
+    assert all(index.categories[i] != "dairy" for kind, i in rows if kind == "product")
+    full, _ = index.grouped_rows()
+    assert sum(kind == "product" for kind, _ in full) == len(index)
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+from conftest import rule_key
+
+from apiori import apriori
+from category_mining import category_filter, load_item_categories, main, mine_categories, multilevel_mine
+from eclat import eclat
+
+
+@pytest.fixture(scope="module")
+def categories():
+    return load_item_categories()
+
+
+# On 50 transactions 50 * 0.14 and 50 * 0.28 come out just above 7 and 14
+@pytest.mark.parametrize("rows, support", [(None, 0.03), (None, 0.05), (None, 0.1), (None, 0.2),
+                                           (50, 0.14), (50, 0.28)])
+def test_pruning_keeps_every_frequent_itemset(transactions, categories, rows, support):
+    transactions = transactions.iloc[:rows]
+    found_sets, _ = mine_categories(transactions, categories, support)
+    allowed = category_filter(found_sets, categories)
+    rejected = []
+
+    def recording(itemset):
+        ok = allowed(itemset)
+        if not ok:
+            rejected.append(itemset)
+        return ok
+
+    pruned = apriori(transactions, support, return_itemsets=True, candidate_filter=recording)
+    assert pruned == apriori(transactions, support, return_itemsets=True)
+    if rows is None and support <= 0.1:
+        assert rejected
+    if support >= 0.05:
+        assert rule_key(eclat(transactions, support, 0.3, candidate_filter=allowed)) == \
+            rule_key(eclat(transactions, support, 0.3))
+
+
+def test_threshold_rounding_does_not_prune():
+    # 50 * 0.14 is 7.000000000000001, ceil() would ask for 8 while apriori() keeps 7 / 50
+    rows = [["milk", "bread"]] * 7 + [["soda"]] * 43
+    data = pd.DataFrame({"transaction_id": range(1, 51), "items": rows})
+    item_category = {"milk": "dairy", "bread": "bakery", "soda": "drinks"}
+    found_sets, _ = mine_categories(data, item_category, 0.14)
+    assert ("bakery", "dairy") in found_sets
+    allowed = category_filter(found_sets, item_category)
+    assert apriori(data, 0.14, return_itemsets=True, candidate_filter=allowed)[0][("bread", "milk")] == 7
+
+
+def test_category_supports_match_rolled_up_counts(transactions, categories):
+    found_sets, total = mine_categories(transactions, categories, 0.1)
+    assert total == len(transactions)
+    rolled = [{categories.get(i, i) for i in row} for row in transactions["items"]]
+    for key, count in found_sets.items():
+        assert count == sum(set(key) <= basket for basket in rolled)
+        assert count / total >= 0.1
+
+
+def test_multilevel_mine(transactions, categories):
+    found = multilevel_mine(transactions, 0.1, 0.5, engine="apriori", item_category=categories)
+    assert rule_key(found["item_rules"]) == rule_key(apriori(transactions, 0.1, 0.5))
+    assert found["category_rules"] and all(v >= 0.1 for v in found["frequent_categories"].values())
+
+
+def test_cli(tmp_path, transactions, capsys):
+    path = tmp_path / "cleaned.csv"
+    frame = transactions.copy()
+    frame["items"] = frame["items"].map(",".join)
+    frame.to_csv(path, index=False)
+    main([str(path), "--min-support", "0.1", "--engine", "apriori"])
+    out = capsys.readouterr().out
+    assert "Category rules:" in out and "Item rules:" in out and "->" in out
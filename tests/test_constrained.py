@@ -0,0 +1,47 @@
+import pytest
+from conftest import rule_key
+
+from apiori import apriori
+from constrained import mine_containing, rules_for_basket
+from preprocessing.preprocessing import compress_baskets
+
+
+def containing(rules, item):
+    return {r for r in rules if item in r.first | r.second}
+
+
+@pytest.mark.parametrize("item", ["milk", "bread", "eggs"])
+def test_rules_match_apriori_for_the_item(transactions, item):
+    full = apriori(transactions, 0.03, 0.3)
+    assert rule_key(mine_containing(transactions, item, 0.03, 0.3)) == rule_key(containing(full, item))
+
+
+def test_itemsets_match_apriori(transactions):
+    full, total = apriori(transactions, 0.03, return_itemsets=True)
+    found, found_total = mine_containing(transactions, "milk", 0.03, return_itemsets=True)
+    assert found_total == total
+    assert found == {key: count for key, count in full.items() if "milk" in key}
+
+
+def test_antecedent_only_and_max_size(transactions):
+    full = containing(apriori(transactions, 0.03, 0.3), "milk")
+    rules = mine_containing(transactions, "milk", 0.03, 0.3, antecedent_only=True, max_size=2)
+    expected = {r for r in full if "milk" in r.first and len(r.first | r.second) <= 2}
+    assert rule_key(rules) == rule_key(expected)
+
+
+def test_compressed_baskets_give_the_same_rules(transactions):
+    rules = mine_containing(transactions, "bread", 0.03, 0.3)
+    assert rule_key(mine_containing(compress_baskets(transactions), "bread", 0.03, 0.3)) == rule_key(rules)
+
+
+def test_infrequent_item(transactions):
+    assert mine_containing(transactions, "milk", 0.99) == -1
+    assert mine_containing(transactions, "not a product", 0.01) == -1
+
+
+def test_rules_for_basket_stay_inside_the_basket(transactions):
+    basket = {"milk", "bread"}
+    rules = rules_for_basket(transactions, basket, 0.03, 0.3)
+    assert rules
+    assert all(set(r.first) <= basket and not set(r.second) & basket for r in rules)
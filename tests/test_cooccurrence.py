@@ -0,0 +1,63 @@
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from algorithms.cooccurrence import PairStats
+from preprocessing.preprocessing import compress_baskets
+
+
+def counted(baskets, weights=None):
+    """Item and ordered pair counts the slow way."""
+    weights = weights if weights is not None else [1] * len(baskets)
+    items, pairs = Counter(), Counter()
+    for basket, weight in zip(baskets, weights):
+        basket = sorted({i.lower() for i in basket})
+        for item in basket:
+            items[item] += weight
+        for a, b in combinations(basket, 2):
+            pairs[a, b] += weight
+            pairs[b, a] += weight
+    return items, pairs
+
+
+def test_counts_and_metrics_match_pair_counting(transactions):
+    baskets = transactions["items"].tolist()
+    stats = PairStats.from_baskets(baskets)
+    items, pairs = counted(baskets)
+    n = len(baskets)
+
+    assert stats.n_tx == n
+    assert stats.item_support == pytest.approx({item: count / n for item, count in items.items()})
+    assert stats.pair_confidence() == pytest.approx({(a, b): c / items[a] for (a, b), c in pairs.items()})
+    for (a, b), count in pairs.items():
+        assert stats.pair_count(a, b) == count
+        assert stats.lift(a, b) == pytest.approx(count / items[a] / (items[b] / n))
+    assert stats.pair_count("milk", "no-such-item") == 0.0
+
+
+def test_weighted_baskets_match_uncompressed(transactions):
+    baskets = compress_baskets(transactions)
+    weighted = PairStats.from_baskets(baskets["items"].tolist(), baskets["weight"].to_numpy())
+    plain = PairStats.from_baskets(transactions["items"].tolist())
+    assert weighted.n_tx == plain.n_tx
+    assert weighted.pair_confidence() == pytest.approx(plain.pair_confidence())
+
+
+def test_associations_for_ranks_by_confidence(transactions):
+    baskets = transactions["items"].tolist()
+    stats = PairStats.from_baskets(baskets)
+    items, pairs = counted(baskets)
+    product = items.most_common(1)[0][0]
+    found = stats.associations_for(product, min_conf=0.1)
+    expected = {b: 100 * c / items[product] for (a, b), c in pairs.items()
+                if a == product and c / items[product] >= 0.1}
+    assert dict(found) == pytest.approx(expected)
+    confidences = [pct for _, pct in found]
+    assert confidences == sorted(confidences, reverse=True)
+
+
+def test_duplicate_items_and_case_count_once():
+    stats = PairStats.from_baskets([["Milk", "milk", "bread"], ["bread"]])
+    assert stats.item_support == {"milk": 0.5, "bread": 1.0}
+    assert stats.pair_count("milk", "bread") == 1
@@ -0,0 +1,34 @@
+import pytest
+from conftest import rule_key
+
+from apiori import apriori
+
+SUPPORTS = [0.03, 0.05, 0.1]
+
+
+# 1 bucket puts every pair in the same bucket, 7 forces collisions, 4096 has almost none
+@pytest.mark.parametrize("buckets", [1, 7, 4096])
+@pytest.mark.parametrize("support", SUPPORTS)
+def test_dhp_keeps_the_same_itemsets_and_rules(transactions, buckets, support):
+    assert apriori(transactions, support, return_itemsets=True, dhp_buckets=buckets) == \
+        apriori(transactions, support, return_itemsets=True)
+    assert rule_key(apriori(transactions, support, 0.3, dhp_buckets=buckets)) == \
+        rule_key(apriori(transactions, support, 0.3))
+
+
+# With a budget the levels are counted in several chunks, which turns transaction trimming off
+@pytest.mark.parametrize("buckets", [7, 4096])
+def test_dhp_with_memory_budget(transactions, buckets):
+    baseline = apriori(transactions, 0.03, return_itemsets=True)
+    budgeted, total = apriori(transactions, 0.03, return_itemsets=True, dhp_buckets=buckets,
+                              memory_budget_mb=0.001)
+    assert (dict(budgeted.items()), total) == baseline
+    assert rule_key(apriori(transactions, 0.03, 0.3, dhp_buckets=buckets, memory_budget_mb=0.001)) == \
+        rule_key(apriori(transactions, 0.03, 0.3))
+
+
+def test_dhp_on_compressed_baskets(transactions):
+    from preprocessing.preprocessing import compress_baskets
+    baskets = compress_baskets(transactions)
+    assert apriori(baskets, 0.03, return_itemsets=True, dhp_buckets=7) == \
+        apriori(transactions, 0.03, return_itemsets=True)
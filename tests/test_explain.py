@@ -0,0 +1,25 @@
+import pytest
+
+from algorithms.cooccurrence import PairStats
+from apiori import apriori
+from explain import explain
+from preprocessing.preprocessing import compress_baskets
+
+
+@pytest.mark.parametrize("support", [0.03, 0.05, 0.1])
+def test_exact_levels_match_apriori(transactions, support):
+    itemsets, _ = apriori(transactions, support, return_itemsets=True)
+    plan = explain(transactions, support, 0.3)
+    for level in plan.levels[:2]:
+        assert level["exact"]
+        assert level["frequent"] == sum(1 for key in itemsets if len(key) == level["size"])
+
+
+def test_reused_pair_stats_give_the_same_plan(transactions):
+    baskets = compress_baskets(transactions)
+    stats = PairStats.from_baskets(baskets["items"].tolist(), baskets["weight"].to_numpy())
+    built = explain(baskets, 0.05, 0.3)
+    reused = explain(baskets, 0.05, 0.3, pair_stats=stats)
+    assert reused.levels == built.levels
+    assert reused.engines == built.engines
+    assert reused.rules == built.rules
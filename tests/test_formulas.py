@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+import pytest
+
+from apiori import apriori
+from formulas import AssociationRule, batch_metrics, rule_mask, support_apiori
+
+
+@pytest.fixture(scope="module")
+def scalar_rules(transactions):
+    """Mined rules recomputed one by one by scanning the transactions."""
+    rules = sorted(apriori(transactions, 0.05, 0.0), key=lambda r: (sorted(r.first), sorted(r.second)))
+    return [AssociationRule(r.first, r.second, transactions) for r in rules]
+
+
+def test_batch_metrics_match_scalar_rules(transactions, scalar_rules):
+    ante = [support_apiori(transactions, list(r.first)) for r in scalar_rules]
+    cons = [support_apiori(transactions, list(r.second)) for r in scalar_rules]
+    metrics = batch_metrics(ante, cons, [r.support for r in scalar_rules])
+
+    assert metrics["support"] == pytest.approx([r.support for r in scalar_rules])
+    assert metrics["confidence"] == pytest.approx([r.confidence for r in scalar_rules])
+    assert metrics["lift"] == pytest.approx([r.lift for r in scalar_rules])
+    assert any(r.confidence == 1 for r in scalar_rules)
+    for k, r in enumerate(scalar_rules):
+        assert metrics["leverage"][k] == pytest.approx(r.support - ante[k] * cons[k])
+        if r.confidence == 1:
+            assert math.isinf(metrics["conviction"][k])
+        else:
+            assert metrics["conviction"][k] == pytest.approx((1 - cons[k]) / (1 - r.confidence))
+
+
+def test_counts_with_total_match_fractions():
+    counts = batch_metrics([10, 4, 0], [5, 8, 3], [5, 4, 0], total=20)
+    fractions = batch_metrics([0.5, 0.2, 0.0], [0.25, 0.4, 0.15], [0.25, 0.2, 0.0])
+    for name in counts:
+        np.testing.assert_allclose(counts[name], fractions[name])
+    # An antecedent that never occurs gives confidence and lift 0, not nan
+    assert counts["confidence"][2] == 0 and counts["lift"][2] == 0
+    assert math.isinf(counts["conviction"][1])
+
+
+def test_rule_mask():
+    metrics = batch_metrics([10, 4, 8], [5, 8, 10], [5, 4, 2], total=20)
+    assert rule_mask(metrics).tolist() == [True, True, True]
+    assert rule_mask(metrics, minimum_confidence=0.5).tolist() == [True, True, False]
+    assert rule_mask(metrics, minimum_confidence=0.5, minimum_lift=2.1).tolist() == [False, True, False]
+    assert rule_mask(metrics, minimum_conviction=float("inf")).tolist() == [False, True, False]
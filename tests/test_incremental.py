@@ -0,0 +1,45 @@
+from conftest import rule_key
+
+from apiori import apriori
+from incremental import IncrementalMiner
+
+
+def full_mine(frame, support):
+    itemsets, total = apriori(frame, support, return_itemsets=True)
+    return itemsets, total
+
+
+def test_updates_match_a_full_mine(transactions):
+    miner = IncrementalMiner(minimum_support=0.03, minimum_confidence=0.3)
+    for end in range(20, len(transactions) + 20, 20):
+        miner.update(transactions.iloc[end - 20:end])
+        itemsets, total = full_mine(transactions.iloc[:end], 0.03)
+        assert miner.total == total
+        assert miner.frequent_itemsets() == itemsets
+    assert miner.exact
+
+
+def test_rules_match_apriori(transactions):
+    half = len(transactions) // 2
+    miner = IncrementalMiner(minimum_support=0.03, minimum_confidence=0.3).fit(transactions.iloc[:half])
+    miner.update(transactions.iloc[half:])
+    assert rule_key(miner.rules()) == rule_key(apriori(transactions, 0.03, 0.3))
+
+
+def test_history_keeps_distinct_baskets_only():
+    miner = IncrementalMiner(minimum_support=0.5)
+    for _ in range(50):
+        miner.update([["milk", "bread"], ["milk"]])
+    assert miner.total == 100
+    assert len(miner.history) == 2
+    assert miner.frequent_itemsets() == {("milk",): 100, ("bread",): 50, ("bread", "milk"): 50}
+
+
+def test_dropped_history_never_overcounts(transactions):
+    miner = IncrementalMiner(minimum_support=0.03, max_history=30)
+    for end in range(20, len(transactions) + 20, 20):
+        miner.update(transactions.iloc[end - 20:end])
+    assert not miner.exact and not miner.history
+    itemsets, _ = full_mine(transactions, 0.03)
+    for key, count in miner.frequent_itemsets().items():
+        assert count <= itemsets[key]
@@ -0,0 +1,32 @@
+import logging
+
+import pandas as pd
+
+from conftest import DATA
+from preprocessing.ingest import SUMMED_FIELDS, ingest
+
+
+def split_sample(tmp_path, parts=3):
+    raw = pd.read_csv(DATA / "sample_transactions.csv")
+    size = -(-len(raw) // parts)
+    for k in range(parts):
+        raw.iloc[k * size:(k + 1) * size].to_csv(tmp_path / f"day{k}.csv", index=False)
+    return raw
+
+
+def test_parallel_matches_serial(tmp_path):
+    split_sample(tmp_path)
+    serial = ingest(tmp_path, workers=1)
+    parallel = ingest(tmp_path, workers=3)
+    pd.testing.assert_frame_equal(serial.data, parallel.data)
+    for field in SUMMED_FIELDS + ("unique_items", "files"):
+        assert serial.report[field] == parallel.report[field]
+    assert parallel.report["files"] == 3
+
+
+def test_worker_logs_reach_the_parent_tagged(tmp_path, caplog):
+    split_sample(tmp_path)
+    with caplog.at_level(logging.INFO):
+        ingest(tmp_path, workers=3)
+    starts = [r.getMessage() for r in caplog.records if r.getMessage().endswith("Before Cleaning")]
+    assert sorted(starts) == [f"[day{k}.csv] Before Cleaning" for k in range(3)]
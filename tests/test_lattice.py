@@ -0,0 +1,38 @@
+import pytest
+from conftest import rule_key
+
+from apiori import apriori
+from lattice import ItemsetLattice
+
+
+@pytest.mark.parametrize("engine", ["apriori", "eclat"])
+def test_queries_match_mining_at_each_threshold(transactions, engine):
+    lattice = ItemsetLattice.mine(transactions, 0.03, engine)
+    for support in (0.03, 0.04, 0.05, 0.1, 0.2):
+        itemsets, total = apriori(transactions, support, return_itemsets=True)
+        assert lattice.itemsets(support) == itemsets
+        for confidence in (0.3, 0.6):
+            assert rule_key(lattice.rules(support, confidence)) == rule_key(apriori(transactions, support, confidence))
+
+
+@pytest.mark.parametrize("engine", ["apriori", "eclat"])
+def test_small_data_below_one_over_support(transactions, engine):
+    # 30 transactions at 0.02 need a count of 1; Eclat's own threshold would ask for 2
+    small = transactions.iloc[:30]
+    lattice = ItemsetLattice.mine(small, 0.02, engine)
+    assert lattice.itemsets(0.02) == apriori(small, 0.02, return_itemsets=True)[0]
+
+
+def test_save_load_roundtrip(tmp_path, transactions):
+    lattice = ItemsetLattice.mine(transactions, 0.05, "eclat")
+    lattice.save(tmp_path / "lattice.npz")
+    loaded = ItemsetLattice.load(tmp_path / "lattice.npz")
+    assert loaded.engine == "eclat" and loaded.base_support == 0.05
+    assert loaded.itemsets(0.05) == lattice.itemsets(0.05)
+    assert loaded.sweep([0.05, 0.1], [0.3, 0.5]) == lattice.sweep([0.05, 0.1], [0.3, 0.5])
+
+
+def test_rejects_support_below_base(transactions):
+    lattice = ItemsetLattice.mine(transactions, 0.05, "apriori")
+    with pytest.raises(ValueError):
+        lattice.itemsets(0.04)
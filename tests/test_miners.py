@@ -0,0 +1,18 @@
+import pytest
+from conftest import rule_key
+
+from miners import mine
+
+
+@pytest.mark.parametrize("support", [0.02, 0.05, 0.1, 0.2])
+def test_engines_agree(transactions, support):
+    apriori_result = mine(transactions, support, 0.4, "apriori")
+    eclat_result = mine(transactions, support, 0.4, "eclat")
+    assert eclat_result.itemsets == apriori_result.itemsets
+    assert eclat_result.total == apriori_result.total
+    assert rule_key(eclat_result.rules) == rule_key(apriori_result.rules)
+
+
+def test_nothing_frequent_is_empty(transactions):
+    result = mine(transactions, 1.0, 0.5, "eclat")
+    assert not result and len(result) == 0
@@ -0,0 +1,73 @@
+import random
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from algorithms.pair_sketch import PairSketch
+
+
+@pytest.fixture(scope="module")
+def baskets():
+    rng = random.Random(11)
+    # A few popular items and a long tail, so some pairs are heavy and most are rare
+    items = [f"item{k}" for k in range(400)]
+    popular = items[:8]
+    return [sorted(set(rng.sample(popular, 2) + rng.sample(items, rng.randint(1, 6)))) for _ in range(4000)]
+
+
+def exact_pairs(baskets):
+    return Counter(pair for b in baskets for pair in combinations(sorted(b), 2))
+
+
+def test_counts_are_upper_bounds_within_the_reported_error(baskets):
+    sketch = PairSketch.from_baskets(baskets, memory_mb=0.05)
+    bounds = sketch.error_bounds()
+    true = exact_pairs(baskets)
+    assert bounds["pair_total"] == sum(true.values())
+    assert bounds["tracked_pairs"] == bounds["capacity"] < len(true)
+
+    over = []
+    for (a, b), count in true.items():
+        estimate = sketch.pair_count(a, b)
+        assert estimate >= count
+        over.append(estimate - count)
+        key = tuple(sorted((sketch.item_index[a], sketch.item_index[b])))
+        if key in sketch.heavy.counts:
+            assert estimate - count <= bounds["max_overcount"]
+        if count > bounds["heavy_hitter_count"]:
+            assert key in sketch.heavy.counts
+    # Count-Min bound holds per pair with probability 1 - cm_delta
+    assert np.mean(np.array(over) <= bounds["cm_additive_error"]) >= 1 - bounds["cm_delta"]
+
+
+def test_item_counts_stay_exact(baskets):
+    sketch = PairSketch.from_baskets(baskets, memory_mb=0.05)
+    true = Counter(item for b in baskets for item in b)
+    assert len(sketch.item_counts) == len(true)
+    assert {item: sketch.item_counts[sketch.item_index[item]] for item in true} == true
+    assert sketch.n_tx == len(baskets)
+
+
+def test_batch_is_sized_from_memory_and_does_not_change_counts(baskets):
+    small, large = PairSketch(memory_mb=1), PairSketch(memory_mb=64)
+    assert small.batch_size < large.batch_size
+    # The batch buffers fit in their share of the budget
+    assert large.batch_size * (3 * 8 + 2 * 8 * large.depth) <= 64 * 1024 * 1024 * 0.125
+
+    one_go = PairSketch(memory_mb=1)
+    one_go.add_baskets(baskets)
+    tiny = PairSketch(memory_mb=1)
+    tiny.batch_size = 5
+    tiny.add_baskets(baskets)
+    assert np.array_equal(one_go.table, tiny.table)
+    assert one_go.pair_total == tiny.pair_total
+
+
+def test_weights_count_like_repeated_baskets():
+    repeated = PairSketch.from_baskets([["a", "b", "c"]] * 3 + [["a", "c"]])
+    weighted = PairSketch.from_baskets([["a", "b", "c"], ["a", "c"]], weights=[3, 1])
+    assert np.array_equal(repeated.table, weighted.table)
+    assert weighted.pair_count("a", "c") == 4
+    assert weighted.associations_for("a") == repeated.associations_for("a")
@@ -0,0 +1,31 @@
+import pytest
+from conftest import rule_key
+
+from apiori import apriori
+from partitioned import son_mine
+
+
+def write_partitions(tmp_path, frame, size):
+    paths = []
+    for start in range(0, len(frame), size):
+        part = frame.iloc[start:start + size].copy()
+        part["items"] = part["items"].map(",".join)
+        path = tmp_path / f"part-{start:05d}.csv"
+        part.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+# 7-row partitions hold fewer than 1 / support transactions at these supports
+@pytest.mark.parametrize("engine", ["apriori", "eclat"])
+@pytest.mark.parametrize("size, support", [(7, 0.02), (7, 0.05), (7, 0.1), (40, 0.1), (40, 0.2)])
+def test_son_matches_apriori(tmp_path, transactions, engine, size, support):
+    paths = write_partitions(tmp_path, transactions, size)
+    found = son_mine(paths, support, engine=engine, workers=1, return_itemsets=True)
+    assert found == apriori(transactions, support, return_itemsets=True)
+
+
+def test_son_rules_match_apriori(tmp_path, transactions):
+    paths = write_partitions(tmp_path, transactions, 30)
+    rules = son_mine(paths, 0.05, 0.4, engine="eclat", workers=2)
+    assert rule_key(rules) == rule_key(apriori(transactions, 0.05, 0.4))
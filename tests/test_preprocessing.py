@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from conftest import rule_key
+
+from apiori import apriori
+from eclat import eclat
+from formulas import support_apiori
+from preprocessing.preprocessing import clean_data, compress_baskets
+from preprocessing.transaction_store import parse_transactions_frame
+
+
+def test_clean_data_rules_and_report():
+    raw = pd.DataFrame({
+        "transaction_id": [1, 2, 3, 4, 5, 6, 7],
+        "items": [
+            " Milk , bread,milk ",   # kept, duplicate removed, case and spaces normalized
+            "(empty)",               # empty marker
+            " , ,",                  # nothing left after splitting
+            "eggs",                  # single item
+            "milk,unicorn",          # item not in the catalog
+            "bread,,butter, jam",    # kept, empty entry ignored
+            "unicorn,unicorn",       # invalid, its duplicate still counted
+        ],
+    })
+    cleaned, report = clean_data(raw, return_report=True)
+
+    assert cleaned["transaction_id"].tolist() == [1, 6]
+    assert cleaned["items"].tolist() == [["milk", "bread"], ["bread", "butter", "jam"]]
+    assert report["empty_transactions"] == 2
+    assert report["single_item_removed"] == 1
+    assert report["invalid_item_transactions"] == 2
+    assert report["duplicates_removed"] == 2
+    assert report["valid_transactions"] == 2
+    assert report["unique_items"] == 4
+
+
+def test_compress_baskets_weights_identical_baskets():
+    data = pd.DataFrame({"transaction_id": [1, 2, 3], "items": [["b", "a"], ["a", "b"], ["c", "a"]]})
+    compressed = compress_baskets(data)
+    assert compressed["items"].tolist() == [["a", "b"], ["a", "c"]]
+    assert compressed["weight"].tolist() == [2, 1]
+
+
+@pytest.mark.parametrize("mine", [apriori, eclat])
+def test_compressed_supports_match_uncompressed(transactions, mine):
+    baskets = compress_baskets(transactions)
+    assert len(baskets) < len(transactions) and baskets["weight"].sum() == len(transactions)
+    assert mine(baskets, 0.05, return_itemsets=True) == mine(transactions, 0.05, return_itemsets=True)
+    assert rule_key(mine(baskets, 0.05, 0.3)) == rule_key(mine(transactions, 0.05, 0.3))
+
+
+def test_compressing_twice_keeps_weights(transactions):
+    once = compress_baskets(transactions)
+    half = len(transactions) // 2
+    # Compress two halves separately, then the weighted rows together
+    twice = compress_baskets(pd.concat([compress_baskets(transactions.iloc[:half]),
+                                        compress_baskets(transactions.iloc[half:])]))
+    assert sorted(zip(map(tuple, twice["items"]), twice["weight"])) == \
+        sorted(zip(map(tuple, once["items"]), once["weight"]))
+    for items in once["items"].head(10):
+        assert support_apiori(once, items) == support_apiori(transactions, items)
+
+
+def test_parse_transactions_frame():
+    df = pd.DataFrame({"transaction_id": [1, 2, 3, 4, 5], "items": ["a, b ,c", None, " , ,", "  ", "x"]})
+    assert parse_transactions_frame(df) == ([1, 3, 5], [["a", "b", "c"], [], ["x"]])
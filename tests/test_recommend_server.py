@@ -0,0 +1,66 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from algorithms.cooccurrence import PairStats
+from formulas import AssociationRule
+from service.recommend_server import RecommendationIndex, RecommendationService, serve
+
+
+def rule(first, second, confidence, lift=1.0):
+    return AssociationRule.from_metrics(first, second, 0.1, confidence, lift)
+
+
+def test_index_uses_rules_inside_basket_only():
+    index = RecommendationIndex.from_rules({
+        rule({"milk"}, {"bread"}, 0.6, 1.5),
+        rule({"milk", "eggs"}, {"bread", "butter"}, 0.9, 2.0),
+        rule({"jam"}, {"bread"}, 0.95, 3.0),
+    })
+    assert index.rule_count == 3
+    assert index.recommend(["milk"]) == [{"item": "bread", "confidence": 0.6, "lift": 1.5}]
+    assert index.recommend(["Milk ", "eggs"]) == [
+        {"item": "bread", "confidence": 0.9, "lift": 2.0},
+        {"item": "butter", "confidence": 0.9, "lift": 2.0},
+    ]
+    assert index.recommend(["milk", "bread"]) == []
+
+
+def test_index_from_pair_stats_matches_pair_confidence():
+    stats = PairStats.from_baskets([["milk", "bread"], ["milk", "bread"], ["milk", "eggs"]])
+    recs = RecommendationIndex.from_pair_stats(stats).recommend(["milk"], top_n=2)
+    assert [r["item"] for r in recs] == ["bread", "eggs"]
+    assert recs[0]["confidence"] == pytest.approx(2 / 3)
+
+
+@pytest.fixture
+def server():
+    service = RecommendationService(RecommendationIndex.from_rules({rule({"milk"}, {"bread"}, 0.6)}))
+    httpd = serve(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_recommend_endpoint(server):
+    status, body = get(f"{server}/recommend?items=milk&n=3")
+    assert status == 200 and body["recommendations"][0]["item"] == "bread"
+
+
+@pytest.mark.parametrize("n", ["-1", "abc"])
+def test_invalid_n_is_rejected(server, n):
+    status, body = get(f"{server}/recommend?items=milk&n={n}")
+    assert status == 400 and "n must be" in body["error"]
@@ -0,0 +1,73 @@
+import tkinter as tk
+
+import pytest
+
+from ui.responsiveness import DiagnosticsWindow, LatencyHistogram, ResponsivenessMonitor
+
+
+class Worker:
+    def run(self, n):
+        return n * 2
+
+
+def test_histogram_rolls_over():
+    histogram = LatencyHistogram(history=3)
+    for ms in (0.5, 0.5, 30, 30):
+        histogram.record(ms)
+    snap = histogram.snapshot()
+    assert snap["calls"] == 4
+    assert sum(snap["histogram"].values()) == 3
+    assert snap["histogram"]["<=1ms"] == 1 and snap["histogram"]["<=50ms"] == 2
+    assert snap["max_ms"] == 30
+
+
+def test_instrument_is_reversible():
+    worker = Worker()
+    monitor = ResponsivenessMonitor(root=None)
+    monitor.instrument(worker, ["run"])
+    assert worker.run(2) == 4
+    assert monitor.handlers["Worker.run"].calls == 1
+
+    monitor.uninstrument()
+    assert "run" not in vars(worker)
+    assert worker.run(3) == 6 and monitor.handlers["Worker.run"].calls == 1
+
+
+@pytest.fixture
+def roots():
+    try:
+        app, other = tk.Tk(), tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    yield app, other
+    for root in (app, other):
+        root.destroy()
+
+
+def test_install_is_scoped_and_reversible(roots):
+    app, other = roots
+    original = tk.CallWrapper
+    monitor = ResponsivenessMonitor(app)
+    monitor.install()
+    worker = Worker()
+    monitor.instrument(worker, ["run"])
+
+    mine = tk.Button(app, command=lambda: None)
+    theirs = tk.Button(other, command=lambda: None)
+    window = DiagnosticsWindow(app, monitor)
+    own = tk.Button(window, command=lambda: None)
+    for button in (mine, theirs, own):
+        button.invoke()
+    window.refresh(reschedule=False)
+
+    timed = set(monitor.handlers)
+    assert sum(monitor.handlers[name].calls for name in timed if "lambda" in name) == 1
+    assert not any("DiagnosticsWindow" in name for name in timed)
+    window.close()
+
+    monitor.uninstall()
+    assert tk.CallWrapper is original
+    assert "run" not in vars(worker)
+    calls = sum(h.calls for h in monitor.handlers.values())
+    mine.invoke()
+    assert sum(h.calls for h in monitor.handlers.values()) == calls
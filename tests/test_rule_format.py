@@ -0,0 +1,40 @@
+import pytest
+from conftest import rule_key
+
+from apiori import apriori
+from formulas import AssociationRule
+from rule_format import read_rules, write_rules
+
+FINGERPRINT = bytes(range(16))
+
+
+def test_mined_rules_roundtrip(tmp_path, transactions):
+    path = tmp_path / "rules.bin"
+    rules = apriori(transactions, 0.03, 0.3, rules_path=path)
+    saved = read_rules(path, expected_fingerprint=None)
+    assert len(saved) == len(rules)
+    assert rule_key(saved.to_rules()) == rule_key(rules)
+
+
+def test_any_item_name_roundtrips(tmp_path):
+    names = ["milk\nskimmed", "", "crème fraîche", "a,b"]
+    rules = {
+        AssociationRule.from_metrics((names[0],), (names[1],), 0.1, 0.5, 1.2),
+        AssociationRule.from_metrics((names[2], names[3]), (names[0],), 0.2, 0.7, 2.0),
+    }
+    path = tmp_path / "rules.bin"
+    write_rules(path, rules, fingerprint=FINGERPRINT)
+    saved = read_rules(path, expected_fingerprint=FINGERPRINT)
+    assert sorted(saved.items) == sorted(names)
+    assert rule_key(saved.to_rules()) == rule_key(rules)
+
+
+def test_rejects_other_catalog_and_empty_file(tmp_path):
+    path = tmp_path / "rules.bin"
+    write_rules(path, -1, fingerprint=FINGERPRINT)
+    assert len(read_rules(path)) == 0
+    with pytest.raises(ValueError):
+        read_rules(path, expected_fingerprint=bytes(16))
+    (tmp_path / "empty.bin").write_bytes(b"")
+    with pytest.raises(ValueError):
+        read_rules(tmp_path / "empty.bin")
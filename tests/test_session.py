@@ -0,0 +1,149 @@
+import pandas as pd
+
+from algorithms.cooccurrence import PairStats
+from preprocessing.preprocessing import compress_baskets
+from ui.session import SessionStore
+
+
+def snapshot(rows, start=0, derived=None):
+    tids = list(range(start + 1, start + len(rows) + 1))
+    snap = {"start": start, "tids": tids, "items": rows, "next_transaction_id": start + len(rows) + 1}
+    if derived is not None:
+        snap["derived"] = derived
+    return snap
+
+
+def frames(transactions):
+    baskets = compress_baskets(transactions)
+    return {
+        "cleaned": transactions,
+        "baskets": baskets,
+        "report": {"valid_transactions": len(transactions)},
+        "pair_stats": PairStats.from_baskets(baskets["items"].tolist(), baskets["weight"].to_numpy()),
+    }
+
+
+def assert_frame(loaded, expected):
+    pd.testing.assert_frame_equal(loaded.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def test_roundtrip(tmp_path, transactions):
+    rows = transactions["items"].tolist()
+    SessionStore(tmp_path).write(snapshot(rows, derived=frames(transactions)))
+
+    store = SessionStore(tmp_path)
+    meta = store.read_meta()
+    assert list(store.load_transactions(meta).items) == rows
+    assert_frame(store.load_frame(meta, "cleaned"), transactions)
+    assert_frame(store.load_frame(meta, "baskets"), compress_baskets(transactions))
+    restored = store.load_pair_stats(meta)
+    assert restored.items == frames(transactions)["pair_stats"].items
+    assert meta["report"] == {"valid_transactions": len(transactions)}
+
+
+def frame_rows(path, name):
+    return (path / f"{name}_tids.bin").stat().st_size // 8
+
+
+def test_rebuilt_frames_only_append_new_rows(tmp_path, transactions, monkeypatch):
+    store = SessionStore(tmp_path)
+    half = transactions.iloc[:50]
+    store.write(snapshot(half["items"].tolist(), derived=frames(half)))
+
+    appended = []
+    truncate = SessionStore._truncate
+
+    def record(self, prefix, info, rows):
+        appended.append((prefix, rows))
+        truncate(self, prefix, info, rows)
+    monkeypatch.setattr(SessionStore, "_truncate", record)
+    store.write(snapshot(transactions["items"].tolist()[50:], start=50, derived=frames(transactions)))
+
+    # The saved rows are kept, only the rest is written
+    baskets = compress_baskets(transactions)
+    assert appended == [("tx", 50), ("cleaned", 50), ("baskets", len(compress_baskets(half)))]
+    assert frame_rows(tmp_path, "cleaned") == len(transactions)
+    meta = SessionStore(tmp_path).read_meta()
+    assert_frame(store.load_frame(meta, "cleaned"), transactions)
+    assert_frame(store.load_frame(meta, "baskets"), baskets)
+
+
+def test_changed_rows_are_rewritten(tmp_path, transactions):
+    store = SessionStore(tmp_path)
+    store.write(snapshot(transactions["items"].tolist(), derived=frames(transactions)))
+    changed = transactions.copy()
+    # Same transaction id and item count, different items
+    row = changed.index[10]
+    changed.at[row, "items"] = ["zz-new-item"] * len(changed.at[row, "items"])
+    store.write(snapshot([], start=len(transactions), derived={"cleaned": changed, "baskets": None}))
+    meta = store.read_meta()
+    assert_frame(store.load_frame(meta, "cleaned"), changed)
+    assert store.load_frame(meta, "baskets") is None
+
+
+def test_clear_after_restore_drops_derived_data(tmp_path, transactions):
+    rows = transactions["items"].tolist()
+    SessionStore(tmp_path).write(snapshot(rows, derived=frames(transactions)))
+
+    store = SessionStore(tmp_path)
+    restored = store.load_transactions(store.read_meta())
+    assert len(restored) == len(rows)
+    restored.clear()
+    store.write(snapshot([["milk", "bread"]]))
+
+    meta = SessionStore(tmp_path).read_meta()
+    assert meta["rows"] == 1
+    assert list(store.load_transactions(meta).items) == [["milk", "bread"]]
+    assert all(meta.get(name) is None for name in ("cleaned", "baskets", "pair_stats", "report"))
+
+
+def test_pair_stats_are_never_replaced_in_place(tmp_path, transactions, monkeypatch):
+    rows = transactions["items"].tolist()
+    SessionStore(tmp_path).write(snapshot(rows, derived=frames(transactions)))
+    store = SessionStore(tmp_path)
+    restored = store.load_pair_stats(store.read_meta())
+    old_files = sorted(p.name for p in tmp_path.glob("pairs_*.npy"))
+
+    # What Windows does to a file that is still memory-mapped
+    import ui.session
+    replace = ui.session.os.replace
+
+    def guarded_replace(src, dst):
+        if str(dst) in {str(tmp_path / name) for name in old_files}:
+            raise PermissionError(dst)
+        replace(src, dst)
+    monkeypatch.setattr(ui.session.os, "replace", guarded_replace)
+
+    half = transactions.iloc[:50]
+    store.write(snapshot([], start=len(rows), derived=frames(half)))
+    meta = store.read_meta()
+    assert store.load_pair_stats(meta).n_tx == frames(half)["pair_stats"].n_tx
+    assert restored.n_tx == frames(transactions)["pair_stats"].n_tx
+    new_files = sorted(p.name for p in tmp_path.glob("pairs_*.npy"))
+    assert new_files and not set(new_files) & set(old_files)
+
+
+def test_failed_write_is_reported_and_rows_resent(tmp_path, transactions, monkeypatch):
+    rows = transactions["items"].tolist()
+    store = SessionStore(tmp_path)
+    store.submit(snapshot(rows[:10]))
+    store.flush()
+
+    def fail(self, name, frame):
+        raise OSError("disk full")
+    monkeypatch.setattr(SessionStore, "_write_frame", fail)
+    store.submit(snapshot(rows[10:20], start=10, derived=frames(transactions)))
+    # Starts past the failed rows, so it can't be written either
+    store.submit(snapshot(rows[20:30], start=20))
+    store.flush()
+    assert not store.busy
+    error = store.take_error()
+    assert isinstance(error, OSError) and store.take_error() is None
+    assert store.saved_rows() == 10
+
+    monkeypatch.undo()
+    store.submit(snapshot(rows[10:30], start=10))
+    store.flush()
+    assert store.take_error() is None
+    assert list(store.load_transactions(store.read_meta()).items) == rows[:30]
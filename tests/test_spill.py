@@ -0,0 +1,48 @@
+import pytest
+from conftest import rule_key
+
+from apiori import apriori
+from eclat import eclat
+from rule_format import RuleFile
+from spill import SpillDict, chunked
+
+# About a kilobyte: two candidates, five itemsets and three rule splits at a time
+TINY_MB = 0.001
+
+
+def test_chunked():
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked(range(3), None)) == [[0, 1, 2]]
+
+
+def test_spill_dict_keeps_every_entry(tmp_path):
+    spill = SpillDict(max_in_memory=2, directory=tmp_path)
+    expected = {("a",): 1, ("b",): 2, ("a", "b"): 3, ("c",): 4}
+    spill.update(expected)
+    spill[("c",)] = 5
+    expected[("c",)] = 5
+    assert spill.spilled == 2 and spill.unwrap() is spill
+    assert dict(spill.items()) == expected and len(spill) == 4
+    del spill[("a", "b")]
+    assert ("a", "b") not in spill
+    spill.close()
+    assert SpillDict().unwrap() == {}
+
+
+@pytest.mark.parametrize("mine", [apriori, eclat])
+def test_budget_does_not_change_the_result(transactions, mine):
+    itemsets, total = mine(transactions, 0.05, return_itemsets=True)
+    spilled, spilled_total = mine(transactions, 0.05, memory_budget_mb=TINY_MB, return_itemsets=True)
+    assert isinstance(spilled, SpillDict) and spilled.spilled
+    assert dict(spilled.items()) == itemsets and spilled_total == total
+    assert rule_key(mine(transactions, 0.05, 0.3, memory_budget_mb=TINY_MB)) == \
+        rule_key(mine(transactions, 0.05, 0.3))
+
+
+@pytest.mark.parametrize("mine", [apriori, eclat])
+def test_budgeted_rules_stream_to_the_rule_file(tmp_path, transactions, mine):
+    path = tmp_path / "rules.bin"
+    rules = mine(transactions, 0.05, 0.3, memory_budget_mb=TINY_MB, rules_path=path)
+    assert isinstance(rules, RuleFile) and len(rules) > 0
+    assert rule_key(rules) == rule_key(mine(transactions, 0.05, 0.3))
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,88 @@
+import random
+from collections import Counter
+from itertools import combinations
+
+from algorithms.streaming import StreamingMiner
+
+
+def test_constant_stream_stays_exact_long_after_window():
+    miner = StreamingMiner(window_size=1000, epsilon=0.01)
+    for n in range(1, 200_001):
+        miner.add_transaction(["milk", "bread"])
+        if n % 50_000 == 0:
+            assert miner.support(("milk", "bread")) == 1.0
+            assert miner.associations_for("milk") == [("bread", 100.0)]
+    assert len(miner) == 1000
+
+
+def test_window_counts_within_error_bound():
+    rng = random.Random(7)
+    items = [f"i{k}" for k in range(12)]
+    miner = StreamingMiner(window_size=500, epsilon=0.02, max_itemset_size=2)
+    stream = [rng.sample(items, rng.randint(1, 4)) for _ in range(5000)]
+
+    for n, basket in enumerate(stream, start=1):
+        miner.add_transaction(basket)
+        if n % 700 == 0:
+            window = stream[max(0, n - 500):n]
+            true = Counter(pair for b in window for pair in combinations(sorted(b), 2))
+            for pair, count in true.items():
+                entry = miner.itemset_counts.get(pair)
+                held = entry[0] if entry else 0
+                # Never over-counts, misses at most one occurrence per bucket in the window
+                assert count - miner.max_error <= held <= count
+
+
+def test_frequent_itemsets_has_no_false_negatives():
+    rng = random.Random(3)
+    miner = StreamingMiner(window_size=300, epsilon=0.05, max_itemset_size=3)
+    stream = []
+    for _ in range(3000):
+        basket = ["milk", "bread"] if rng.random() < 0.3 else rng.sample(["eggs", "jam", "tea", "rice"], 2)
+        stream.append(basket)
+        miner.add_transaction(basket)
+
+    window = stream[-300:]
+    true = Counter(pair for b in window for pair in combinations(sorted(b), 2))
+    found = miner.frequent_itemsets(0.2)
+    for pair, count in true.items():
+        if count >= 0.2 * 300:
+            assert pair in found
+
+
+def test_clear_resets_window():
+    miner = StreamingMiner(window_size=10)
+    miner.add_transactions([["a", "b"]] * 25)
+    miner.clear()
+    assert len(miner) == 0 and miner.itemset_counts == {} and miner.support("a") == 0.0
+
+
+def test_browser_feeds_the_window_what_preprocessing_keeps():
+    import types
+
+    import pandas as pd
+    import pytest
+    from conftest import DATA
+
+    from algorithms.cooccurrence import PairStats
+    from preprocessing.preprocessing import clean_data
+    from preprocessing.transaction_store import parse_transactions_frame
+    from ui.product_browser import ProductBrowser
+
+    tids, raw = parse_transactions_frame(pd.read_csv(DATA / "sample_transactions.csv", dtype={"items": str}))
+    cleaned = clean_data(pd.DataFrame({"transaction_id": tids, "items": [",".join(i) or "(empty)" for i in raw]}))
+    batch = PairStats.from_baskets(cleaned["items"].tolist())
+
+    # A window larger than the data keeps exact counts, so it must agree with the batch stats
+    browser = types.SimpleNamespace(stream_miner=StreamingMiner(window_size=len(raw) + 1, epsilon=0.001),
+                                    _stream_basket=ProductBrowser._stream_basket)
+    ProductBrowser._feed_stream_tail(browser, raw)
+    assert len(browser.stream_miner) == len(cleaned)
+    for product in batch.items:
+        assert dict(browser.stream_miner.associations_for(product)) == \
+            pytest.approx(dict(batch.associations_for(product)))
+
+    # A small window holds the last cleaned baskets, in order
+    browser.stream_miner = StreamingMiner(window_size=10)
+    ProductBrowser._feed_stream_tail(browser, raw)
+    assert list(browser.stream_miner.window) == [tuple(sorted(b)) for b in cleaned["items"].tolist()[-10:]]
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from tidsets import Tidset, intersect_all
+
+N_TX = 2000
+
+
+def random_positions(rng, density):
+    return np.flatnonzero(rng.random(N_TX) < density)
+
+
+# Sparse x sparse, sparse x bitmap and bitmap x bitmap, down to results below the dense threshold
+@pytest.mark.parametrize("a, b", [(0.005, 0.01), (0.005, 0.5), (0.5, 0.3), (0.05, 0.04), (0.9, 0.0)])
+def test_intersections_match_sets(a, b):
+    rng = np.random.default_rng(0)
+    left, right = random_positions(rng, a), random_positions(rng, b)
+    x, y = Tidset.from_positions(left, N_TX), Tidset.from_positions(right, N_TX)
+    expected = sorted(set(left) & set(right))
+    for result in (x & y, y & x):
+        assert result.to_array().tolist() == expected
+        assert len(result) == len(expected)
+
+
+def test_representation_follows_density():
+    rng = np.random.default_rng(1)
+    sparse = Tidset.from_positions(random_positions(rng, 0.005), N_TX)
+    dense = Tidset.from_positions(random_positions(rng, 0.5), N_TX)
+    assert not sparse.dense and dense.dense
+    assert dense.nbytes == N_TX // 8
+    assert dense.to_array().dtype == np.int32
+
+
+def test_intersect_all():
+    rng = np.random.default_rng(2)
+    positions = [random_positions(rng, d) for d in (0.6, 0.02, 0.4)]
+    expected = set(positions[0]) & set(positions[1]) & set(positions[2])
+    result = intersect_all([Tidset.from_positions(p, N_TX) for p in positions])
+    assert set(result.to_array().tolist()) == expected
+    assert len(intersect_all([Tidset.from_positions([], N_TX), Tidset.from_positions([1, 2], N_TX)])) == 0
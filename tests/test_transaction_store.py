@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from preprocessing.transaction_store import TransactionStore
+
+
+def test_append_extend_and_index():
+    store = TransactionStore()
+    store.append(7, ["Milk", "bread"])
+    store.extend([3, 9], [["eggs"], []])
+    assert len(store) == 3 and store.max_tid == 9
+    assert [store.find(t) for t in (7, 3, 9, 4)] == [0, 1, 2, None]
+    assert store[1] == {"transaction_id": 3, "items": ["eggs"]}
+    assert store.unique_items == {"milk", "bread", "eggs"}
+    assert store.to_frame()["items"].tolist() == ["Milk,bread", "eggs", "(empty)"]
+    with pytest.raises(ValueError):
+        store.extend([1, 2], [["a"]])
+    store.clear()
+    assert not store and store.find(7) is None and not store.unique_items
+
+
+def test_encoded_store_matches_plain_lists():
+    rows = [["milk", "bread"], [], ["eggs", "milk", "jam"]]
+    vocab = ["milk", "bread", "eggs", "jam", "unused"]
+    ends = np.array([2, 2, 5], dtype=np.int64)
+    ids = np.array([0, 1, 2, 0, 3], dtype=np.int32)
+    store = TransactionStore.from_encoded([1, 2, 3], vocab, ends, ids)
+    assert list(store.items) == rows
+    assert store.unique_items == {"milk", "bread", "eggs", "jam"}
+
+    # Rows added after a restore are kept as plain lists behind the encoded ones
+    store.append(4, ["soda"])
+    assert store.items[-1] == ["soda"] and store.items[1:3] == rows[1:]
+    assert [r["items"] for r in store] == rows + [["soda"]]
+    with pytest.raises(IndexError):
+        store.items[4]
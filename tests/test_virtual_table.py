@@ -0,0 +1,45 @@
+import tkinter as tk
+
+import pytest
+
+from ui.virtual_table import VirtualTable
+
+
+@pytest.fixture
+def table():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    rows = [(str(i),) for i in range(1000)]
+    view = VirtualTable(root, columns=[("id", "ID", 80, "w")], row_count=lambda: len(rows),
+                        get_row=rows.__getitem__, find_row=lambda key: int(key), height=10)
+    yield view
+    root.destroy()
+
+
+def selected_value(view):
+    chosen = view.tree.selection()
+    return view.tree.item(chosen[0], "values")[0] if chosen else None
+
+
+def test_selection_follows_data_row_when_scrolling(table):
+    table.select(3)
+    table.scroll_by(5)
+    assert table.selected == 3 and selected_value(table) is None
+    table.scroll_by(-5)
+    assert selected_value(table) == "3"
+
+
+def test_arrow_keys_move_selection_and_keep_it_visible(table):
+    table.select(0)
+    for _ in range(15):
+        table._on_key(1)
+    assert table.selected == 15
+    assert table.first <= 15 < table.first + table.visible
+    assert selected_value(table) == "15"
+
+
+def test_jump_selects_row(table):
+    assert table.jump_to("500")
+    assert table.selected == 500 and selected_value(table) == "500"